@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the HAR record/replay cache.
+Runs a recorded-style script against the local static test site: the
+first run records a HAR archive, the next runs replay it, once with the
+"third-party" analytics script on the live allowlist. Reports wall time
+and the requests and bytes that actually reached the site per run.
+
+Usage: python benchmarks/har_bench.py [--runs 3] [--warm]
+Requires Playwright and Chromium in the venv (or pass --python).
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from crawly.config import DEFAULTS
+from crawly.jobs import Job
+from crawly.runner import ScriptExecutor, venv_python
+from profile_bench import SCRIPT_TEMPLATE
+from static_site import StaticSite
+
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="HAR record/replay benchmark")
+    parser.add_argument("--runs", type=int, default=3, help="replay runs per variant")
+    parser.add_argument("--warm", action="store_true", help="use warm browser workers")
+    parser.add_argument("--python", help="interpreter with Playwright (default: venv python)")
+    args = parser.parse_args()
+
+    python_path = args.python or venv_python(PROJECT_ROOT / "venv")
+
+    with StaticSite() as site, tempfile.TemporaryDirectory() as project:
+        project_root = Path(project)
+        (project_root / "scripts").mkdir()
+        (project_root / "scripts" / "bench_site.py").write_text(
+            SCRIPT_TEMPLATE.format(url=site.url, pages=site.pages), encoding="utf-8")
+
+        config = dict(DEFAULTS)
+        config["profile"] = "headless"
+        output = []
+        executor = ScriptExecutor(project_root, config, output.append, python_path=python_path)
+        executor.warm = args.warm
+
+        # (label, HAR mode, live allowlist, runs)
+        variants = [
+            ("live", "off", [], args.runs),
+            ("record", "record", [], 1),
+            ("replay", "replay", [], args.runs),
+            ("replay+live", "replay", [f"http://{site.third_party_host}:*/analytics/**"], args.runs),
+        ]
+
+        print(f"📊 HAR cache against {site.url} "
+              f"({'warm browser' if args.warm else 'new interpreter per run'})")
+        print(f"{'variant':<12} {'wall s':>8} {'requests':>9} {'MB':>8}")
+
+        try:
+            for label, mode, live, runs in variants:
+                executor.har_mode = mode
+                config["har_live"] = live
+                walls, transferred, requests = [], [], []
+                for _ in range(runs):
+                    site.reset_counters()
+                    started = time.perf_counter()
+                    returncode = executor.execute(Job("bench_site"))
+                    walls.append(time.perf_counter() - started)
+                    transferred.append(site.bytes_served)
+                    requests.append(site.requests_served)
+                    if returncode != 0:
+                        print("\n".join(output[-20:]))
+                        print(f"❌ {label} run failed")
+                        sys.exit(1)
+
+                print(f"{label:<12} {statistics.mean(walls):>8.2f} {statistics.mean(requests):>9.0f} "
+                      f"{statistics.mean(transferred) / (1024 * 1024):>8.2f}")
+        finally:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
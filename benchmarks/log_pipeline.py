@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Stress benchmark for the GUI log pipeline.
+Pushes 100k lines from a worker thread into the log view and reports the
+GUI-thread latency (how late a 10 ms heartbeat fires) and the time until
+every line is on screen. Compares the batched LogQueue tick with the old
+one-after()-call-per-line approach.
+
+Usage: python benchmarks/log_pipeline.py [--lines 100000] [--mode batched|per-line|both]
+"""
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+import tkinter as tk
+from pathlib import Path
+from tkinter import scrolledtext
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from crawly.logview import LogQueue
+
+
+HEARTBEAT_MS = 10
+
+
+def percentile(values, pct):
+    """Simple nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_benchmark(mode, line_count, tick_ms, batch_lines):
+    """Run one benchmark pass and return its measurements"""
+    root = tk.Tk()
+    root.geometry("800x400")
+    log_text = scrolledtext.ScrolledText(root, font=("Monaco", 11))
+    log_text.pack(fill=tk.BOTH, expand=True)
+
+    log_queue = LogQueue(batch_lines)
+    lag = []
+    shown = [0]
+    result = {}
+
+    def append(text, count):
+        log_text.insert(tk.END, text)
+        log_text.see(tk.END)
+        shown[0] += count
+
+    def drain():
+        lines = log_queue.drain()
+        if lines:
+            append("".join(lines), len(lines))
+        root.after(tick_ms, drain)
+
+    def heartbeat(expected):
+        now = time.perf_counter()
+        lag.append((now - expected) * 1000)
+        if shown[0] >= line_count:
+            result["displayed"] = now
+            root.quit()
+            return
+        root.after(HEARTBEAT_MS, heartbeat, now + HEARTBEAT_MS / 1000)
+
+    def producer():
+        result["start"] = time.perf_counter()
+        for i in range(line_count):
+            message = f"[12:00:00] [bench] output line {i} of the stress benchmark\n"
+            if mode == "batched":
+                log_queue.put(message)
+            else:
+                root.after(0, append, message, 1)
+        result["produced"] = time.perf_counter()
+
+    if mode == "batched":
+        root.after(tick_ms, drain)
+    root.after(HEARTBEAT_MS, heartbeat, time.perf_counter() + HEARTBEAT_MS / 1000)
+    threading.Thread(target=producer, daemon=True).start()
+
+    root.mainloop()
+    root.destroy()
+
+    return {
+        "mode": mode,
+        "produce_s": result["produced"] - result["start"],
+        "display_s": result["displayed"] - result["start"],
+        "lag_p50": percentile(lag, 50),
+        "lag_p95": percentile(lag, 95),
+        "lag_max": max(lag) if lag else 0.0,
+        "lag_mean": statistics.mean(lag) if lag else 0.0,
+    }
+
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Log pipeline stress benchmark")
+    parser.add_argument("--lines", type=int, default=100000, help="number of lines to push")
+    parser.add_argument("--mode", choices=["batched", "per-line", "both"], default="both")
+    parser.add_argument("--tick-ms", type=int, default=50, help="drain interval in ms")
+    parser.add_argument("--batch-lines", type=int, default=2000, help="maximum lines per drain")
+    args = parser.parse_args()
+
+    modes = ["batched", "per-line"] if args.mode == "both" else [args.mode]
+
+    print(f"📊 Pushing {args.lines} lines through the log pipeline "
+          f"(tick {args.tick_ms} ms, batch {args.batch_lines} lines)")
+    print(f"{'mode':<10} {'produce s':>10} {'display s':>10} "
+          f"{'lag p50 ms':>11} {'lag p95 ms':>11} {'lag max ms':>11}")
+
+    for mode in modes:
+        r = run_benchmark(mode, args.lines, args.tick_ms, args.batch_lines)
+        print(f"{r['mode']:<10} {r['produce_s']:>10.2f} {r['display_s']:>10.2f} "
+              f"{r['lag_p50']:>11.1f} {r['lag_p95']:>11.1f} {r['lag_max']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
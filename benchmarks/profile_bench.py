@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark for execution profiles.
+Runs a recorded-style script (headless=False, like codegen output) against
+the local static test site with different profiles injected by the runner
+and reports wall time, requests and bytes transferred per run.
+
+Usage: python benchmarks/profile_bench.py [--runs 3] [--profiles headless fast] [--warm]
+Requires Playwright and Chromium in the venv (or pass --python).
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from crawly.config import DEFAULTS
+from crawly.jobs import Job
+from crawly.profiles import PROFILES
+from crawly.runner import ScriptExecutor, venv_python
+from static_site import StaticSite
+
+
+SCRIPT_TEMPLATE = '''import re
+from playwright.sync_api import Playwright, sync_playwright, expect
+
+
+def run(playwright: Playwright) -> None:
+    browser = playwright.chromium.launch(headless=False)
+    context = browser.new_context()
+    page = context.new_page()
+    page.goto("{url}")
+    page.get_by_label("Postcode").fill("9723TH")
+    page.get_by_role("button", name="Zoeken").click()
+    for _ in range({pages} - 1):
+        page.locator("#next").click()
+        page.wait_for_load_state("load")
+
+    # ---------------------
+    context.close()
+    browser.close()
+
+
+with sync_playwright() as playwright:
+    run(playwright)
+'''
+
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Execution profile benchmark")
+    parser.add_argument("--runs", type=int, default=3, help="runs per profile")
+    parser.add_argument("--profiles", nargs="+", default=["headless", "fast"],
+                        help="profiles to compare ('default' needs a display)")
+    parser.add_argument("--warm", action="store_true", help="use warm browser workers")
+    parser.add_argument("--python", help="interpreter with Playwright (default: venv python)")
+    args = parser.parse_args()
+
+    python_path = args.python or venv_python(PROJECT_ROOT / "venv")
+
+    with StaticSite() as site, tempfile.TemporaryDirectory() as project:
+        project_root = Path(project)
+        (project_root / "scripts").mkdir()
+        (project_root / "scripts" / "bench_site.py").write_text(
+            SCRIPT_TEMPLATE.format(url=site.url, pages=site.pages), encoding="utf-8")
+
+        # The test site's "third-party" analytics host counts as an analytics domain
+        fast = dict(PROFILES["fast"])
+        fast["block_domains"] = list(fast["block_domains"]) + [site.third_party_host]
+        config = dict(DEFAULTS)
+        config["profiles"] = {"fast": fast}
+
+        output = []
+        executor = ScriptExecutor(project_root, config, output.append, python_path=python_path)
+        executor.warm = args.warm
+
+        print(f"📊 {args.runs} run(s) per profile against {site.url} "
+              f"({'warm browser' if args.warm else 'new interpreter per run'})")
+        print(f"{'profile':<10} {'wall s':>8} {'requests':>9} {'MB':>8}")
+
+        results = {}
+        try:
+            for profile in args.profiles:
+                executor.profile = profile
+                walls, transferred, requests = [], [], []
+                for _ in range(args.runs):
+                    site.reset_counters()
+                    started = time.perf_counter()
+                    returncode = executor.execute(Job("bench_site"))
+                    walls.append(time.perf_counter() - started)
+                    transferred.append(site.bytes_served)
+                    requests.append(site.requests_served)
+                    if returncode != 0:
+                        print("\n".join(output[-20:]))
+                        print(f"❌ Run with profile {profile} failed")
+                        sys.exit(1)
+
+                results[profile] = (statistics.mean(walls), statistics.mean(transferred))
+                print(f"{profile:<10} {results[profile][0]:>8.2f} {statistics.mean(requests):>9.0f} "
+                      f"{results[profile][1] / (1024 * 1024):>8.2f}")
+        finally:
+            executor.shutdown()
+
+        baseline = args.profiles[0]
+        for profile in args.profiles[1:]:
+            wall_saving = 1 - results[profile][0] / results[baseline][0]
+            byte_saving = 1 - results[profile][1] / max(1, results[baseline][1])
+            print(f"✅ {profile} vs {baseline}: {wall_saving:.0%} less wall time, "
+                  f"{byte_saving:.0%} fewer bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the GUI.
+Starts the application in a fresh interpreter several times and reports
+how long it takes from process start until main.py is imported, until
+the window is first painted and until the scripts are listed (executor
+created, environment checked, scripts found).
+
+Usage: python benchmarks/startup.py [--runs 5]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+MILESTONES = ["interpreter", "import", "first_paint", "scripts_ready"]
+
+
+def child():
+    """Measured side: start the app and print the wall clock time of every milestone"""
+    times = {"interpreter": time.time()}
+
+    sys.path.insert(0, str(PROJECT_ROOT))
+    import tkinter as tk
+    import main
+    times["import"] = time.time()
+
+    # Never start a pip install from a benchmark
+    main.SiteTesterApp.setup_environment = lambda self: None
+
+    root = tk.Tk()
+    app = main.SiteTesterApp(root)
+
+    def on_expose(event):
+        times.setdefault("first_paint", time.time())
+
+    def wait_ready():
+        if app.startup_complete:
+            times["scripts_ready"] = time.time()
+            root.quit()
+            return
+        root.after(2, wait_ready)
+
+    root.bind("<Expose>", on_expose)
+    root.after(2, wait_ready)
+    root.mainloop()
+
+    if app.executor:
+        app.executor.shutdown()
+    root.destroy()
+    print(json.dumps(times))
+
+
+def measure():
+    """Start one child and return the milestones in ms since the process was spawned"""
+    spawned = time.time()
+    result = subprocess.run([sys.executable, __file__, "--child"], capture_output=True, text=True,
+                            cwd=PROJECT_ROOT)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or "startup child failed")
+    times = json.loads(result.stdout.strip().splitlines()[-1])
+    return {name: (times[name] - spawned) * 1000 for name in MILESTONES if name in times}
+
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="GUI startup benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts to measure")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    print(f"📊 Measuring {args.runs} cold starts of the GUI")
+    runs = [measure() for _ in range(args.runs)]
+
+    print(f"{'milestone':<15} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for name in MILESTONES:
+        values = [run[name] for run in runs if name in run]
+        if values:
+            print(f"{name:<15} {statistics.median(values):>10.1f} {min(values):>10.1f} {max(values):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Local static test site for benchmarks.
+Serves a few pages with heavy images, a web font, a video and a
+"third-party" analytics script (served on the localhost host name while
+the pages use 127.0.0.1), and counts the requests and bytes it serves.
+"""
+
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StaticSite:
+    """In-memory HTTP site with byte accounting"""
+
+    def __init__(self, pages=3, images_per_page=12, image_kb=80, latency_ms=20):
+        self.pages = pages
+        self.images_per_page = images_per_page
+        self.image_kb = image_kb
+        self.latency = latency_ms / 1000
+        self.bytes_served = 0
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._files = {}
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/"
+
+    @property
+    def third_party_host(self):
+        """Host name the analytics script is served from"""
+        return "localhost"
+
+    def reset_counters(self):
+        """Start counting from zero"""
+        with self._lock:
+            self.bytes_served = 0
+            self.requests_served = 0
+
+    def _build(self, port):
+        """Generate the site content"""
+        analytics = f"http://{self.third_party_host}:{port}/analytics/gtag.js"
+        files = {
+            "/static/site.css": ("text/css", (
+                "@font-face { font-family: Bench; src: url(/static/bench.woff2); }\n"
+                "body { font-family: Bench, sans-serif; }\n"
+                "img { width: 120px; height: 80px; }\n").encode()),
+            "/static/bench.woff2": ("font/woff2", os.urandom(150 * 1024)),
+            "/media/clip.mp4": ("video/mp4", os.urandom(1024 * 1024)),
+            "/analytics/gtag.js": ("application/javascript",
+                                   b"/* analytics */ var payload = '" + b"x" * 60000 + b"';\n"),
+        }
+
+        for page in range(1, self.pages + 1):
+            images = ""
+            for index in range(self.images_per_page):
+                path = f"/img/page{page}_{index}.png"
+                files[path] = ("image/png", os.urandom(self.image_kb * 1024))
+                images += f'<img src="{path}" alt="image {index}">\n'
+
+            next_link = f'<a id="next" href="/page{page + 1}.html">Volgende</a>' if page < self.pages else ""
+            html = f"""<!DOCTYPE html>
+<html><head><title>Page {page}</title>
+<link rel="stylesheet" href="/static/site.css">
+<script src="{analytics}"></script>
+</head><body>
+<h1>Page {page}</h1>
+<form><input name="postcode" aria-label="Postcode"><button type="button">Zoeken</button></form>
+<video src="/media/clip.mp4" preload="auto" muted></video>
+{images}
+{next_link}
+</body></html>"""
+            name = "/" if page == 1 else f"/page{page}.html"
+            files[name] = ("text/html", html.encode())
+
+        self._files = files
+
+    def start(self):
+        """Start serving on a free port"""
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if site.latency:
+                    time.sleep(site.latency)
+                path = self.path.split("?", 1)[0]
+                content_type, body = site._files.get(path, ("text/plain", b"not found"))
+                self.send_response(200 if path in site._files else 404)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+                with site._lock:
+                    site.bytes_served += len(body)
+                    site.requests_served += 1
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._build(self._server.server_address[1])
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Stop serving"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
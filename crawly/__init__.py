@@ -0,0 +1,4 @@
+"""
+Crawly - execution core for the SiteTester Playwright Script Manager.
+Tk-free building blocks shared by the GUI (main.py) and other front-ends.
+"""
@@ -0,0 +1,11 @@
+"""
+Entry point for `python -m crawly`.
+"""
+
+import sys
+
+from .cli import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""
+Script bootstrap for runs with options.
+`python -m crawly.bootstrap <script>` installs the Playwright hooks with the
+options from the CRAWLY_OPTIONS environment variable and then runs the
+script unchanged, exactly as `python <script>` would.
+"""
+
+import atexit
+import runpy
+import sys
+from pathlib import Path
+
+from . import hooks
+
+
+def main():
+    """Bootstrap entry point"""
+    if len(sys.argv) < 2:
+        print("Usage: python -m crawly.bootstrap <script> [args...]")
+        sys.exit(2)
+
+    script_path = Path(sys.argv[1]).resolve()
+
+    hooks.configure(hooks.options_from_env())
+    hooks.install()
+    atexit.register(hooks.finish)
+
+    # Make the script see the same argv and sys.path as a direct run
+    sys.argv = sys.argv[1:]
+    sys.path[0] = str(script_path.parent)
+    runpy.run_path(str(script_path), run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
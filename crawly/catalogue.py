@@ -0,0 +1,286 @@
+"""
+Incremental script catalogue.
+Scripts are found in scripts/ and its subdirectories (names are relative
+paths without .py, e.g. "shop/checkout"). Metadata - start URL, browser,
+number of steps - is cached in logs/catalogue.json keyed by modification
+time, size and content hash, so a rescan only reads changed files. A
+background watcher polls for changes (or waits on inotify when the
+optional inotify_simple package is installed).
+"""
+
+import ast
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+from .instrument import PAGE_ACTIONS, LOCATOR_ACTIONS
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+
+CATALOGUE_FILE = "catalogue.json"
+
+# playwright.chromium.launch(...), p.firefox.launch_persistent_context(...), ...
+ENGINE_PATTERN = re.compile(r"\.(chromium|firefox|webkit)\.(?:launch|connect)")
+
+# Directories never searched for scripts
+SKIP_DIRS = {"__pycache__", "venv", ".venv"}
+
+STEP_ACTIONS = set(PAGE_ACTIONS) | set(LOCATOR_ACTIONS)
+
+
+def iter_script_files(scripts_dir):
+    """All script files below scripts_dir, sorted by name"""
+    scripts_dir = Path(scripts_dir)
+    found = []
+    for folder, dirs, files in os.walk(scripts_dir):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith(".")]
+        found.extend(Path(folder) / name for name in files if name.endswith(".py"))
+    return sorted(found, key=lambda path: script_name(scripts_dir, path).lower())
+
+
+def script_name(scripts_dir, path):
+    """Catalogue name of a script file: relative path without .py, '/' separated"""
+    return Path(path).relative_to(scripts_dir).with_suffix("").as_posix()
+
+
+def script_metadata(source):
+    """Start URL, browser and step count of a Playwright script"""
+    engines = ENGINE_PATTERN.findall(source)
+    meta = {"start_url": None, "browser": engines[0] if engines else None, "steps": None, "error": None}
+
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        meta["error"] = f"SyntaxError: line {e.lineno}: {e.msg}"
+        return meta
+
+    steps = 0
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            action = node.func.attr
+            if action in STEP_ACTIONS:
+                steps += 1
+            if action == "goto" and meta["start_url"] is None and node.args:
+                first = node.args[0]
+                if isinstance(first, ast.Constant) and isinstance(first.value, str):
+                    meta["start_url"] = first.value
+    meta["steps"] = steps
+    return meta
+
+
+class ScriptCatalogue:
+    """Scripts with cached metadata, rescanned incrementally"""
+
+    def __init__(self, scripts_dir, cache_path=None, history=None):
+        self.scripts_dir = Path(scripts_dir)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.history = history
+        self.entries = {}
+        self._cached = {}
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._load_cache()
+
+    def _load_cache(self):
+        """Read cached metadata from a previous session"""
+        if self.cache_path is None:
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                self._cached = json.load(f)
+        except (OSError, ValueError):
+            self._cached = {}
+
+    def _save_cache(self):
+        if self.cache_path is None:
+            return
+        partial = self.cache_path.with_name(self.cache_path.name + ".part")
+        try:
+            with open(partial, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+            partial.replace(self.cache_path)
+        except OSError:
+            pass
+
+    def names(self):
+        """All script names"""
+        with self._lock:
+            return list(self.entries)
+
+    def get(self, name):
+        """Metadata of one script, including its last run status when a history is attached"""
+        with self._lock:
+            entry = self.entries.get(name)
+        if entry is None:
+            return None
+        entry = dict(entry)
+        if self.history is not None:
+            last = self.history.last_run(name)
+            entry["last_status"] = last["status"] if last else None
+        return entry
+
+    def filter(self, text):
+        """Names containing all words of text (case-insensitive, any order)"""
+        words = text.lower().split()
+        return [name for name in self.names() if all(word in name.lower() for word in words)]
+
+    def scan(self):
+        """Bring the catalogue up to date, returns (added, changed, removed) name lists"""
+        with self._scan_lock:
+            cached = self._cached
+            previous = self.entries
+            current = {}
+            added, changed = [], []
+            dirty = False
+
+            for path in iter_script_files(self.scripts_dir):
+                name = script_name(self.scripts_dir, path)
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                known = previous.get(name) or cached.get(name)
+
+                # Unchanged modification time and size: reuse without reading the file
+                if known and known["mtime_ns"] == stat.st_mtime_ns and known["size"] == stat.st_size:
+                    current[name] = known
+                else:
+                    try:
+                        source = path.read_bytes()
+                    except OSError:
+                        continue
+                    digest = hashlib.sha1(source).hexdigest()
+                    if known and known["sha1"] == digest:
+                        entry = dict(known)
+                    else:
+                        entry = script_metadata(source.decode("utf-8", errors="replace"))
+                        entry["sha1"] = digest
+                        if name in previous:
+                            changed.append(name)
+                    entry["mtime_ns"] = stat.st_mtime_ns
+                    entry["size"] = stat.st_size
+                    current[name] = entry
+                    dirty = True
+
+                if name not in previous:
+                    added.append(name)
+
+            removed = [name for name in previous if name not in current]
+            with self._lock:
+                self.entries = current
+            if dirty or removed or set(cached) - set(current):
+                self._save_cache()
+            self._cached = {}
+            return added, changed, removed
+
+    def watch(self, interval, on_change):
+        """Rescan in a background thread, calling on_change(added, changed, removed) on changes"""
+        if self._thread is not None:
+            return
+
+        def loop():
+            notifier = None
+            try:
+                while not self._stop.is_set():
+                    if notifier is None:
+                        notifier = self._open_notifier()
+                    if not self._wait_for_change(notifier, interval):
+                        # scripts/ itself is gone or inotify failed: watch again from scratch
+                        if notifier is not None:
+                            notifier.close()
+                            notifier = None
+                    if self._stop.is_set():
+                        return
+                    try:
+                        changes = self.scan()
+                    except Exception:
+                        continue
+                    if any(changes):
+                        on_change(*changes)
+            finally:
+                if notifier is not None:
+                    notifier.close()
+
+        self._thread = threading.Thread(target=loop, daemon=True)
+        self._thread.start()
+
+    def _open_notifier(self):
+        """Inotify watcher of scripts/ kept for the watcher's lifetime, None to poll instead"""
+        if inotify_simple is None or not self.scripts_dir.exists():
+            return None
+        try:
+            return _ScriptsNotifier(self.scripts_dir)
+        except OSError:
+            return None
+
+    def _wait_for_change(self, notifier, interval):
+        """Block until something in scripts/ may have changed (inotify) or interval passed,
+        False when the notifier can no longer be used"""
+        if notifier is None:
+            self._stop.wait(interval)
+            return True
+        try:
+            # The timeout keeps stop() responsive and catches anything inotify missed
+            notifier.wait(int(interval * 1000) * 5)
+            # Let editors finish writing before rescanning
+            self._stop.wait(0.1)
+        except OSError:
+            self._stop.wait(interval)
+            return False
+        return bool(notifier.folders)
+
+    def stop(self):
+        """Stop the background watcher"""
+        self._stop.set()
+
+
+class _ScriptsNotifier:
+    """One inotify instance watching scripts/ and its subdirectories; folders created later
+    are added as their events arrive, removed ones drop out when the kernel drops their watch"""
+
+    def __init__(self, scripts_dir):
+        flags = inotify_simple.flags
+        self.mask = (flags.CREATE | flags.DELETE | flags.MODIFY | flags.CLOSE_WRITE
+                     | flags.MOVED_FROM | flags.MOVED_TO)
+        self.inotify = inotify_simple.INotify()
+        # Watch descriptor -> watched folder
+        self.folders = {}
+        try:
+            self.add_tree(scripts_dir)
+        except OSError:
+            self.close()
+            raise
+
+    def add_tree(self, root):
+        for folder, dirs, _ in os.walk(root):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith(".")]
+            self.folders[self.inotify.add_watch(folder, self.mask)] = Path(folder)
+
+    def wait(self, timeout_ms):
+        """Block until events arrive or timeout_ms passed, returns the events"""
+        flags = inotify_simple.flags
+        events = self.inotify.read(timeout=timeout_ms)
+        for event in events:
+            if event.mask & flags.IGNORED:
+                self.folders.pop(event.wd, None)
+            elif event.mask & flags.ISDIR and event.mask & (flags.CREATE | flags.MOVED_TO):
+                folder = self.folders.get(event.wd)
+                if folder is not None and event.name not in SKIP_DIRS and not event.name.startswith("."):
+                    try:
+                        self.add_tree(folder / event.name)
+                    except OSError:
+                        # Removed again before it could be watched
+                        pass
+        return events
+
+    def close(self):
+        self.inotify.close()
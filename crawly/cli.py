@@ -0,0 +1,509 @@
+"""
+Headless command line interface for Crawly.
+Runs scripts from scripts/ without Tk, e.g. on CI boxes and servers:
+
+    python -m crawly run                      # all scripts
+    python -m crawly run "config*" -j 4       # glob selection, 4 in parallel
+    python -m crawly run --profile fast       # headless, no images/fonts/analytics
+    python -m crawly run --list               # show the selected scripts
+    python -m crawly history configurator --failed --since 7d
+    python -m crawly history --trend          # runs, failures and duration per day
+    python -m crawly history --show 42        # print the (compressed) log of run 42
+    python -m crawly prune                    # compress and remove old logs now
+    python -m crawly serve --port 8765 -j 4   # worker: run scripts for a remote manager
+    python -m crawly run --remote box1:8765 --remote box2:8765
+    python -m crawly cache --clear state      # forget saved cookies/localStorage of all sites
+    python -m crawly optimize configurator    # diff of redundant recorded steps (--write applies it)
+    python -m crawly schedule                 # daemon: run the schedules from crawly.json
+    python -m crawly schedule "shop/*" --cron "*/15 * * * *" --jitter 30
+
+Exit code is 0 when every script passed, 1 when any failed and 2 on usage errors.
+"""
+
+import argparse
+import atexit
+import datetime
+import fnmatch
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+
+from .catalogue import CATALOGUE_FILE, ScriptCatalogue
+from .config import load_config, default_workers
+from .history import HISTORY_FILE, RunHistory, parse_since
+from .jobs import RunQueue
+from .optimize import describe_saving, optimize_script, script_diff
+from .planner import BatchPlan, estimate_durations, format_eta, longest_first
+from .retention import LogRetention, open_log
+from .retry import describe_failure, triage
+from .schedule import Schedule, Scheduler
+from .sitecache import STATE_SUFFIX, cache_size, clear_assets, clear_states, prune_assets
+from .params import DATA_SUFFIXES
+from .proctree import signal_tree
+from .profiles import resolve_profile
+from .orchestrator import get_orchestrator
+from .remote import DEFAULT_PORT, serve
+from .runner import ScriptExecutor, discover_scripts, venv_python, HAR_MODES
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+_print_lock = threading.Lock()
+
+
+def log(message):
+    """Print a timestamped message (thread-safe)"""
+    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+    with _print_lock:
+        print(f"[{timestamp}] {message}", flush=True)
+
+
+def select_scripts(available, patterns):
+    """Scripts matching any of the glob patterns (all scripts without patterns)"""
+    if not patterns:
+        return list(available)
+    return [name for name in available
+            if any(fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(f"{name}.py", pattern)
+                   for pattern in patterns)]
+
+
+def build_parser():
+    """Create the argument parser"""
+    parser = argparse.ArgumentParser(prog="crawly", description="Crawly - Playwright Script Manager")
+    subparsers = parser.add_subparsers(dest="command")
+
+    run_parser = subparsers.add_parser("run", help="run scripts without the GUI")
+    run_parser.add_argument("patterns", nargs="*",
+                            help="glob patterns selecting scripts by name (default: all)")
+    run_parser.add_argument("-j", "--workers", type=int,
+                            help="number of scripts to run in parallel (default: CPU cores)")
+    mode = run_parser.add_mutually_exclusive_group()
+    mode.add_argument("--warm", action="store_true", help="reuse warm browsers across scripts")
+    mode.add_argument("--process", action="store_true", help="start a new interpreter per script")
+    run_parser.add_argument("--profile",
+                            help="execution profile, e.g. headless or fast (default: from crawly.json)")
+    run_parser.add_argument("--timings", action="store_true",
+                            help="record per-step timings to logs/<run>.steps.jsonl")
+    run_parser.add_argument("--har", choices=HAR_MODES,
+                            help="HAR record/replay cache per script (default: from crawly.json)")
+    run_parser.add_argument("--site-state", action="store_true",
+                            help="reuse cookies/localStorage saved per site by earlier runs")
+    run_parser.add_argument("--asset-cache", action="store_true",
+                            help="serve static assets from the on-disk cache")
+    run_parser.add_argument("--timeout", type=float, metavar="SECONDS",
+                            help="kill a run after this many seconds (default: from crawly.json)")
+    run_parser.add_argument("--idle-timeout", type=float, metavar="SECONDS",
+                            help="kill a run that prints nothing for this many seconds")
+    run_parser.add_argument("--retries", type=int, metavar="N",
+                            help="retry runs failing on timeouts/network errors up to N times")
+    run_parser.add_argument("--data", metavar="FILE",
+                            help="CSV/JSONL file: run each script once per row with the row as PARAMS, "
+                                 "spread over -j warm workers")
+    run_parser.add_argument("--remote", action="append", metavar="HOST:PORT",
+                            help="run scripts on this remote worker (repeatable, default: from crawly.json)")
+    run_parser.add_argument("--python", help="interpreter to run scripts with (default: venv python)")
+    run_parser.add_argument("--project", default=str(PROJECT_ROOT), help="project directory")
+    run_parser.add_argument("--list", action="store_true", help="only list the selected scripts")
+    run_parser.set_defaults(func=command_run)
+
+    history_parser = subparsers.add_parser("history", help="query the run history")
+    history_parser.add_argument("script", nargs="?", help="only runs of this script")
+    history_parser.add_argument("--failed", action="store_true", help="only failed runs")
+    history_parser.add_argument("--status", help="only runs with this status")
+    history_parser.add_argument("--since", help="only runs since e.g. 7d, 12h or 2025-07-01")
+    history_parser.add_argument("--limit", type=int, default=50, help="maximum number of runs")
+    history_parser.add_argument("--trend", action="store_true", help="show runs per day instead")
+    history_parser.add_argument("--import-logs", action="store_true",
+                                help="index existing log files first")
+    history_parser.add_argument("--show", type=int, metavar="RUN_ID", help="print the log of a run")
+    history_parser.add_argument("--project", default=str(PROJECT_ROOT), help="project directory")
+    history_parser.set_defaults(func=command_history)
+
+    prune_parser = subparsers.add_parser("prune", help="apply log retention (compress and remove old logs)")
+    prune_parser.add_argument("--project", default=str(PROJECT_ROOT), help="project directory")
+    prune_parser.set_defaults(func=command_prune)
+
+    serve_parser = subparsers.add_parser("serve", help="run scripts sent by a remote manager")
+    serve_parser.add_argument("--host", default="127.0.0.1",
+                              help="address to listen on (default: 127.0.0.1, use 0.0.0.0 for all)")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port (default: {DEFAULT_PORT})")
+    serve_parser.add_argument("-j", "--workers", type=int,
+                              help="number of scripts to run at the same time (default: CPU cores)")
+    serve_parser.add_argument("--warm", action="store_true", help="reuse warm browsers across runs")
+    serve_parser.add_argument("--token", help="shared token managers must send (default: from crawly.json)")
+    serve_parser.add_argument("--python", help="interpreter to run scripts with (default: venv python)")
+    serve_parser.add_argument("--project", default=str(PROJECT_ROOT), help="project directory")
+    serve_parser.set_defaults(func=command_serve)
+
+    cache_parser = subparsers.add_parser("cache", help="show, prune or clear site state and the asset cache")
+    cache_parser.add_argument("--clear", choices=("assets", "state", "all"),
+                              help="remove cached assets, saved site state or both")
+    cache_parser.add_argument("--site", help="with --clear state: only the state of this host")
+    cache_parser.add_argument("--prune", action="store_true",
+                              help="remove expired assets and the oldest ones over asset_cache_max_mb")
+    cache_parser.add_argument("--project", default=str(PROJECT_ROOT), help="project directory")
+    cache_parser.set_defaults(func=command_cache)
+
+    optimize_parser = subparsers.add_parser("optimize", help="remove redundant recorded steps from scripts")
+    optimize_parser.add_argument("patterns", nargs="*",
+                                 help="glob patterns selecting scripts by name (default: all)")
+    optimize_parser.add_argument("--write", action="store_true",
+                                 help="save the optimised scripts instead of only showing the diff")
+    optimize_parser.add_argument("--project", default=str(PROJECT_ROOT), help="project directory")
+    optimize_parser.set_defaults(func=command_optimize)
+
+    schedule_parser = subparsers.add_parser("schedule", help="stay resident and run scripts on a schedule")
+    schedule_parser.add_argument("patterns", nargs="*",
+                                 help="with --cron/--every: glob patterns selecting scripts (default: all)")
+    when = schedule_parser.add_mutually_exclusive_group()
+    when.add_argument("--cron", metavar="EXPR", help='cron expression, e.g. "*/15 * * * *" or @hourly')
+    when.add_argument("--every", metavar="INTERVAL", help="fixed interval, e.g. 900, 15m or 6h")
+    schedule_parser.add_argument("--jitter", type=float, default=0.0, metavar="SECONDS",
+                                 help="delay each trigger by a random 0..SECONDS")
+    schedule_parser.add_argument("-j", "--workers", type=int,
+                                 help="number of scripts to run in parallel (default: CPU cores)")
+    schedule_parser.add_argument("--process", action="store_true",
+                                 help="start a new interpreter per run instead of sharing warm browsers")
+    schedule_parser.add_argument("--python", help="interpreter to run scripts with (default: venv python)")
+    schedule_parser.add_argument("--project", default=str(PROJECT_ROOT), help="project directory")
+    schedule_parser.add_argument("--list", action="store_true", help="only show the next trigger times")
+    schedule_parser.set_defaults(func=command_schedule)
+
+    return parser
+
+
+def stop_runs_on_exit(run_queue):
+    """SIGTERM (CI timeouts, kill, service managers) raises KeyboardInterrupt, and runs still
+    going when the CLI exits anyway are cancelled: their process groups would outlive it"""
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    def kill_leftovers():
+        # The loop may be gone already, so signal the process groups directly
+        for job in list(run_queue.jobs.values()):
+            if not job.finished:
+                job.cancelled = True
+                for pid in job.pids():
+                    signal_tree(pid, force=True)
+
+    signal.signal(signal.SIGTERM, stop)
+    atexit.register(kill_leftovers)
+
+
+def find_python(args):
+    """Interpreter for the scripts: --python, the venv, or the current one"""
+    if args.python:
+        return args.python
+    python_path = venv_python(Path(args.project) / "venv")
+    if not python_path.exists():
+        log("Virtual environment not found, using the current interpreter")
+        return sys.executable
+    return python_path
+
+
+def command_run(args):
+    """Run the selected scripts and return the exit code"""
+    project_root = Path(args.project)
+    config = load_config(project_root)
+
+    scripts_dir = project_root / "scripts"
+    if not scripts_dir.exists():
+        log("Scripts directory not found!")
+        return 2
+
+    scripts = select_scripts(discover_scripts(scripts_dir), args.patterns)
+    if not scripts:
+        log("No scripts match the selection")
+        return 2
+
+    if args.list:
+        catalogue = ScriptCatalogue(scripts_dir, project_root / "logs" / CATALOGUE_FILE)
+        catalogue.scan()
+        for script_name in scripts:
+            info = catalogue.get(script_name) or {}
+            details = info.get("error") or f"{info.get('browser') or '-':<9} {info.get('steps') or 0:>4} steps"
+            print(f"{script_name:<40} {details}  {info.get('start_url') or ''}".rstrip())
+        return 0
+
+    executor = ScriptExecutor(project_root, config, log, python_path=find_python(args))
+    if args.warm:
+        executor.warm = True
+    elif args.process:
+        executor.warm = False
+    if args.timings:
+        executor.instrument = True
+    if args.har:
+        executor.har_mode = args.har
+    if args.site_state:
+        executor.site_state = True
+    if args.asset_cache:
+        executor.asset_cache = True
+    if args.timeout:
+        executor.run_timeout = args.timeout
+    if args.idle_timeout:
+        executor.idle_timeout = args.idle_timeout
+    if args.retries is not None:
+        executor.retry.max_attempts = args.retries + 1
+    if args.profile:
+        resolve_profile(config, args.profile)
+        executor.profile = args.profile
+    if args.remote:
+        executor.use_remote(args.remote)
+
+    workers = args.workers or config["max_workers"] or default_workers()
+    executor.data_workers = workers
+    run_queue = RunQueue(executor.execute_async, workers, retry=executor.retry)
+
+    if args.data:
+        data_file = Path(args.data)
+        if not data_file.exists() or data_file.suffix.lower() not in DATA_SUFFIXES:
+            log(f"Data file must be an existing {' or '.join(DATA_SUFFIXES)} file: {data_file}")
+            return 2
+        # Rows are spread over the workers, scripts run one after the other
+        run_queue.set_max_workers(1)
+        log(f"Running {len(scripts)} script(s) once per row of {data_file.name} "
+            f"with {workers} warm worker(s)")
+        estimates = {}
+    else:
+        data_file = None
+        # Longest scripts first, so no worker idles behind one long script at the end
+        estimates = estimate_durations(executor.history, scripts)
+        scripts = longest_first(scripts, estimates)
+        log(f"Running {len(scripts)} script(s) with {workers} parallel worker(s)")
+    stop_runs_on_exit(run_queue)
+    started = time.monotonic()
+    jobs = [run_queue.submit(script_name, data_file) for script_name in scripts]
+    plan = BatchPlan(jobs, estimates, workers)
+    estimated = plan.remaining(now=started)
+    if estimated:
+        log(format_eta(estimated))
+
+    try:
+        while run_queue.has_work():
+            time.sleep(0.2)
+    except KeyboardInterrupt:
+        log("Interrupted, stopping all scripts...")
+        run_queue.cancel_all()
+        while run_queue.has_work():
+            time.sleep(0.2)
+    finally:
+        executor.shutdown()
+
+    # Apply log retention to logs of earlier runs
+    compressed, removed = executor.retention.run_once(executor.active_log_files())
+    if compressed or removed:
+        log(f"Log retention: {compressed} compressed, {removed} removed")
+
+    # Summary: flaky runs passed after a retry, hard failures failed every attempt
+    passed, flaky, failed = triage(jobs)
+    estimate = f" (estimated {estimated[0]:.1f}s)" if estimated else ""
+    flaky_count = f" ({len(flaky)} flaky)" if flaky else ""
+    log(f"Finished {len(jobs)} script(s) in {time.monotonic() - started:.1f}s{estimate}: "
+        f"{len(passed) + len(flaky)} passed{flaky_count}, {len(failed)} failed")
+    for job in flaky:
+        log(f"  FLAKY  {job.script_name} (passed on attempt {job.attempt}) - {job.log_file}")
+    for job in failed:
+        log(f"  FAILED {job.script_name} ({describe_failure(job)}) - {job.log_file}")
+        if job.error:
+            log(job.error.rstrip())
+
+    return 1 if failed else 0
+
+
+def format_time(timestamp):
+    """Local date and time of an epoch timestamp"""
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def command_history(args):
+    """Query the run history and return the exit code"""
+    logs_dir = Path(args.project) / "logs"
+    history = RunHistory(logs_dir / HISTORY_FILE)
+
+    if args.import_logs:
+        log(f"Indexed {history.import_logs(logs_dir)} existing log file(s)")
+
+    if args.show is not None:
+        run = history.get(args.show)
+        if run is None or not run["log_file"]:
+            log(f"No log file for run {args.show}")
+            return 1
+        with open_log(run["log_file"]) as f:
+            for line in f:
+                sys.stdout.write(line)
+        return 0
+
+    since = parse_since(args.since) if args.since else None
+    status = "failed" if args.failed else args.status
+
+    if args.trend:
+        days = history.trend(args.script, since)
+        longest = max([day["avg_duration"] or 0 for day in days], default=0) or 1
+        for day in days:
+            bar = "#" * int(30 * (day["avg_duration"] or 0) / longest)
+            print(f"{day['day']}  {day['runs']:>5} runs  {day['failures'] or 0:>4} failed  "
+                  f"{day['avg_duration'] or 0:>7.1f}s avg  {bar}")
+        return 0
+
+    runs = history.query(args.script, status, since, limit=args.limit)
+    print(f"{'id':>6}  {'started':<19}  {'script':<25} {'status':<10} {'rc':>4} {'duration':>9}  log")
+    for run in runs:
+        duration = f"{run['duration']:.1f}s" if run["duration"] is not None else "-"
+        returncode = run["returncode"] if run["returncode"] is not None else "-"
+        print(f"{run['id']:>6}  {format_time(run['started']):<19}  {run['script']:<25} {run['status']:<10} "
+              f"{returncode:>4} {duration:>9}  {run['log_file'] or ''}")
+    return 0
+
+
+def command_prune(args):
+    """Compress finished logs and remove the ones over the retention limits"""
+    project_root = Path(args.project)
+    config = load_config(project_root)
+    logs_dir = project_root / "logs"
+
+    retention = LogRetention.from_config(logs_dir, RunHistory(logs_dir / HISTORY_FILE), config)
+    compressed, removed = retention.run_once()
+    log(f"Log retention: {compressed} compressed, {removed} removed")
+    return 0
+
+
+def command_serve(args):
+    """Run scripts sent by remote managers until interrupted"""
+    project_root = Path(args.project)
+    config = load_config(project_root)
+    executor = ScriptExecutor(project_root, config, log, python_path=find_python(args))
+    executor.warm = args.warm
+    slots = args.workers or config["max_workers"] or default_workers()
+    try:
+        serve(executor, args.host, args.port, slots, args.token or config["remote_token"])
+    except KeyboardInterrupt:
+        log("Worker stopped")
+    return 0
+
+
+def command_schedule(args):
+    """Run scripts on their schedules until interrupted"""
+    project_root = Path(args.project)
+    config = load_config(project_root)
+
+    scripts_dir = project_root / "scripts"
+    if not scripts_dir.exists():
+        log("Scripts directory not found!")
+        return 2
+
+    if args.cron or args.every:
+        schedules = [Schedule("command line", args.patterns, args.cron, args.every, args.jitter)]
+    else:
+        schedules = [Schedule.from_config(entry, index) for index, entry in enumerate(config["schedules"])]
+    if not schedules:
+        log('No schedules: pass --cron or --every, or add "schedules" to crawly.json')
+        return 2
+
+    if args.list:
+        now = datetime.datetime.now()
+        for schedule in schedules:
+            print(schedule.describe())
+            moment = now
+            for _ in range(3):
+                moment = schedule.next_time(moment)
+                print(f"    {moment:%Y-%m-%d %H:%M:%S}")
+        return 0
+
+    # One resident executor: warm browsers and caches are shared by all triggers
+    executor = ScriptExecutor(project_root, config, log, python_path=find_python(args))
+    executor.warm = not args.process
+    workers = args.workers or config["max_workers"] or default_workers()
+    executor.data_workers = workers
+    run_queue = RunQueue(executor.execute_async, workers, retry=executor.retry)
+    executor.start_retention()
+
+    scheduler = Scheduler(schedules, run_queue, lambda: discover_scripts(scripts_dir), select_scripts,
+                          executor.history, log)
+    future = get_orchestrator().spawn(scheduler.run())
+
+    stop_runs_on_exit(run_queue)
+    try:
+        while not future.done():
+            time.sleep(0.5)
+        future.result()
+    except KeyboardInterrupt:
+        log("Scheduler stopping, cancelling running scripts...")
+        future.cancel()
+        run_queue.cancel_all()
+        while run_queue.has_work():
+            time.sleep(0.2)
+    finally:
+        executor.shutdown()
+    return 0
+
+
+def command_cache(args):
+    """Report, prune or clear the per-site state and the asset cache"""
+    project_root = Path(args.project)
+    config = load_config(project_root)
+    assets_dir = project_root / config["asset_cache_dir"]
+    state_dir = project_root / config["state_dir"]
+
+    if args.clear in ("assets", "all"):
+        clear_assets(assets_dir)
+        log(f"Asset cache cleared ({assets_dir})")
+    if args.clear in ("state", "all"):
+        log(f"Removed {clear_states(state_dir, args.site)} saved site state(s)")
+    if args.prune:
+        removed = prune_assets(assets_dir, config["asset_cache_max_mb"], config["asset_cache_max_age"])
+        log(f"Asset cache: {removed} entries removed")
+
+    total, count = cache_size(assets_dir)
+    print(f"Asset cache: {count} responses, {total / (1024 * 1024):.1f} MB in {assets_dir}")
+    sites = sorted(path.name[:-len(STATE_SUFFIX)] for path in state_dir.glob(f"*{STATE_SUFFIX}"))
+    print(f"Site state:  {', '.join(sites) if sites else 'none'}")
+    return 0
+
+
+def command_optimize(args):
+    """Show (or apply) the optimiser's changes to the selected scripts"""
+    scripts_dir = Path(args.project) / "scripts"
+    scripts = select_scripts(discover_scripts(scripts_dir), args.patterns)
+    if not scripts:
+        log("No scripts match the selection")
+        return 2
+
+    total = 0
+    for script_name in scripts:
+        script_path = scripts_dir / f"{script_name}.py"
+        source = script_path.read_text(encoding="utf-8")
+        try:
+            optimised, removed = optimize_script(source)
+        except SyntaxError as e:
+            log(f"{script_name}: not optimised (line {e.lineno}: {e.msg})")
+            continue
+        if not removed:
+            continue
+        sys.stdout.write(script_diff(source, optimised, f"{script_name}.py"))
+        total += len(removed)
+        if args.write:
+            script_path.write_text(optimised, encoding="utf-8")
+
+    if total and not args.write:
+        log(f"{describe_saving(total)} (diff only, use --write to save)")
+    else:
+        log(describe_saving(total))
+    return 0
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if not getattr(args, "func", None):
+        parser.print_help()
+        return 2
+
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as e:
+        log(f"Error: {e}")
+        return 2
@@ -0,0 +1,148 @@
+"""
+Compiled script cache.
+Every script version is identified by a hash of its path and content. The
+manager parses each version once and rejects syntax errors before a
+browser is launched; warm workers keep the compiled code per hash in
+memory and as marshal files keyed by hash and the interpreter's bytecode
+magic number, so a script is compiled once instead of once per run.
+"""
+
+import ast
+import collections
+import hashlib
+import importlib.util
+import marshal
+import os
+import threading
+from pathlib import Path
+
+
+CODE_CACHE_DIR = "codecache"
+
+# Bytecode format of this interpreter; marshal data is only valid for the same one
+MAGIC = importlib.util.MAGIC_NUMBER.hex()
+
+
+class ScriptError(Exception):
+    """The script cannot be run: unreadable or not valid Python"""
+
+
+def script_hash(script_path, source):
+    """Hash identifying one version of a script"""
+    digest = hashlib.sha256(str(script_path).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(source.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def syntax_error(source, filename):
+    """Description of the first syntax error in source, None when it parses"""
+    try:
+        ast.parse(source, filename=str(filename))
+    except SyntaxError as e:
+        return f"{Path(filename).name} line {e.lineno}: {e.msg}"
+    except ValueError as e:
+        return f"{Path(filename).name}: {e}"
+    return None
+
+
+class ScriptValidator:
+    """Manager side: reads scripts and checks them, parsing every version once"""
+
+    def __init__(self):
+        # Script path -> (hash, syntax error or None) of the version checked last
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    def load(self, script_path):
+        """Return (hash, source) of a runnable script, raises ScriptError otherwise"""
+        try:
+            source = Path(script_path).read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            raise ScriptError(f"cannot read {script_path}: {e}")
+
+        digest = script_hash(script_path, source)
+        key = str(script_path)
+        with self._lock:
+            checked = self._checked.get(key)
+        if checked is not None and checked[0] == digest:
+            error = checked[1]
+        else:
+            error = syntax_error(source, script_path)
+            with self._lock:
+                self._checked[key] = (digest, error)
+
+        if error:
+            raise ScriptError(f"SyntaxError in {error}")
+        return digest, source
+
+
+class CodeCache:
+    """Worker side: compiled code objects per script hash, in memory and on disk"""
+
+    def __init__(self, cache_dir=None, max_entries=256):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_entries = max_entries
+        self._memory = collections.OrderedDict()
+
+    def _path(self, digest):
+        return self.cache_dir / f"{digest}-{MAGIC}.bin" if self.cache_dir else None
+
+    def get(self, digest):
+        """Code object for a script hash, None when it is not cached"""
+        code = self._memory.get(digest)
+        if code is not None:
+            self._memory.move_to_end(digest)
+            return code
+
+        path = self._path(digest)
+        if path is None:
+            return None
+        try:
+            code = marshal.loads(path.read_bytes())
+        except (OSError, ValueError, EOFError, TypeError):
+            return None
+        self._remember(digest, code)
+        return code
+
+    def put(self, digest, code):
+        """Cache the code compiled for a script hash"""
+        self._remember(digest, code)
+        path = self._path(digest)
+        if path is not None:
+            self._store(path, code)
+
+    def _remember(self, digest, code):
+        self._memory[digest] = code
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _store(self, path, code):
+        """Write marshal data under a temporary name first"""
+        partial = path.with_name(f"{path.name}.{os.getpid()}.part")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            partial.write_bytes(marshal.dumps(code))
+            partial.replace(path)
+        except OSError:
+            pass
+
+    def prune(self, max_files=1000):
+        """Remove the least recently written marshal files beyond max_files"""
+        if self.cache_dir is None or not self.cache_dir.exists():
+            return 0
+        files = []
+        for path in self.cache_dir.glob("*.bin"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        files.sort(reverse=True)
+        removed = 0
+        for _, path in files[max_files:]:
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                continue
+        return removed
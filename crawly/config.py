@@ -0,0 +1,115 @@
+"""
+Configuration handling for Crawly.
+Settings are read from crawly.json in the project root and merged with the defaults.
+"""
+
+import json
+import os
+from pathlib import Path
+
+
+CONFIG_FILE = "crawly.json"
+
+DEFAULTS = {
+    # Number of scripts that may run at the same time (None = number of CPU cores)
+    "max_workers": None,
+    # "process": new interpreter per script, "warm": reuse browsers in warm workers
+    "runner_mode": "process",
+    # Execution profile applied to every run (see crawly.profiles), extra profiles under "profiles"
+    "profile": "default",
+    "profiles": {},
+    # Record per-step timings of Playwright actions to logs/<run>.steps.jsonl
+    "instrument": False,
+    # GUI log drain interval (ms) and maximum lines inserted per drain
+    "log_tick_ms": 50,
+    "log_batch_lines": 2000,
+    # Number of lines kept in the on-screen log (full output stays in logs/)
+    "log_max_lines": 5000,
+    # Log files are flushed every log_flush_interval seconds or log_flush_lines lines
+    "log_flush_interval": 1.0,
+    "log_flush_lines": 500,
+    # Retention: finished logs are compressed ("gzip", "zstd" or "none") after log_compress_after
+    # seconds; the oldest are removed beyond these limits (None = no limit)
+    "log_compression": "gzip",
+    "log_compress_after": 60,
+    "log_max_age_days": 90,
+    "log_max_count": 10000,
+    "log_max_total_mb": 2048,
+    "log_retention_interval": 300,
+    # HAR record/replay cache per script under har_dir ("off", "auto", "record" or "replay");
+    # URLs matching har_live globs always go to the network, other unrecorded requests are
+    # aborted ("abort") or sent to the network ("fallback")
+    "har_mode": "off",
+    "har_dir": "har",
+    "har_live": [],
+    "har_not_found": "abort",
+    # Cookies and localStorage saved per site (host of the script's first goto) under state_dir
+    # and loaded into the contexts of the next run, so consent banners and logins are skipped
+    "site_state": False,
+    "state_dir": "state",
+    # On-disk cache of static GET responses (asset_cache_types), served through a context route;
+    # entries expire after asset_cache_max_age seconds, the cache is pruned to asset_cache_max_mb,
+    # no-store/no-cache responses are only stored when asset_cache_respect_headers is false
+    "asset_cache": False,
+    "asset_cache_dir": "cache/assets",
+    "asset_cache_max_age": 86400,
+    "asset_cache_max_mb": 512,
+    "asset_cache_types": ["stylesheet", "script", "image", "font", "media"],
+    "asset_cache_respect_headers": True,
+    # Remote workers ("host:port", started with `python -m crawly serve`) that run scripts instead of
+    # local interpreters, the shared token they require, and how often a run moves to another
+    # worker when one cannot be reached or drops the connection
+    "remote_workers": [],
+    "remote_token": None,
+    "remote_retries": 2,
+    # Watchdog: stop a run (its whole process tree) after run_timeout seconds or when it prints nothing
+    # for idle_timeout seconds (None = no limit); kill_grace seconds between terminate and kill
+    "run_timeout": None,
+    "idle_timeout": None,
+    "kill_grace": 5.0,
+    # Limits per script interpreter run: CPU seconds per process (POSIX rlimit) and, with run_cgroup
+    # set to a delegated cgroup v2 directory, memory (MB) and CPU (percent of one core) of the whole tree
+    "run_cpu_seconds": None,
+    "run_memory_mb": None,
+    "run_cpu_percent": None,
+    "run_cgroup": None,
+    # Retries of failed runs whose output matches one of retry_patterns (regexes, None = timeouts and
+    # network errors, see crawly.retry): attempts per run in total, backoff doubling from retry_backoff
+    # seconds up to retry_backoff_max
+    "retry_max_attempts": 1,
+    "retry_backoff": 5.0,
+    "retry_backoff_max": 60.0,
+    "retry_patterns": None,
+    # Schedules of `python -m crawly schedule`: {"name", "scripts": [glob patterns], "cron": "*/15 * * * *"
+    # or "every": "15m", "jitter": seconds, "overlap": "skip" or "queue"} (see crawly.schedule)
+    "schedules": [],
+    # Seconds between resource samples (CPU, memory, FDs, threads) of running scripts (0 = off) and
+    # the number of samples kept per run for the Status sparkline
+    "monitor_interval": 1.0,
+    "monitor_history": 120,
+    # Offer to remove redundant recorded steps (see crawly.optimize) when saving a recording
+    "optimize_recordings": False,
+    # Seconds between checks of scripts/ for added, changed or removed scripts (0 = off)
+    "script_watch_interval": 2.0,
+    # Environment setup: local wheel directory (pip --find-links), install only from it, pip cache
+    "wheelhouse": None,
+    "offline_install": False,
+    "pip_cache_dir": None,
+}
+
+
+def default_workers():
+    """Default worker count: one per CPU core"""
+    return os.cpu_count() or 1
+
+
+def load_config(project_root):
+    """Load settings from crawly.json, falling back to defaults for missing keys"""
+    config = dict(DEFAULTS)
+    config_path = Path(project_root) / CONFIG_FILE
+
+    if config_path.exists():
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config.update(json.load(f))
+
+    return config
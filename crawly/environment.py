@@ -0,0 +1,142 @@
+"""
+Virtual environment bootstrap.
+Creates the venv, installs requirements.txt in a single pip resolve
+(optionally from a local wheelhouse for offline, repeatable installs) and
+installs only the browser engines the scripts actually use, in one Playwright
+installer run that downloads them concurrently.
+The time spent in every phase is reported. bootstrap_async() runs the
+installers as asyncio subprocesses (the GUI runs it on the orchestrator
+loop); bootstrap() is the same for plain scripts such as setup.py.
+"""
+
+import asyncio
+import subprocess
+import sys
+import time
+import venv
+from pathlib import Path
+
+from .catalogue import ENGINE_PATTERN, iter_script_files
+
+
+BROWSER_ENGINES = ("chromium", "firefox", "webkit")
+
+
+class BootstrapError(Exception):
+    """A bootstrap phase failed"""
+
+    def __init__(self, phase, message):
+        super().__init__(f"{phase} failed: {message}")
+        self.phase = phase
+
+
+def venv_paths(venv_dir):
+    """Python and pip executables of a venv"""
+    bin_dir = Path(venv_dir) / ("Scripts" if sys.platform == "win32" else "bin")
+    return bin_dir / "python", bin_dir / "pip"
+
+
+def detect_browsers(scripts_dir):
+    """Browser engines referenced by the scripts (chromium when none is found)"""
+    engines = set()
+    for script_file in iter_script_files(scripts_dir):
+        try:
+            engines.update(ENGINE_PATTERN.findall(script_file.read_text(encoding="utf-8", errors="ignore")))
+        except OSError:
+            continue
+    return [engine for engine in BROWSER_ENGINES if engine in engines] or ["chromium"]
+
+
+def _run(phase, cmd):
+    """Run a command for a phase, raising BootstrapError when it fails"""
+    result = subprocess.run([str(arg) for arg in cmd], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise BootstrapError(phase, (result.stderr or result.stdout).strip()[-2000:])
+    return result
+
+
+async def _run_async(phase, cmd):
+    """Run a command for a phase without blocking the event loop, raising BootstrapError when it fails"""
+    process = await asyncio.create_subprocess_exec(
+        *[str(arg) for arg in cmd], stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        output = (stderr or stdout).decode("utf-8", errors="replace")
+        raise BootstrapError(phase, output.strip()[-2000:])
+
+
+def pip_install_command(pip_path, requirements, wheelhouse=None, offline=False, cache_dir=None):
+    """Single pip invocation installing all requirements in one resolve"""
+    cmd = [pip_path, "install", "--disable-pip-version-check", "-r", requirements]
+    if wheelhouse and Path(wheelhouse).exists():
+        cmd += ["--find-links", wheelhouse]
+    if offline:
+        cmd.append("--no-index")
+    if cache_dir:
+        cmd += ["--cache-dir", cache_dir]
+    return cmd
+
+
+def bootstrap(project_root, log=print, wheelhouse=None, offline=False, cache_dir=None, browsers=None):
+    """Create/update the venv and install everything, returns [(phase, seconds)]"""
+    return asyncio.run(bootstrap_async(project_root, log, wheelhouse, offline, cache_dir, browsers))
+
+
+async def bootstrap_async(project_root, log=print, wheelhouse=None, offline=False, cache_dir=None,
+                          browsers=None):
+    """Create/update the venv and install everything, returns [(phase, seconds)]"""
+    project_root = Path(project_root)
+    venv_dir = project_root / "venv"
+    requirements = project_root / "requirements.txt"
+    python_path, pip_path = venv_paths(venv_dir)
+    timings = []
+
+    async def phase(name, work):
+        log(f"{name}...")
+        started = time.monotonic()
+        result = await work
+        elapsed = time.monotonic() - started
+        timings.append((name, elapsed))
+        log(f"{name} done in {elapsed:.1f}s")
+        return result
+
+    # Phase 1: virtual environment
+    if not python_path.exists():
+        loop = asyncio.get_running_loop()
+        await phase("Creating virtual environment",
+                    loop.run_in_executor(None, lambda: venv.create(venv_dir, with_pip=True)))
+
+    # Phase 2: all packages in one resolve
+    if requirements.exists():
+        cmd = pip_install_command(pip_path, requirements, wheelhouse, offline, cache_dir)
+    else:
+        cmd = [pip_path, "install", "--disable-pip-version-check", "playwright", "rich"]
+        if offline:
+            raise BootstrapError("Installing dependencies", "no requirements.txt for an offline install")
+    await phase("Installing dependencies", _run_async("Installing dependencies", cmd))
+
+    # Phase 3: only the browser engines the scripts use, in one installer run: Playwright
+    # downloads them concurrently itself, separate installers would contend for its registry lock
+    engines = browsers or detect_browsers(project_root / "scripts")
+    await phase(f"Installing browsers ({', '.join(engines)})",
+                _run_async("Installing browsers", [python_path, "-m", "playwright", "install", *engines]))
+
+    total = sum(seconds for _, seconds in timings)
+    log("Bootstrap timings: " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in timings)
+        + f" (total {total:.1f}s)")
+    return timings
+
+
+def build_wheelhouse(project_root, wheelhouse, log=print):
+    """Download/build wheels for requirements.txt into a wheelhouse for offline installs"""
+    project_root = Path(project_root)
+    python_path, pip_path = venv_paths(project_root / "venv")
+    pip = pip_path if pip_path.exists() else None
+    cmd = ([pip] if pip else [sys.executable, "-m", "pip"]) + [
+        "wheel", "--disable-pip-version-check", "-r", project_root / "requirements.txt", "-w", wheelhouse
+    ]
+
+    log(f"Building wheelhouse in {wheelhouse}...")
+    started = time.monotonic()
+    _run("Building wheelhouse", cmd)
+    log(f"Wheelhouse ready in {time.monotonic() - started:.1f}s")
@@ -0,0 +1,205 @@
+"""
+Run history index.
+Every execution is recorded in an SQLite database (logs/history.db) with
+script name, start/end time, duration, exit code and its log file, so
+questions like "all failures of configurator in the last week" are an
+indexed query instead of a scan over thousands of text files.
+"""
+
+import datetime
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+HISTORY_FILE = "history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    script TEXT NOT NULL,
+    started REAL NOT NULL,
+    ended REAL,
+    duration REAL,
+    returncode INTEGER,
+    status TEXT NOT NULL,
+    log_file TEXT,
+    log_size INTEGER,
+    mode TEXT,
+    profile TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_script_started ON runs (script, started);
+CREATE INDEX IF NOT EXISTS runs_status_started ON runs (status, started);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+"""
+
+# Log file names written by the executor: <script>_<dd-mm-YYYY_HH-MM-SS>[_<job>].txt[.gz|.zst]
+LOG_NAME = re.compile(r"^(?P<script>.+)_(?P<stamp>\d{2}-\d{2}-\d{4}_\d{2}-\d{2}-\d{2})(?:_\d+)?\.txt(?:\.gz|\.zst)?$")
+
+
+def parse_since(value):
+    """Epoch time for '7d', '12h', '30m' or an ISO date"""
+    match = re.fullmatch(r"(\d+)([dhm])", value.strip())
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        seconds = {"d": 86400, "h": 3600, "m": 60}[unit] * amount
+        return time.time() - seconds
+    return datetime.datetime.fromisoformat(value).timestamp()
+
+
+class RunHistory:
+    """SQLite store of script runs, safe to use from several threads"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def record_start(self, script, started, log_file=None, mode=None, profile=None):
+        """Insert a running entry and return its id"""
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO runs (script, started, status, log_file, mode, profile) "
+                "VALUES (?, ?, 'running', ?, ?, ?)",
+                (script, started, str(log_file) if log_file else None, mode, profile)
+            )
+            self._db.commit()
+            return cursor.lastrowid
+
+    def record_end(self, run_id, ended, returncode, status, log_size=None):
+        """Complete an entry created by record_start"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE runs SET ended = ?, duration = ? - started, returncode = ?, status = ?, "
+                "log_size = ? WHERE id = ?",
+                (ended, ended, returncode, status, log_size, run_id)
+            )
+            self._db.commit()
+
+    def update_log_file(self, old_path, new_path):
+        """Point runs at a moved (compressed) or removed (None) log file"""
+        with self._lock:
+            self._db.execute("UPDATE runs SET log_file = ? WHERE log_file = ?",
+                             (str(new_path) if new_path else None, str(old_path)))
+            self._db.commit()
+
+    def get(self, run_id):
+        """A single run by id"""
+        with self._lock:
+            row = self._db.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+            return dict(row) if row else None
+
+    def query(self, script=None, status=None, since=None, until=None, limit=200):
+        """Runs matching the filters, newest first"""
+        clauses, params = [], []
+        if script:
+            clauses.append("script = ?")
+            params.append(script)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if since is not None:
+            clauses.append("started >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("started < ?")
+            params.append(until)
+
+        sql = "SELECT * FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY started DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, params)]
+
+    def durations(self, script, limit=50):
+        """Durations of the last successful runs of a script, newest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT duration FROM runs WHERE script = ? AND status = 'completed' "
+                "AND duration IS NOT NULL ORDER BY started DESC LIMIT ?",
+                (script, limit)
+            )
+            return [row[0] for row in rows]
+
+    def trend(self, script=None, since=None):
+        """Per-day run count, failures and average duration"""
+        clauses, params = [], []
+        if script:
+            clauses.append("script = ?")
+            params.append(script)
+        if since is not None:
+            clauses.append("started >= ?")
+            params.append(since)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT date(started, 'unixepoch', 'localtime') AS day, COUNT(*) AS runs, "
+                "SUM(status = 'failed') AS failures, AVG(duration) AS avg_duration "
+                f"FROM runs{where} GROUP BY day ORDER BY day",
+                params
+            )
+            return [dict(row) for row in rows]
+
+    def last_run(self, script):
+        """Most recent run of a script"""
+        with self._lock:
+            row = self._db.execute("SELECT * FROM runs WHERE script = ? ORDER BY started DESC LIMIT 1",
+                                   (script,)).fetchone()
+            return dict(row) if row else None
+
+    def last_runs(self):
+        """Most recent run of every script, keyed by script name"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM runs WHERE id IN (SELECT MAX(id) FROM runs GROUP BY script)"
+            )
+            return {row["script"]: dict(row) for row in rows}
+
+    def scripts(self):
+        """Names of all scripts that have runs"""
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT DISTINCT script FROM runs ORDER BY script")]
+
+    def import_logs(self, logs_dir):
+        """Index existing log files (exit codes of old runs are unknown), returns the number added"""
+        with self._lock:
+            known = {row[0] for row in self._db.execute("SELECT log_file FROM runs WHERE log_file IS NOT NULL")}
+
+        added = 0
+        rows = []
+        for log_file in Path(logs_dir).glob("*.txt*"):
+            match = LOG_NAME.match(log_file.name)
+            if not match or str(log_file) in known:
+                continue
+            started = datetime.datetime.strptime(match.group("stamp"), "%d-%m-%Y_%H-%M-%S").timestamp()
+            stat = log_file.stat()
+            # Scripts in subdirectories are logged as shop__checkout (see runner.file_stem)
+            script = match.group("script").replace("__", "/")
+            rows.append((script, started, stat.st_mtime, max(0.0, stat.st_mtime - started),
+                         "unknown", str(log_file), stat.st_size))
+            added += 1
+
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO runs (script, started, ended, duration, status, log_file, log_size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._db.commit()
+        return added
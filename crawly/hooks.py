@@ -0,0 +1,168 @@
+"""
+Playwright hooks applied inside the script process.
+install() patches the Playwright sync API once so every browser and
+context a script creates picks up the run options set with configure():
+forced headless launches and request interception for the execution
+profile, HAR record/replay, per-site storage state and the static asset
+cache (crawly.sitecache), and per-step timing (crawly.instrument). Used
+by crawly.bootstrap (one interpreter per script) and by crawly.worker
+(warm browsers).
+"""
+
+import json
+import os
+from urllib.parse import urlsplit
+
+from . import instrument
+from .sitecache import AssetCache, save_state
+
+
+# Environment variable carrying the run options as JSON
+OPTIONS_ENV = "CRAWLY_OPTIONS"
+
+_options = {}
+_originals = {}
+_asset_cache = None
+
+
+def options_from_env():
+    """Run options passed by the manager"""
+    value = os.environ.get(OPTIONS_ENV)
+    return json.loads(value) if value else {}
+
+
+def configure(options):
+    """Set the run options used by the hooks for the next run"""
+    global _options, _asset_cache
+    _options = dict(options or {})
+    _asset_cache = AssetCache.from_options(_options["asset_cache"]) if _options.get("asset_cache") else None
+    instrument.configure(_options)
+
+
+def finish():
+    """Complete the current run: close files opened for it"""
+    instrument.finish()
+
+
+def launch_options(kwargs):
+    """Launch options with the profile applied"""
+    kwargs = dict(kwargs)
+    profile = _options.get("profile", {})
+    if profile.get("headless"):
+        kwargs["headless"] = True
+    return kwargs
+
+
+def context_options(kwargs):
+    """new_context options with the saved storage state of the site, unless the script passes one"""
+    kwargs = dict(kwargs)
+    state = _options.get("state")
+    if state and state.get("load") and "storage_state" not in kwargs:
+        kwargs["storage_state"] = state["file"]
+    return kwargs
+
+
+def _save_state(context):
+    """Save the storage state of a context before it closes (once)"""
+    state = _options.get("state")
+    if not state or getattr(context, "_crawly_state_saved", False):
+        return
+    context._crawly_state_saved = True
+    try:
+        save_state(context, state["file"])
+    except Exception:
+        # The context may already be gone (browser crashed or closed)
+        pass
+
+
+def _host_blocked(url, domains):
+    """True when the request host is (a subdomain of) a blocked domain"""
+    host = urlsplit(url).hostname or ""
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+def _route_request(route):
+    """Abort requests the profile blocks, pass everything else on"""
+    profile = _options.get("profile", {})
+    request = route.request
+
+    if (request.resource_type in profile.get("block_resource_types", ())
+            or _host_blocked(request.url, profile.get("block_domains", ()))):
+        route.abort()
+    else:
+        route.fallback()
+
+
+def _route_live(route):
+    """Send a request on the HAR live allowlist to the network"""
+    route.continue_()
+
+
+def prepare_context(context):
+    """Apply the run options to a freshly created browser context"""
+    # Routes registered later are matched first: live allowlist, blocking, HAR, asset cache
+    if _asset_cache is not None:
+        context.route("**/*", _asset_cache.handle)
+
+    har = _options.get("har")
+    if har:
+        context.route_from_har(har["file"], update=har["update"], not_found=har["not_found"])
+
+    profile = _options.get("profile", {})
+    if profile.get("block_resource_types") or profile.get("block_domains"):
+        context.route("**/*", _route_request)
+
+    if har:
+        for pattern in har.get("live", ()):
+            context.route(pattern, _route_live)
+    return context
+
+
+def install():
+    """Patch the Playwright sync API (idempotent)"""
+    if _originals:
+        return
+
+    from playwright.sync_api import Browser, BrowserContext, BrowserType
+
+    _originals["launch"] = BrowserType.launch
+    _originals["launch_persistent_context"] = BrowserType.launch_persistent_context
+    _originals["new_context"] = Browser.new_context
+    _originals["new_page"] = Browser.new_page
+    _originals["browser_close"] = Browser.close
+    _originals["context_close"] = BrowserContext.close
+
+    def launch(self, *args, **kwargs):
+        return _originals["launch"](self, *args, **launch_options(kwargs))
+
+    def launch_persistent_context(self, *args, **kwargs):
+        context = _originals["launch_persistent_context"](self, *args, **launch_options(kwargs))
+        # A persistent profile keeps its own cookies and storage
+        context._crawly_state_saved = True
+        return prepare_context(context)
+
+    def new_context(self, *args, **kwargs):
+        return prepare_context(_originals["new_context"](self, *args, **context_options(kwargs)))
+
+    def new_page(self, *args, **kwargs):
+        page = _originals["new_page"](self, *args, **context_options(kwargs))
+        prepare_context(page.context)
+        return page
+
+    def browser_close(self, *args, **kwargs):
+        for context in self.contexts:
+            _save_state(context)
+        return _originals["browser_close"](self, *args, **kwargs)
+
+    def context_close(self, *args, **kwargs):
+        _save_state(self)
+        return _originals["context_close"](self, *args, **kwargs)
+
+    instrument.install()
+
+    BrowserType.launch = launch
+    BrowserType.launch_persistent_context = launch_persistent_context
+    Browser.new_context = new_context
+    Browser.new_page = new_page
+    Browser.close = browser_close
+    BrowserContext.close = context_close
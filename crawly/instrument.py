@@ -0,0 +1,169 @@
+"""
+Per-step timing instrumentation.
+When a run has a "steps_file" option, the Playwright Page and Locator
+actions a script performs (goto, click, fill, press, ...) are timed and
+written as one JSON object per step to a JSONL file next to the text log.
+The manager side reads that file back to report the slowest steps.
+"""
+
+import functools
+import json
+import time
+
+
+# Page methods that navigate or act on a selector passed as first argument
+PAGE_ACTIONS = [
+    "goto", "reload", "go_back", "go_forward", "wait_for_load_state", "wait_for_url",
+    "wait_for_selector", "wait_for_timeout", "click", "dblclick", "fill", "type", "press",
+    "check", "uncheck", "select_option", "hover", "focus", "set_input_files", "screenshot",
+]
+
+# Locator methods performing an action on the located element(s)
+LOCATOR_ACTIONS = [
+    "click", "dblclick", "fill", "type", "press", "press_sequentially", "check", "uncheck",
+    "select_option", "hover", "focus", "set_input_files", "wait_for", "clear", "tap",
+    "set_checked", "scroll_into_view_if_needed", "screenshot",
+]
+
+# Actions whose first argument is a URL rather than a selector
+NAVIGATIONS = {"goto", "wait_for_url"}
+
+
+class StepRecorder:
+    """Appends timed steps to a JSONL file"""
+
+    def __init__(self, path, script=None):
+        self.path = path
+        self.script = script
+        self.step = 0
+        self.started = time.monotonic()
+        self._file = None
+        self._depth = 0
+
+    def record(self, action, target, selector, url, duration, error=None):
+        """Write one step"""
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8', buffering=1)
+        self.step += 1
+        entry = {
+            "step": self.step,
+            "script": self.script,
+            "action": action,
+            "target": target,
+            "selector": selector,
+            "url": url,
+            "start_s": round(time.monotonic() - self.started - duration, 4),
+            "duration_ms": round(duration * 1000, 2),
+            "ok": error is None,
+        }
+        if error is not None:
+            entry["error"] = error
+        self._file.write(json.dumps(entry) + "\n")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+_recorder = None
+
+
+def configure(options):
+    """Start recording for a run when the options ask for it"""
+    global _recorder
+    finish()
+    if options.get("steps_file"):
+        _recorder = StepRecorder(options["steps_file"], options.get("script"))
+
+
+def finish():
+    """Close the current step file"""
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+
+
+def _selector_of(locator):
+    """Selector string of a sync API Locator"""
+    return getattr(getattr(locator, "_impl_obj", None), "_selector", None) or repr(locator)
+
+
+def _page_url(page):
+    try:
+        return page.url
+    except Exception:
+        return None
+
+
+def _timed(method, action, describe):
+    """Wrap a Playwright method so each call is recorded as a step"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        recorder = _recorder
+        if recorder is None or recorder._depth:
+            return method(self, *args, **kwargs)
+
+        recorder._depth += 1
+        started = time.perf_counter()
+        error = None
+        try:
+            return method(self, *args, **kwargs)
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            recorder._depth -= 1
+            target, selector, url = describe(self, args, kwargs)
+            try:
+                recorder.record(action, target, selector, url, duration, error)
+            except OSError:
+                pass
+    return wrapper
+
+
+def install():
+    """Wrap the Playwright Page and Locator actions (called from crawly.hooks.install)"""
+    from playwright.sync_api import Locator, Page
+
+    def describe_page(action):
+        def describe(page, args, kwargs):
+            first = args[0] if args else kwargs.get("url" if action in NAVIGATIONS else "selector")
+            if action in NAVIGATIONS:
+                return "page", None, first if isinstance(first, str) else _page_url(page)
+            return "page", first if isinstance(first, str) else None, _page_url(page)
+        return describe
+
+    def describe_locator(locator, args, kwargs):
+        return "locator", _selector_of(locator), _page_url(locator.page)
+
+    for action in PAGE_ACTIONS:
+        if hasattr(Page, action):
+            setattr(Page, action, _timed(getattr(Page, action), action, describe_page(action)))
+    for action in LOCATOR_ACTIONS:
+        if hasattr(Locator, action):
+            setattr(Locator, action, _timed(getattr(Locator, action), action, describe_locator))
+
+
+def slowest_steps(path, count=5):
+    """Read a step file and return its slowest steps"""
+    steps = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    steps.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        return []
+    return sorted(steps, key=lambda step: step.get("duration_ms", 0), reverse=True)[:count]
+
+
+def format_step(step):
+    """One-line description of a recorded step"""
+    target = step.get("selector") or step.get("url") or ""
+    status = "" if step.get("ok", True) else " FAILED"
+    return f"{step.get('duration_ms', 0):>9.0f} ms  #{step.get('step')} {step.get('action')} {target}{status}"
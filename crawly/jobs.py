@@ -0,0 +1,280 @@
+"""
+Jobs and the run queue.
+Jobs are started by the orchestrator's event loop (crawly.orchestrator),
+at most a configurable number at a time; every job tracks its own child
+processes so it can be cancelled independently, and a watchdog kills
+runs that take too long or stop printing output. With a retry policy
+(crawly.retry) failed jobs are queued again after a backoff. Kept free of the
+execution machinery so the GUI can create its queue at startup without
+importing it.
+"""
+
+import asyncio
+import collections
+import inspect
+import itertools
+import threading
+import time
+import traceback
+from pathlib import Path
+
+from .config import default_workers
+
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+# Failed, waiting for the backoff of its next attempt
+RETRYING = "retrying"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class Job:
+    """A single script execution tracked by the run queue"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, script_name, data_file=None):
+        self.id = next(Job._ids)
+        self.script_name = script_name
+        # CSV/JSONL file with one parameter set per row (see crawly.params)
+        self.data_file = data_file
+        self.status = QUEUED
+        # time.monotonic() when a worker picked the job up
+        self.started_at = None
+        self.process = None
+        self._processes = set()
+        self.returncode = None
+        self.log_file = None
+        self.steps_file = None
+        self.cancelled = False
+        # Why the watchdog stopped the run, None while it is within its timeouts
+        self.timed_out = None
+        # Attempt number (1 = first run) and the transient error that makes a failure retryable
+        self.attempt = 1
+        self.retry_reason = None
+        self.last_output = None
+        # Traceback when the executor itself raised instead of returning an exit code
+        self.error = None
+        self._lock = threading.Lock()
+
+    @property
+    def label(self):
+        """Display name: the script, plus the data file of a data-driven run"""
+        if self.data_file:
+            return f"{self.script_name} [{Path(self.data_file).name}]"
+        return self.script_name
+
+    @property
+    def finished(self):
+        """True once the job will not run (again)"""
+        return self.status in (COMPLETED, FAILED, CANCELLED)
+
+    def attach_process(self, process):
+        """Register a child process; terminates it straight away if the job was cancelled"""
+        with self._lock:
+            self.process = process
+            self._processes.add(process)
+            if self.cancelled:
+                process.terminate()
+
+    def detach_process(self, process):
+        """Forget a child process that no longer works for this job (e.g. a released warm worker)"""
+        with self._lock:
+            self._processes.discard(process)
+            if self.process is process:
+                self.process = None
+
+    def pids(self):
+        """Process ids of the job's local child processes (remote runs have none)"""
+        with self._lock:
+            return [process.pid for process in self._processes if getattr(process, "pid", None)]
+
+    def cancel(self):
+        """Cancel the job, terminating its processes if they are running"""
+        with self._lock:
+            self.cancelled = True
+            for process in list(self._processes):
+                if process.poll() is None:
+                    process.terminate()
+
+    def touch(self):
+        """Record that the run printed output (see watchdog)"""
+        self.last_output = time.monotonic()
+
+    def expire(self, reason):
+        """Stop a run that exceeded a timeout, killing its process trees"""
+        with self._lock:
+            self.timed_out = reason
+            for process in list(self._processes):
+                if process.poll() is None:
+                    process.kill()
+
+
+async def watchdog(job, run_timeout=None, idle_timeout=None):
+    """Expire the job after run_timeout seconds, or when it prints nothing for idle_timeout seconds"""
+    started = time.monotonic()
+    if job.last_output is None:
+        job.last_output = started
+    while True:
+        deadlines = []
+        if run_timeout:
+            deadlines.append((started + run_timeout, f"running longer than {run_timeout}s"))
+        if idle_timeout:
+            deadlines.append((job.last_output + idle_timeout, f"no output for {idle_timeout}s"))
+        if not deadlines:
+            return
+        deadline, reason = min(deadlines)
+        now = time.monotonic()
+        if deadline <= now:
+            job.expire(reason)
+            return
+        await asyncio.sleep(deadline - now)
+
+
+class RunQueue:
+    """Queue of script jobs, run by the orchestrator's event loop at most max_workers at a time"""
+
+    def __init__(self, execute, max_workers=None, on_change=None, orchestrator=None, retry=None):
+        # execute(job) returns the exit code; a coroutine function runs on the loop itself,
+        # a plain function in the orchestrator's pool for blocking work
+        self.execute = execute
+        self.max_workers = max_workers or default_workers()
+        self.on_change = on_change
+        # crawly.retry.RetryPolicy, None = no retries
+        self.retry = retry
+        self.jobs = {}
+        self._pending = collections.deque()
+        self._lock = threading.Lock()
+        self._running = 0
+        # Started on first submit, so creating the queue stays cheap
+        self._orchestrator = orchestrator
+
+    @property
+    def orchestrator(self):
+        if self._orchestrator is None:
+            from .orchestrator import get_orchestrator
+            self._orchestrator = get_orchestrator()
+        return self._orchestrator
+
+    def submit(self, script_name, data_file=None):
+        """Queue a script for execution and return its job"""
+        job = Job(script_name, data_file)
+        with self._lock:
+            self.jobs[job.id] = job
+            self._pending.append(job)
+        self._notify(job)
+        self.orchestrator.call_soon(self._dispatch)
+        return job
+
+    def set_max_workers(self, max_workers):
+        """Change the number of concurrent runs"""
+        self.max_workers = max(1, int(max_workers))
+        if self._orchestrator is not None:
+            self._orchestrator.call_soon(self._dispatch)
+
+    def cancel(self, job_id):
+        """Cancel a single queued or running job"""
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+
+        job.cancel()
+        if job.status in (QUEUED, RETRYING):
+            job.status = CANCELLED
+            self._notify(job)
+        return True
+
+    def cancel_all(self):
+        """Cancel every queued and running job, returns the number of cancelled jobs"""
+        return sum(1 for job_id in list(self.jobs) if self.cancel(job_id))
+
+    def active_jobs(self):
+        """Jobs that are currently running"""
+        return [job for job in list(self.jobs.values()) if job.status == RUNNING]
+
+    def pending_jobs(self):
+        """Jobs waiting for a free worker"""
+        return [job for job in list(self.jobs.values()) if job.status in (QUEUED, RETRYING)]
+
+    def has_work(self):
+        """True while any job is queued or running"""
+        return any(not job.finished for job in list(self.jobs.values()))
+
+    def clear_finished(self):
+        """Forget jobs that have finished"""
+        with self._lock:
+            for job_id in [job_id for job_id, job in self.jobs.items() if job.finished]:
+                del self.jobs[job_id]
+
+    def _dispatch(self):
+        """Loop thread: start queued jobs while fewer than max_workers run"""
+        while self._running < self.max_workers:
+            with self._lock:
+                if not self._pending:
+                    return
+                job = self._pending.popleft()
+            if job.cancelled:
+                if job.status != CANCELLED:
+                    job.status = CANCELLED
+                    self._notify(job)
+                continue
+            self._running += 1
+            job.started_at = time.monotonic()
+            job.status = RUNNING
+            self._notify(job)
+            self.orchestrator.loop.create_task(self._run(job))
+
+    async def _run(self, job):
+        """Loop thread: execute one job and record its outcome"""
+        try:
+            if inspect.iscoroutinefunction(self.execute):
+                job.returncode = await self.execute(job)
+            else:
+                job.returncode = await self.orchestrator.to_thread(self.execute, job)
+        except Exception:
+            # Goes out with the job's state change, listeners show it
+            job.returncode = None
+            job.error = traceback.format_exc()
+        finally:
+            self._running -= 1
+
+        if job.cancelled:
+            job.status = CANCELLED
+        elif job.returncode == 0:
+            job.status = COMPLETED
+        elif self.retry and self.retry.should_retry(job):
+            # The worker is free for other jobs during the backoff
+            job.status = RETRYING
+            self.orchestrator.loop.call_later(self.retry.delay(job.attempt), self._requeue, job)
+        else:
+            job.status = FAILED
+        self._notify(job)
+        self._dispatch()
+
+    def _requeue(self, job):
+        """Loop thread: queue the next attempt of a job after its backoff"""
+        if job.cancelled:
+            if job.status != CANCELLED:
+                job.status = CANCELLED
+                self._notify(job)
+            return
+        job.attempt += 1
+        job.timed_out = None
+        job.retry_reason = None
+        job.last_output = None
+        job.error = None
+        job.status = QUEUED
+        with self._lock:
+            self._pending.append(job)
+        self._notify(job)
+        self._dispatch()
+
+    def _notify(self, job):
+        """Report a job state change to the listener and the orchestrator's subscribers"""
+        if self.on_change:
+            self.on_change(job)
+        if self._orchestrator is not None:
+            self._orchestrator.emit("job", job=job)
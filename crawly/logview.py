@@ -0,0 +1,79 @@
+"""
+Log pipeline between worker threads and the Tk log view.
+Worker threads push lines into a LogQueue; the GUI thread drains it on a
+fixed tick and inserts every pending line with a single widget update.
+The log view only keeps the most recent lines in a LogBuffer ring buffer;
+the complete output of every run stays in its log file.
+"""
+
+import collections
+import itertools
+
+
+class LogQueue:
+    """Thread-safe buffer of log lines, drained in batches by the GUI thread"""
+
+    def __init__(self, max_batch=2000):
+        # deque.append / popleft are atomic, so producers never take a lock
+        self._lines = collections.deque()
+        # Lines beyond max_batch wait for the next tick so one drain never stalls the GUI
+        self.max_batch = max_batch
+
+    def __len__(self):
+        return len(self._lines)
+
+    def put(self, line):
+        """Queue a line (callable from any thread)"""
+        self._lines.append(line)
+
+    def drain(self, max_lines=None):
+        """Take up to max_lines pending lines (default: the batch limit)"""
+        limit = max_lines or self.max_batch
+        lines = []
+        popleft = self._lines.popleft
+        try:
+            while len(lines) < limit:
+                lines.append(popleft())
+        except IndexError:
+            pass
+        return lines
+
+    def clear(self):
+        """Drop all pending lines"""
+        self._lines.clear()
+
+
+class LogBuffer:
+    """Fixed-capacity ring buffer of log lines backing the on-screen log"""
+
+    def __init__(self, capacity=5000):
+        self._lines = collections.deque(maxlen=capacity)
+        # Total number of lines pushed out of the buffer so far
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._lines)
+
+    @property
+    def capacity(self):
+        return self._lines.maxlen
+
+    def extend(self, messages):
+        """Add log messages (may contain several lines each)"""
+        lines = []
+        for message in messages:
+            lines.extend(message.rstrip("\n").split("\n"))
+
+        overflow = len(self._lines) + len(lines) - self.capacity
+        if overflow > 0:
+            self.dropped += overflow
+        self._lines.extend(lines)
+
+    def window(self, first, count):
+        """Return count lines starting at index first"""
+        return list(itertools.islice(self._lines, first, first + count))
+
+    def clear(self):
+        """Drop every line"""
+        self._lines.clear()
+        self.dropped = 0
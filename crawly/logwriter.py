@@ -0,0 +1,141 @@
+"""
+Buffered, non-blocking log file writer.
+Lines are stamped with a cheap monotonic clock reading and buffered; one
+shared flusher thread formats and writes the batches of every open log
+file, flushing by size or time, so many parallel runs do not need a
+thread each. The buffer is bounded: when the disk cannot keep up, lines
+are dropped (and counted) instead of blocking the pipe reader.
+"""
+
+import collections
+import datetime
+import threading
+import time
+
+
+class _Flusher:
+    """Single background thread writing due batches of all open LogWriters"""
+
+    def __init__(self):
+        self._writers = set()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def add(self, writer):
+        with self._condition:
+            self._writers.add(writer)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="crawly-logwriter", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def remove(self, writer):
+        with self._condition:
+            self._writers.discard(writer)
+
+    def wake(self):
+        with self._condition:
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                interval = min((writer.flush_interval for writer in self._writers), default=None)
+                self._condition.wait(interval)
+                writers = list(self._writers)
+
+            now = time.monotonic()
+            for writer in writers:
+                if writer._due(now):
+                    try:
+                        writer._flush()
+                    except (OSError, ValueError):
+                        # Disk full or file gone: keep serving the other logs
+                        pass
+
+
+_flusher = _Flusher()
+
+
+class LogWriter:
+    """Writes timestamped lines to a log file through the shared flusher thread"""
+
+    def __init__(self, path, flush_interval=1.0, flush_lines=500, max_buffer=100000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_lines = flush_lines
+        self.max_buffer = max_buffer
+        self.dropped = 0
+
+        # Wall clock anchor; per-line timestamps come from the monotonic clock
+        self._wall_base = time.time()
+        self._mono_base = time.monotonic()
+
+        self._buffer = collections.deque()
+        self._lock = threading.Lock()
+        # Held while a batch is formatted and written (flusher thread or close())
+        self._write_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._file = open(path, 'w', encoding='utf-8')
+
+        self._second = None
+        self._second_prefix = ""
+
+        _flusher.add(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write_line(self, line):
+        """Queue a line for writing; never blocks on disk I/O"""
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self.dropped += 1
+                return
+            self._buffer.append((time.monotonic(), line))
+            full = len(self._buffer) == self.flush_lines
+        if full:
+            _flusher.wake()
+
+    def close(self):
+        """Write out everything still buffered and close the file"""
+        _flusher.remove(self)
+        self._flush()
+        with self._write_lock:
+            self._file.close()
+
+    def _format_time(self, mono):
+        """Format a monotonic reading like str(datetime.now())"""
+        timestamp = self._wall_base + (mono - self._mono_base)
+        second = int(timestamp)
+        if second != self._second:
+            self._second = second
+            self._second_prefix = datetime.datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")
+        return f"{self._second_prefix}.{int((timestamp - second) * 1000000):06d}"
+
+    def _due(self, now):
+        """True when a full batch is waiting or the flush interval has passed"""
+        with self._lock:
+            if not self._buffer and not self.dropped:
+                return False
+            return len(self._buffer) >= self.flush_lines or now - self._last_flush >= self.flush_interval
+
+    def _flush(self):
+        """Write the buffered batch"""
+        with self._write_lock:
+            if self._file.closed:
+                return
+            with self._lock:
+                batch, self._buffer = self._buffer, collections.deque()
+                dropped, self.dropped = self.dropped, 0
+            self._last_flush = time.monotonic()
+
+            if batch or dropped:
+                chunk = "".join(f"{self._format_time(mono)}: {line}\n" for mono, line in batch)
+                if dropped:
+                    chunk += f"{self._format_time(time.monotonic())}: [{dropped} lines dropped, log writer could not keep up]\n"
+                self._file.write(chunk)
+                self._file.flush()
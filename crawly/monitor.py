@@ -0,0 +1,244 @@
+"""
+Resource monitor for running scripts.
+Samples the process tree of every running job (the script interpreter or
+warm worker and the browsers below it) at a fixed interval on the
+orchestrator loop: CPU (percent of one core), resident memory, open file
+descriptors and threads, summed over the tree. Uses psutil when it is
+installed and reads /proc otherwise (Linux); elsewhere without psutil
+nothing is sampled.
+
+Every sample round is emitted as a "resources" event with the totals and
+per-job samples; the peaks of a run are written next to its log as
+<log>.resources.json.
+"""
+
+import asyncio
+import collections
+import json
+import os
+import sys
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+RESOURCES_SUFFIX = ".resources.json"
+
+
+class Sample:
+    """Resource use of a process tree at one moment"""
+
+    FIELDS = ("cpu", "rss", "fds", "threads", "processes")
+
+    def __init__(self, cpu=0.0, rss=0, fds=0, threads=0, processes=0):
+        # CPU in percent of one core, rss in bytes
+        self.cpu = cpu
+        self.rss = rss
+        self.fds = fds
+        self.threads = threads
+        self.processes = processes
+
+    def add(self, other):
+        for field in self.FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+    def peak(self, other):
+        for field in self.FIELDS:
+            setattr(self, field, max(getattr(self, field), getattr(other, field)))
+
+
+def format_bytes(size):
+    """Human readable size, e.g. "1.2 GB" """
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit in ("B", "KB") else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def format_sample(sample):
+    """One line summary, e.g. "CPU 134% · RSS 1.8 GB · 212 FDs · 96 threads" """
+    return (f"CPU {sample.cpu:.0f}% · RSS {format_bytes(sample.rss)} · "
+            f"{sample.fds} FDs · {sample.threads} threads")
+
+
+def available():
+    """True when process trees can be sampled on this system"""
+    return psutil is not None or os.path.isdir("/proc/self/task")
+
+
+class _ProcTable:
+    """Snapshot of all processes from /proc: pid -> (ppid, start, cpu seconds, threads, rss bytes)"""
+
+    TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+    PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+    def __init__(self):
+        self.processes = {}
+        self.children = collections.defaultdict(list)
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", "rb") as f:
+                    stat = f.read()
+            except OSError:
+                continue
+            # Fields after the command name, which may contain spaces and parentheses
+            fields = stat[stat.rfind(b")") + 2:].split()
+            pid = int(entry)
+            ppid = int(fields[1])
+            cpu = (int(fields[11]) + int(fields[12])) / self.TICKS
+            self.processes[pid] = (ppid, int(fields[19]), cpu, int(fields[17]), int(fields[21]) * self.PAGE)
+            self.children[ppid].append(pid)
+
+    def tree(self, pid):
+        """pid and all its descendants that are still running"""
+        if pid not in self.processes:
+            return []
+        found, pending = [], [pid]
+        while pending:
+            current = pending.pop()
+            found.append(current)
+            pending.extend(self.children.get(current, ()))
+        return found
+
+    @staticmethod
+    def fds(pid):
+        try:
+            return len(os.listdir(f"/proc/{pid}/fd"))
+        except OSError:
+            return 0
+
+
+class RunResources:
+    """Samples and peaks of one monitored job"""
+
+    def __init__(self, history):
+        self.samples = collections.deque(maxlen=history)
+        self.peak = Sample()
+        self.count = 0
+
+    def record(self, sample):
+        self.samples.append(sample)
+        self.peak.peak(sample)
+        self.count += 1
+
+    def to_dict(self, interval):
+        return {
+            "interval_s": interval,
+            "samples": self.count,
+            "peak_cpu_percent": round(self.peak.cpu, 1),
+            "peak_rss_mb": round(self.peak.rss / (1024 * 1024), 1),
+            "peak_fds": self.peak.fds,
+            "peak_threads": self.peak.threads,
+            "peak_processes": self.peak.processes,
+        }
+
+
+class ResourceMonitor:
+    """Samples the process trees of tracked jobs on the orchestrator loop"""
+
+    def __init__(self, orchestrator, interval=1.0, history=120):
+        self.orchestrator = orchestrator
+        self.interval = interval
+        self.history = history
+        self._runs = {}
+        self._task = None
+        # (pid, start) -> cpu seconds at the previous sample, for CPU percentages
+        self._cpu = {}
+        self._sampled_at = None
+
+    def track(self, job):
+        """Loop thread: start sampling a job's processes"""
+        self._runs[job] = RunResources(self.history)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._sample_loop())
+
+    def untrack(self, job):
+        """Loop thread: stop sampling a job, returns its RunResources (None if it was not tracked)"""
+        return self._runs.pop(job, None)
+
+    def resources(self, job):
+        return self._runs.get(job)
+
+    async def _sample_loop(self):
+        while self._runs:
+            targets = [(job, job.pids()) for job in list(self._runs)]
+            samples = await self.orchestrator.to_thread(self.sample, targets)
+            totals = Sample()
+            for job, sample in samples.items():
+                resources = self._runs.get(job)
+                if resources is not None:
+                    resources.record(sample)
+                    totals.add(sample)
+            self.orchestrator.emit("resources", totals=totals,
+                                   runs={job.id: sample for job, sample in samples.items()})
+            await asyncio.sleep(self.interval)
+        self._cpu.clear()
+        self._sampled_at = None
+        self.orchestrator.emit("resources", totals=None, runs={})
+
+    def sample(self, targets):
+        """Sample [(job, pids)] (blocking), returns {job: Sample} for jobs with running processes"""
+        now = time.monotonic()
+        elapsed = now - self._sampled_at if self._sampled_at is not None else None
+        self._sampled_at = now
+        cpu_times = {}
+        samples = {}
+
+        if psutil is not None:
+            read = self._read_psutil
+        elif os.path.isdir("/proc/self/task"):
+            table = _ProcTable()
+            read = lambda pid: self._read_proc(table, pid)
+        else:
+            return samples
+
+        for job, pids in targets:
+            sample = Sample()
+            for pid in pids:
+                for key, cpu, tree_sample in read(pid):
+                    cpu_times[key] = cpu
+                    previous = self._cpu.get(key)
+                    if previous is not None and elapsed:
+                        # Processes seen for the first time count from the next sample on
+                        tree_sample.cpu = max(0.0, (cpu - previous) / elapsed * 100)
+                    sample.add(tree_sample)
+            if sample.processes:
+                samples[job] = sample
+
+        self._cpu = cpu_times
+        return samples
+
+    def _read_proc(self, table, pid):
+        for member in table.tree(pid):
+            _, start, cpu, threads, rss = table.processes[member]
+            yield (member, start), cpu, Sample(0.0, rss, table.fds(member), threads, 1)
+
+    def _read_psutil(self, pid):
+        try:
+            root = psutil.Process(pid)
+            members = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return
+        for process in members:
+            try:
+                with process.oneshot():
+                    times = process.cpu_times()
+                    fds = process.num_handles() if sys.platform == "win32" else process.num_fds()
+                    sample = Sample(0.0, process.memory_info().rss, fds, process.num_threads(), 1)
+                    key = (process.pid, process.create_time())
+            except psutil.Error:
+                continue
+            yield key, times.user + times.system, sample
+
+
+def write_resources(log_file, resources, interval):
+    """Write the peaks of a run next to its log, returns the file"""
+    path = log_file.with_suffix(RESOURCES_SUFFIX)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(resources.to_dict(interval), f, indent=2)
+    return path
@@ -0,0 +1,174 @@
+"""
+Optimiser for recorded scripts.
+Playwright codegen records every click and key press, including actions
+that only move the focus. Each one is a round trip to the browser. The
+pass removes whole statements only, keeping the rest of the source as
+recorded:
+
+- click() directly before fill() on the same locator (fill focuses itself)
+- a repeated click() on the same textbox
+- press("Tab") directly before an action on another element, which moves
+  the focus (and blurs this one) anyway
+
+Only actions on locators (get_by_*() and locator() chains) are compared;
+page.keyboard and page.mouse act on whatever has the focus, so the step
+before them always stays. Clicks on comboboxes stay too, they may open
+the list the next step picks from.
+"""
+
+import ast
+import difflib
+
+
+# Actions that focus their target element before acting on it
+FOCUSING_ACTIONS = {"click", "dblclick", "fill", "type", "press", "press_sequentially",
+                    "select_option", "check", "uncheck", "set_checked", "focus"}
+
+# Roles for which a second click only repeats the focus
+TEXT_ROLES = {"textbox", "searchbox", "spinbutton"}
+
+# Calls that create a locator
+LOCATOR_METHODS = {"locator", "get_by_role", "get_by_text", "get_by_label", "get_by_placeholder",
+                   "get_by_alt_text", "get_by_title", "get_by_test_id"}
+
+
+class Step:
+    """One recorded locator action statement"""
+
+    def __init__(self, node, locator, action, args):
+        self.node = node
+        self.locator = locator
+        self.action = action
+        self.args = args
+
+    @property
+    def plain(self):
+        """True for an action without arguments (no position, modifiers or options)"""
+        return not self.args
+
+
+def _is_locator(node):
+    """True for page.get_by_label(...), page.locator(...).first and the like"""
+    while isinstance(node, (ast.Call, ast.Attribute)):
+        if isinstance(node, ast.Call):
+            node = node.func
+            continue
+        if node.attr in LOCATOR_METHODS:
+            return True
+        node = node.value
+    return False
+
+
+def _role(call):
+    """Role of a get_by_role("...") locator, None for other locators"""
+    while isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute):
+        if call.func.attr == "get_by_role" and call.args and isinstance(call.args[0], ast.Constant):
+            return call.args[0].value
+        call = call.func.value
+    return None
+
+
+def _is_text_input(call):
+    """True for locators like get_by_role("textbox", ...) and get_by_label/placeholder"""
+    while isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute):
+        name = call.func.attr
+        if name in ("get_by_label", "get_by_placeholder"):
+            return True
+        if name == "get_by_role" and call.args and isinstance(call.args[0], ast.Constant):
+            return call.args[0].value in TEXT_ROLES
+        call = call.func.value
+    return False
+
+
+def _step(node):
+    """The locator action of a statement, None for anything else"""
+    if not isinstance(node, ast.Expr) or not isinstance(node.value, ast.Call):
+        return None
+    call = node.value
+    if not isinstance(call.func, ast.Attribute):
+        return None
+    receiver = call.func.value
+    # page.goto(...), page.keyboard.type(...) etc. act on the page, not on a located element
+    if not _is_locator(receiver):
+        return None
+    args = [ast.unparse(arg) for arg in call.args] + [ast.unparse(kw) for kw in call.keywords]
+    return Step(node, ast.unparse(receiver), call.func.attr, args)
+
+
+def _redundant(steps):
+    """Indexes of redundant steps in a run of consecutive statements, with the reason"""
+    for index, step in enumerate(steps):
+        following = steps[index + 1] if index + 1 < len(steps) else None
+        if step is None or following is None:
+            continue
+
+        if (step.action == "click" and step.plain and following.action == "fill"
+                and following.locator == step.locator and _role(step.node.value.func.value) != "combobox"):
+            return index, f"click before fill on {step.locator}"
+
+        if (step.action == "click" and step.plain and following.action == "click" and following.plain
+                and following.locator == step.locator and _is_text_input(step.node.value.func.value)):
+            return index, f"repeated click on {step.locator}"
+
+        if (step.action == "press" and step.args == ["'Tab'"] and following.action in FOCUSING_ACTIONS
+                and following.locator != step.locator):
+            return index, f"press Tab on {step.locator}"
+    return None
+
+
+def _bodies(tree):
+    """Every statement list in the module"""
+    for node in ast.walk(tree):
+        for field in ("body", "orelse", "finalbody"):
+            body = getattr(node, field, None)
+            if isinstance(body, list) and body and isinstance(body[0], ast.stmt):
+                yield body
+
+
+def find_redundant(source):
+    """[(first line, last line, reason)] of statements the optimiser would remove"""
+    tree = ast.parse(source)
+    lines = source.splitlines()
+    removed = []
+
+    for body in _bodies(tree):
+        # Only statements that have their lines to themselves can be removed
+        steps = [_step(node) if lines[node.lineno - 1][:node.col_offset].strip() == ""
+                 and (index + 1 == len(body) or body[index + 1].lineno > node.end_lineno) else None
+                 for index, node in enumerate(body)]
+        while True:
+            found = _redundant(steps)
+            if found is None:
+                break
+            index, reason = found
+            removed.append((steps[index].node.lineno, steps[index].node.end_lineno, reason))
+            del steps[index]
+
+    return sorted(removed)
+
+
+def optimize_script(source):
+    """Return (optimised source, [(line number, reason)]) for a recorded script"""
+    removed = find_redundant(source)
+    lines = source.splitlines(keepends=True)
+    drop = set()
+    for first, last, _ in removed:
+        drop.update(range(first - 1, last))
+    optimised = "".join(line for number, line in enumerate(lines) if number not in drop)
+    return optimised, [(first, reason) for first, _, reason in removed]
+
+
+def describe_saving(removed_count):
+    """Summary of an optimisation: the steps removed and the round trips that saves (an estimate,
+    one per removed step; nothing is measured)"""
+    if not removed_count:
+        return "Nothing to optimise"
+    return (f"{removed_count} step(s) removed, an estimated {removed_count} browser round trip(s) "
+            f"saved per run")
+
+
+def script_diff(original, optimised, name="script.py"):
+    """Unified diff between the recorded and the optimised script"""
+    return "".join(difflib.unified_diff(original.splitlines(keepends=True),
+                                        optimised.splitlines(keepends=True),
+                                        f"{name} (recorded)", f"{name} (optimised)"))
@@ -0,0 +1,268 @@
+"""
+Asyncio orchestration core.
+One event loop on its own thread owns every child process Crawly starts
+(scripts, codegen, environment setup), their output pipes and timeouts,
+so the number of threads stays the same however many runs are active.
+Other threads hand work to the loop with spawn()/call() and follow it
+through events: subscribers are called on the loop thread with
+(kind, data) and must pass the data on to their own thread (the GUI
+does so with root.after).
+
+Child processes start in their own process group (see crawly.proctree):
+terminating one terminates the browsers it launched too, and whatever
+is left of the group when the interpreter exits is killed.
+
+Events: "job" (a job changed state, see crawly.jobs), "process"
+(a child process started or exited), "task" (a spawned task finished),
+"status" (the executor's overall run state) and "resources" (see
+crawly.monitor).
+Work that still blocks (warm workers, remote runs, SQLite) goes to a
+bounded thread pool through to_thread().
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import sys
+import threading
+import traceback
+
+from .proctree import group_options, signal_tree
+
+
+# Longest output line read in one piece (asyncio's default is 64 KiB)
+LINE_LIMIT = 16 * 1024 * 1024
+
+
+def _watch_children_without_threads(loop):
+    """Use pidfds to wait for children where the default watcher needs a thread per child"""
+    # Python 3.12+ picks pidfds itself; before that the default starts a thread per process
+    if sys.platform == "win32" or sys.version_info >= (3, 12) or not hasattr(os, "pidfd_open"):
+        return
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except OSError:
+        # Kernel before 5.3
+        return
+    watcher = asyncio.PidfdChildWatcher()
+    watcher.attach_loop(loop)
+    asyncio.set_child_watcher(watcher)
+
+
+class ProcessHandle:
+    """Thread-safe view of a loop-owned child process (poll/terminate/kill like Popen).
+
+    terminate() and kill() signal the whole process group; a terminated group that
+    is still running after kill_grace seconds is killed.
+    """
+
+    def __init__(self, loop, process, name=None, kill_grace=5.0):
+        self._loop = loop
+        self._process = process
+        self.name = name
+        self.pid = process.pid
+        self.kill_grace = kill_grace
+
+    @property
+    def returncode(self):
+        return self._process.returncode
+
+    def poll(self):
+        return self._process.returncode
+
+    def _signal(self, force):
+        """Loop thread: signal the group while its leader runs"""
+        if self._process.returncode is None:
+            signal_tree(self.pid, force)
+            if not force and self.kill_grace is not None:
+                self._loop.call_later(self.kill_grace, self._signal, True)
+
+    def terminate(self):
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._signal, False)
+
+    def kill(self):
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._signal, True)
+
+
+class Orchestrator:
+    """Event loop thread running child processes and other asynchronous work"""
+
+    def __init__(self, blocking_workers=None):
+        self.loop = None
+        self._thread = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+        self._subscribers = []
+        # Pool for work that cannot be made asynchronous
+        self._blocking = concurrent.futures.ThreadPoolExecutor(
+            max_workers=blocking_workers or min(64, (os.cpu_count() or 1) * 4),
+            thread_name_prefix="crawly-blocking")
+
+    def start(self):
+        """Start the loop thread (idempotent)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="crawly-orchestrator", daemon=True)
+                self._thread.start()
+        self._started.wait()
+        return self
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        _watch_children_without_threads(self.loop)
+        self.loop.set_default_executor(self._blocking)
+        self._started.set()
+        self.loop.run_forever()
+
+    @property
+    def in_loop(self):
+        """True when called on the loop thread"""
+        return threading.current_thread() is self._thread
+
+    def stop(self):
+        """Stop the loop; running tasks are abandoned"""
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=5)
+        self._blocking.shutdown(wait=False)
+
+    # Handing work to the loop
+
+    def spawn(self, coro, name=None):
+        """Run a coroutine on the loop, returns a concurrent.futures.Future; emits "task" when done"""
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if name:
+            def done(future):
+                error = None if future.cancelled() else future.exception()
+                result = None if future.cancelled() or error else future.result()
+                self.emit("task", name=name, result=result, error=error)
+            future.add_done_callback(done)
+        return future
+
+    def call(self, coro, timeout=None):
+        """Run a coroutine on the loop and wait for its result (not from the loop thread)"""
+        if self.in_loop:
+            raise RuntimeError("Orchestrator.call() would block its own loop, await the coroutine instead")
+        return self.spawn(coro).result(timeout)
+
+    def call_soon(self, callback, *args):
+        """Call a function on the loop thread"""
+        self.start()
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    async def to_thread(self, func, *args):
+        """Run blocking work in the bounded pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._blocking, func, *args)
+
+    # Events
+
+    def subscribe(self, callback):
+        """Call callback(kind, data) on the loop thread for every event"""
+        with self._lock:
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def emit(self, kind, **data):
+        """Notify all subscribers of an event"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(kind, data)
+            except Exception:
+                # One broken listener must not stop the others (or the loop)
+                traceback.print_exc()
+
+    # Child processes
+
+    async def run_process(self, cmd, on_line, env=None, cwd=None, timeout=None, on_start=None, name=None,
+                          kill_grace=5.0, limits=None):
+        """Run a command, passing every output line (stdout and stderr) to on_line.
+
+        Returns the exit code; after `timeout` seconds the process tree is killed and
+        None is returned. on_start(handle) receives a ProcessHandle as soon as it runs.
+        limits (a crawly.proctree.ResourceLimits) are set in the child before it executes.
+        """
+        preexec_fn = cgroup = None
+        if limits:
+            try:
+                preexec_fn, cgroup = limits.prepare()
+            except OSError as e:
+                on_line(f"Resource limits not applied: {e}")
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *[str(arg) for arg in cmd],
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                env=env,
+                cwd=cwd,
+                limit=LINE_LIMIT,
+                preexec_fn=preexec_fn,
+                **group_options(),
+            )
+        except BaseException:
+            if cgroup is not None:
+                cgroup.close_procs()
+                cgroup.remove()
+            raise
+        if cgroup is not None:
+            cgroup.close_procs()
+        handle = ProcessHandle(asyncio.get_running_loop(), process, name, kill_grace)
+        self.emit("process", state="started", pid=process.pid, name=name)
+        if on_start:
+            on_start(handle)
+
+        async def pump():
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                on_line(line.decode("utf-8", errors="replace"))
+            return await process.wait()
+
+        try:
+            returncode = await asyncio.wait_for(pump(), timeout)
+        except asyncio.TimeoutError:
+            on_line(f"Timed out after {timeout}s, process killed")
+            handle._signal(True)
+            await process.wait()
+            returncode = None
+        finally:
+            if process.returncode is None:
+                # Cancelled while running
+                handle._signal(True)
+                await process.wait()
+            if sys.platform != "win32":
+                # Browsers the interpreter left behind still carry its process group
+                signal_tree(process.pid, force=True)
+            if cgroup is not None:
+                cgroup.kill()
+                for _ in range(50):
+                    if cgroup.remove():
+                        break
+                    await asyncio.sleep(0.1)
+            self.emit("process", state="exited", pid=process.pid, name=name, returncode=process.returncode)
+        return returncode
+
+
+_orchestrator = None
+_orchestrator_lock = threading.Lock()
+
+
+def get_orchestrator():
+    """The process-wide orchestrator, started on first use"""
+    global _orchestrator
+    with _orchestrator_lock:
+        if _orchestrator is None:
+            _orchestrator = Orchestrator()
+    return _orchestrator.start()
@@ -0,0 +1,82 @@
+"""
+Data-driven script parameters.
+A script declares its parameters with defaults as a module level dict:
+
+    PARAMS = {"postcode": "1234AB", "quantity": 1}
+
+and reads them inside run(playwright). A data run streams rows from a CSV
+(header = parameter names) or JSONL file; every row runs the script once
+in a warm worker, with PARAMS updated from the row and fresh browser
+contexts. Row values are converted to the type of the declared default.
+"""
+
+import ast
+import csv
+import json
+from pathlib import Path
+
+
+DATA_SUFFIXES = (".csv", ".jsonl")
+
+
+def declared_params(source):
+    """The PARAMS dict literal of a script, None when it declares none"""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+                isinstance(target, ast.Name) and target.id == "PARAMS" for target in node.targets):
+            try:
+                value = ast.literal_eval(node.value)
+            except ValueError:
+                return {}
+            return value if isinstance(value, dict) else None
+    return None
+
+
+def read_rows(path):
+    """Yield one parameter dict per row of a .csv or .jsonl file, without reading it all"""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                yield row
+    elif path.suffix.lower() == ".jsonl":
+        with open(path, 'r', encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path.name} line {number}: {e}")
+                if not isinstance(row, dict):
+                    raise ValueError(f"{path.name} line {number}: expected a JSON object")
+                yield row
+    else:
+        raise ValueError(f"unsupported data file {path.name} (use {' or '.join(DATA_SUFFIXES)})")
+
+
+def _convert(value, default):
+    """Convert a CSV string to the type of the declared default"""
+    if not isinstance(value, str) or default is None or isinstance(default, str):
+        return value
+    if isinstance(default, bool):
+        return value.strip().lower() in ("1", "true", "yes", "y", "on")
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    return value
+
+
+def coerce_row(row, defaults):
+    """Parameters for one run: the declared defaults updated with the row"""
+    params = dict(defaults or {})
+    for name, value in row.items():
+        if name is None:
+            raise ValueError(f"row has more values than columns: {row[None]}")
+        params[name] = _convert(value, params.get(name))
+    return params
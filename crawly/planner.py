@@ -0,0 +1,117 @@
+"""
+Duration-aware batch planning.
+Scripts of a batch are queued longest first (by the median of their past
+durations in the run history), so the run queue's workers, which take
+the next job as soon as they are free, pack the batch like a longest
+processing time schedule instead of idling behind one long script at the
+end. The same estimates give a live ETA for the rest of the batch: the
+queue is simulated from the elapsed time of running jobs, once with the
+medians (p50) and once with the p95 durations.
+"""
+
+import heapq
+import statistics
+import time
+
+from .jobs import RUNNING
+
+
+def percentile(values, fraction):
+    """Linearly interpolated percentile of a non-empty list"""
+    values = sorted(values)
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class Estimate:
+    """Expected (p50) and pessimistic (p95) duration of a script in seconds"""
+
+    def __init__(self, p50, p95, samples):
+        self.p50 = p50
+        self.p95 = p95
+        # Number of past runs behind the estimate (0 = guessed from other scripts)
+        self.samples = samples
+
+
+def estimate_durations(history, scripts, limit=50):
+    """Estimate per script from its last successful runs; unknown scripts get the median of the rest"""
+    estimates = {}
+    for script_name in scripts:
+        durations = history.durations(script_name, limit)
+        if durations:
+            estimates[script_name] = Estimate(percentile(durations, 0.5), percentile(durations, 0.95),
+                                              len(durations))
+
+    if estimates:
+        p50 = statistics.median(estimate.p50 for estimate in estimates.values())
+        p95 = statistics.median(estimate.p95 for estimate in estimates.values())
+        for script_name in scripts:
+            estimates.setdefault(script_name, Estimate(p50, p95, 0))
+    return estimates
+
+
+def longest_first(scripts, estimates):
+    """Scripts ordered by expected duration, longest first (stable for equal or missing estimates)"""
+    if not estimates:
+        return list(scripts)
+    return sorted(scripts, key=lambda name: -estimates[name].p50 if name in estimates else 0)
+
+
+def _makespan(running, queued, workers):
+    """Time until a list schedule of the queued durations finishes after the running remainders"""
+    free_at = list(running)
+    free_at += [0.0] * (workers - len(free_at))
+    heapq.heapify(free_at)
+    for duration in queued:
+        heapq.heappush(free_at, heapq.heappop(free_at) + duration)
+    return max(free_at, default=0.0)
+
+
+class BatchPlan:
+    """A batch queued longest first, with its remaining time"""
+
+    def __init__(self, jobs, estimates, workers):
+        self.jobs = jobs
+        self.estimates = estimates
+        self.workers = workers
+
+    @property
+    def finished(self):
+        return all(job.finished for job in self.jobs)
+
+    def remaining(self, workers=None, now=None):
+        """(p50, p95) seconds until the batch is done, None without estimates"""
+        if not self.estimates:
+            return None
+        now = time.monotonic() if now is None else now
+        workers = max(1, workers or self.workers)
+        result = []
+        for field in ("p50", "p95"):
+            running, queued = [], []
+            for job in self.jobs:
+                estimate = self.estimates.get(job.script_name)
+                if job.finished or estimate is None:
+                    continue
+                duration = getattr(estimate, field)
+                if job.status == RUNNING and job.started_at is not None:
+                    # A run past its estimate is assumed to be nearly done
+                    running.append(max(duration - (now - job.started_at), 1.0))
+                else:
+                    queued.append(duration)
+            result.append(_makespan(running, queued, workers))
+        return tuple(result)
+
+
+def format_eta(remaining):
+    """Human readable remaining time, e.g. "ETA 3m 20s (p95 4m 05s)" """
+    if remaining is None:
+        return ""
+
+    def minutes(seconds):
+        seconds = int(round(seconds))
+        return f"{seconds // 60}m {seconds % 60:02d}s" if seconds >= 60 else f"{seconds}s"
+
+    p50, p95 = remaining
+    return f"ETA {minutes(p50)} (p95 {minutes(p95)})"
@@ -0,0 +1,169 @@
+"""
+Process trees of child runs.
+Every script interpreter and warm worker starts in its own process group
+(a new session on POSIX, CREATE_NEW_PROCESS_GROUP on Windows), so stopping
+a run reaches the browsers it launched instead of leaving them orphaned:
+killpg() on POSIX, `taskkill /T` on Windows.
+
+Optional per-run limits: a CPU time rlimit per process (POSIX), and with a
+delegated cgroup v2 directory a memory and CPU cap for the whole tree. Both
+are set in the child between fork and exec, so no instruction of the run
+escapes them.
+"""
+
+import os
+import signal
+import subprocess
+import sys
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def group_options():
+    """Popen/create_subprocess_exec arguments starting the child in its own process group"""
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def signal_tree(pid, force=False):
+    """Terminate (or kill) the process group led by pid, including processes its leader left behind"""
+    if sys.platform == "win32":
+        # taskkill walks the child tree; started without waiting so the caller never blocks
+        cmd = ["taskkill", "/T", "/PID", str(pid)] + (["/F"] if force else [])
+        subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return
+    try:
+        os.killpg(pid, signal.SIGKILL if force else signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        # Group already gone
+        pass
+
+
+class GroupPopen(subprocess.Popen):
+    """Popen in its own process group; terminate() and kill() reach the whole tree"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs, **group_options())
+
+    def terminate(self):
+        if self.poll() is None:
+            signal_tree(self.pid)
+
+    def kill(self):
+        if self.poll() is None:
+            signal_tree(self.pid, force=True)
+
+
+class RunCgroup:
+    """A cgroup v2 directory holding the process tree of one run"""
+
+    def __init__(self, parent, name, memory_mb=None, cpu_percent=None):
+        self.path = Path(parent) / name
+        self.path.mkdir()
+        self._procs_fd = None
+        if memory_mb:
+            (self.path / "memory.max").write_text(str(int(memory_mb * 1024 * 1024)))
+        if cpu_percent:
+            # Quota per 100ms period; 100 percent is one core
+            (self.path / "cpu.max").write_text(f"{int(cpu_percent * 1000)} 100000")
+
+    def add(self, pid):
+        (self.path / "cgroup.procs").write_text(str(pid))
+
+    def open_procs(self):
+        """Open cgroup.procs ahead of a fork; the child joins by writing to it (see join)"""
+        self._procs_fd = os.open(self.path / "cgroup.procs", os.O_WRONLY)
+
+    def join(self):
+        """Child between fork and exec: move the calling process into the cgroup"""
+        os.write(self._procs_fd, b"0")
+
+    def close_procs(self):
+        """Parent after the fork: the child has joined (or failed to)"""
+        if self._procs_fd is not None:
+            os.close(self._procs_fd)
+            self._procs_fd = None
+
+    def kill(self):
+        """Kill everything still in the cgroup (kernel 5.14+)"""
+        try:
+            (self.path / "cgroup.kill").write_text("1")
+        except OSError:
+            pass
+
+    def remove(self):
+        """Remove the cgroup, False while processes are still leaving it"""
+        try:
+            self.path.rmdir()
+            return True
+        except FileNotFoundError:
+            return True
+        except OSError:
+            return False
+
+
+class ResourceLimits:
+    """Per-run resource limits from the run_* settings"""
+
+    def __init__(self, cpu_seconds=None, memory_mb=None, cpu_percent=None, cgroup=None):
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.cpu_percent = cpu_percent
+        self.cgroup = cgroup
+        self._runs = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config["run_cpu_seconds"], config["run_memory_mb"], config["run_cpu_percent"],
+                   config["run_cgroup"])
+
+    def __bool__(self):
+        return bool(self.cpu_seconds or self.memory_mb or self.cpu_percent)
+
+    def problems(self):
+        """Settings that cannot be enforced on this system"""
+        problems = []
+        if self.cpu_seconds and resource is None:
+            problems.append("run_cpu_seconds needs a POSIX system, not enforced")
+        if (self.memory_mb or self.cpu_percent) and not self.cgroup:
+            problems.append("run_memory_mb/run_cpu_percent need run_cgroup (a delegated cgroup v2 "
+                            "directory), not enforced")
+        return problems
+
+    def prepare(self):
+        """(preexec_fn, RunCgroup) for the next run, either None when it does not apply.
+
+        preexec_fn runs in the child before exec: it sets the CPU rlimit (inherited by
+        the browsers the script launches) and joins the cgroup. Close the cgroup's
+        procs handle (RunCgroup.close_procs) once the child is started.
+        """
+        cpu_limit = int(self.cpu_seconds) if self.cpu_seconds and resource is not None else None
+        group = None
+        if self.cgroup and (self.memory_mb or self.cpu_percent):
+            self._runs += 1
+            group = RunCgroup(self.cgroup, f"crawly-{os.getpid()}-{self._runs}", self.memory_mb,
+                              self.cpu_percent)
+            try:
+                group.open_procs()
+            except OSError:
+                group.remove()
+                raise
+        if cpu_limit is None and group is None:
+            return None, None
+
+        def preexec():
+            # Only plain system calls: the parent is multithreaded
+            if cpu_limit is not None:
+                resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, cpu_limit))
+            if group is not None:
+                try:
+                    group.join()
+                except OSError:
+                    # Start unconfined rather than not at all
+                    pass
+        return preexec, group
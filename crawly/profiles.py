@@ -0,0 +1,56 @@
+"""
+Execution profiles.
+A profile changes how recorded scripts run without editing the script
+files: it can force headless mode and abort requests for resource types
+(images, media, fonts) or third-party analytics hosts. Profiles are
+applied inside the script process by crawly.hooks.
+"""
+
+
+# Hosts of common third-party analytics and tracking services
+ANALYTICS_DOMAINS = [
+    "google-analytics.com",
+    "analytics.google.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googleadservices.com",
+    "facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+    "px.ads.linkedin.com",
+    "snap.licdn.com",
+    "bat.bing.com",
+    "leadinfo.net",
+]
+
+# Built-in profiles; crawly.json can add or override them under "profiles"
+PROFILES = {
+    # Run scripts exactly as recorded
+    "default": {},
+    # Force headless mode
+    "headless": {
+        "headless": True,
+    },
+    # Headless without images, media, fonts and analytics
+    "fast": {
+        "headless": True,
+        "block_resource_types": ["image", "media", "font"],
+        "block_domains": ANALYTICS_DOMAINS,
+    },
+}
+
+
+def available_profiles(config):
+    """Names of the built-in and configured profiles"""
+    return list(dict.fromkeys(list(PROFILES) + list(config.get("profiles", {}))))
+
+
+def resolve_profile(config, name=None):
+    """Settings of the named profile (default: the configured profile)"""
+    name = name or config.get("profile") or "default"
+    profiles = dict(PROFILES)
+    profiles.update(config.get("profiles", {}))
+
+    if name not in profiles:
+        raise ValueError(f"Unknown execution profile: {name}")
+    return dict(profiles[name])
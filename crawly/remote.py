@@ -0,0 +1,353 @@
+"""
+Remote workers.
+A worker machine runs `python -m crawly serve`, which accepts runs over
+TCP and executes them with its own venv and browsers; the manager (GUI or
+CLI) dispatches scripts to a list of workers instead of starting local
+interpreters. Output streams back line by line into the manager's log
+view and log files; the run history stays on the manager.
+
+Protocol: one JSON object per line, one connection per run. The manager
+sends {"cmd": "hello"} or {"cmd": "run", "script": name, "hash": ...,
+"source": ..., "options": {...}}, plus "token" when the worker requires
+one; the worker answers with {"event": "ready", "slots": n, "active": n},
+"output" events and a final "done" (or "error"). Closing the connection
+cancels the run.
+
+A worker runs whatever source it is sent, so it only listens on other
+addresses than loopback when a token is set.
+
+Runs go to the worker with the most free slots; when a worker cannot be
+reached or drops the connection, the run is retried on another worker
+and the failing one is skipped for a while.
+"""
+
+import hmac
+import ipaddress
+import json
+import re
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+
+from .jobs import Job
+from .warm import UnsupportedScript, WorkerError
+
+
+PROTOCOL_VERSION = 1
+DEFAULT_PORT = 8765
+
+# Directory (in the worker's project) holding the script versions it received
+REMOTE_SCRIPTS_DIR = "remote"
+
+# Run options that are meaningful on another machine; file paths of the manager are not
+REMOTE_OPTIONS = ("profile", "params")
+
+
+class RemoteError(Exception):
+    """A remote worker could not be reached or broke off a run"""
+
+
+def is_loopback(host):
+    """True when host only resolves to loopback addresses"""
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, None)}
+    except (socket.gaierror, UnicodeError):
+        return False
+    return bool(addresses) and all(ipaddress.ip_address(address.split("%")[0]).is_loopback
+                                   for address in addresses)
+
+
+def parse_address(address):
+    """(host, port) of "host:port" or "host" (default port)"""
+    host, _, port = address.rpartition(":")
+    if not host:
+        return address, DEFAULT_PORT
+    return host, int(port)
+
+
+def _send(wfile, data):
+    wfile.write((json.dumps(data) + "\n").encode("utf-8"))
+    wfile.flush()
+
+
+# Worker side
+
+class _RunHandler(socketserver.StreamRequestHandler):
+    """One connection: a hello or a single run"""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except ValueError:
+            _send(self.wfile, {"event": "error", "message": "malformed request"})
+            return
+
+        server = self.server
+        if server.token and not hmac.compare_digest(str(request.get("token") or "").encode("utf-8"),
+                                                    server.token.encode("utf-8")):
+            _send(self.wfile, {"event": "error", "message": "invalid token"})
+            return
+
+        if request.get("cmd") == "hello":
+            _send(self.wfile, {"event": "ready", "version": PROTOCOL_VERSION,
+                               "slots": server.slots, "active": server.active})
+        elif request.get("cmd") == "run":
+            server.run(request, self.rfile, self.wfile)
+        else:
+            _send(self.wfile, {"event": "error", "message": f"unknown command {request.get('cmd')!r}"})
+
+
+class WorkerServer(socketserver.ThreadingTCPServer):
+    """Executes runs sent by a manager, at most `slots` at a time"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, executor, slots, token=None):
+        super().__init__(address, _RunHandler)
+        self.executor = executor
+        self.slots = slots
+        self.token = token
+        self.active = 0
+        self._slots = threading.Semaphore(slots)
+        self._lock = threading.Lock()
+
+    def store_script(self, script_name, digest, source):
+        """Write a received script version to disk, returns its path"""
+        # The digest names a directory: only a sha256 hex digest may reach the file system
+        if not isinstance(digest, str) or not re.fullmatch(r"[0-9a-f]{64}", digest):
+            raise RemoteError("invalid script hash")
+        folder = self.executor.project_root / REMOTE_SCRIPTS_DIR / digest[:16]
+        script_path = folder / f"{Path(script_name).name}.py"
+        if not script_path.exists():
+            folder.mkdir(parents=True, exist_ok=True)
+            script_path.write_text(source, encoding="utf-8")
+        return script_path
+
+    def run(self, request, rfile, wfile):
+        """Execute one run request, streaming its output back"""
+        script_name = request["script"]
+        source = request["source"]
+        digest = request["hash"]
+        options = {key: value for key, value in (request.get("options") or {}).items()
+                   if key in REMOTE_OPTIONS}
+        job = Job(script_name)
+        send_lock = threading.Lock()
+
+        def handle_line(line):
+            with send_lock:
+                _send(wfile, {"event": "output", "text": line.rstrip("\n")})
+
+        def watch_connection():
+            # The manager closes the connection to cancel the run
+            try:
+                while rfile.readline():
+                    pass
+            except OSError:
+                pass
+            job.cancel()
+
+        threading.Thread(target=watch_connection, daemon=True).start()
+
+        with self._slots:
+            with self._lock:
+                self.active += 1
+            try:
+                script_path = self.store_script(script_name, digest, source)
+                self.executor.log(f"Running {script_name} for {request.get('client', 'manager')}")
+                returncode = None
+                ran_warm = False
+                if self.executor.warm:
+                    try:
+                        returncode = self.executor.run_in_warm_worker(job, script_path, handle_line,
+                                                                      options, digest, source)
+                        ran_warm = True
+                    except (UnsupportedScript, WorkerError) as e:
+                        handle_line(f"Warm browser not possible ({e}), using a new interpreter")
+                if not ran_warm and not job.cancelled:
+                    returncode = self.executor.run_in_process(job, script_path, handle_line, options)
+                with send_lock:
+                    _send(wfile, {"event": "done", "returncode": returncode})
+            except RemoteError as e:
+                with send_lock:
+                    _send(wfile, {"event": "error", "message": str(e)})
+                job.cancel()
+            except OSError:
+                # Connection lost: the watcher cancels the job
+                job.cancel()
+            finally:
+                with self._lock:
+                    self.active -= 1
+
+
+def serve(executor, host="127.0.0.1", port=DEFAULT_PORT, slots=1, token=None):
+    """Serve runs until interrupted; other hosts than loopback need a token"""
+    if not token and not is_loopback(host):
+        raise ValueError(f"refusing to accept runs on {host} without a token (set --token or remote_token)")
+    with WorkerServer((host, port), executor, slots, token) as server:
+        executor.log(f"Crawly worker listening on {host}:{server.server_address[1]} with {slots} slot(s)")
+        try:
+            server.serve_forever()
+        finally:
+            executor.shutdown()
+
+
+# Manager side
+
+class RemoteRun:
+    """Handle of a run on a remote worker; terminate() cancels it (see Job.cancel)"""
+
+    def __init__(self, sock):
+        self._sock = sock
+        self._closed = False
+
+    def poll(self):
+        return 0 if self._closed else None
+
+    def terminate(self):
+        if not self._closed:
+            self._closed = True
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    kill = terminate
+
+
+class RemoteWorker:
+    """A worker address with its advertised and used capacity"""
+
+    def __init__(self, address):
+        self.address = address
+        self.slots = None
+        self.active = 0
+        self.down_until = 0.0
+
+    @property
+    def free(self):
+        return (self.slots or 1) - self.active
+
+
+class RemotePool:
+    """Dispatches runs over remote workers with load balancing and retries"""
+
+    def __init__(self, addresses, token=None, retries=2, connect_timeout=5.0, retry_delay=30.0):
+        self.workers = [RemoteWorker(address) for address in addresses]
+        self.token = token
+        self.retries = retries
+        self.connect_timeout = connect_timeout
+        self.retry_delay = retry_delay
+        self._condition = threading.Condition()
+        self._client = socket.gethostname()
+
+    def _connect(self, worker, request):
+        """Open a connection to a worker and send a request"""
+        sock = socket.create_connection(parse_address(worker.address), timeout=self.connect_timeout)
+        sock.settimeout(None)
+        if self.token:
+            request = dict(request, token=self.token)
+        sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        return sock
+
+    def _events(self, sock):
+        """Protocol events read from a connection"""
+        with sock.makefile("r", encoding="utf-8") as rfile:
+            for line in rfile:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event.get("event") == "error":
+                    raise RemoteError(event.get("message", "worker error"))
+                yield event
+
+    def probe(self, worker):
+        """Ask a worker for its capacity, marks it down when unreachable"""
+        try:
+            with self._connect(worker, {"cmd": "hello"}) as sock:
+                event = next(self._events(sock), None)
+            if event is None:
+                raise RemoteError("no answer")
+            worker.slots = max(1, int(event.get("slots", 1)))
+            return True
+        except (OSError, ValueError, RemoteError):
+            worker.down_until = time.monotonic() + self.retry_delay
+            return False
+
+    def acquire(self, exclude=()):
+        """Reserve a slot on the least busy reachable worker, waiting while all are busy"""
+        for worker in self.workers:
+            if worker.slots is None and worker.down_until <= time.monotonic():
+                self.probe(worker)
+
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                candidates = [worker for worker in self.workers
+                              if worker.slots is not None and worker.down_until <= now
+                              and worker.address not in exclude]
+                if not candidates:
+                    candidates = [worker for worker in self.workers
+                                  if worker.slots is not None and worker.down_until <= now]
+                if not candidates:
+                    raise RemoteError("no remote worker reachable: " +
+                                      ", ".join(worker.address for worker in self.workers))
+                worker = max(candidates, key=lambda worker: worker.free)
+                if worker.free > 0:
+                    worker.active += 1
+                    return worker
+                self._condition.wait(1.0)
+
+    def release(self, worker, failed=False):
+        """Free a slot; a failed worker is skipped until retry_delay has passed"""
+        with self._condition:
+            worker.active -= 1
+            if failed:
+                worker.down_until = time.monotonic() + self.retry_delay
+                worker.slots = None
+            self._condition.notify_all()
+
+    def run(self, job, script_name, on_line, options, digest, source):
+        """Run a script remotely, retrying on other workers; returns its exit code"""
+        request = {"cmd": "run", "script": script_name, "hash": digest, "source": source,
+                   "client": self._client,
+                   "options": {key: value for key, value in (options or {}).items()
+                               if key in REMOTE_OPTIONS}}
+        failed = []
+        for attempt in range(self.retries + 1):
+            worker = self.acquire(exclude=failed)
+            on_line(f"Running on {worker.address}" + (f" (attempt {attempt + 1})" if attempt else ""))
+            handle = None
+            try:
+                sock = self._connect(worker, request)
+                handle = RemoteRun(sock)
+                job.attach_process(handle)
+                with sock:
+                    for event in self._events(sock):
+                        if event.get("event") == "output":
+                            on_line(event.get("text", ""))
+                        elif event.get("event") == "done":
+                            self.release(worker)
+                            return event.get("returncode")
+                if job.cancelled or job.timed_out:
+                    self.release(worker)
+                    return None
+                raise RemoteError("connection closed during the run")
+            except (OSError, RemoteError) as e:
+                if job.cancelled or job.timed_out:
+                    # Stopped by the user or the watchdog closing the connection, the worker is fine
+                    self.release(worker)
+                    return None
+                self.release(worker, failed=True)
+                failed.append(worker.address)
+                on_line(f"Remote worker {worker.address} failed: {e}")
+            finally:
+                if handle is not None:
+                    job.detach_process(handle)
+        raise RemoteError(f"{script_name} failed on {self.retries + 1} remote attempt(s)")
@@ -0,0 +1,188 @@
+"""
+Log retention for the logs/ directory.
+Finished run logs are compressed in the background (gzip, or zstd when the
+optional zstandard package is installed) and old logs are removed once
+they exceed the configured age, count or total size. The run history is
+kept in sync, and open_log() reads plain and compressed logs alike as a
+text stream.
+"""
+
+import gzip
+import io
+import shutil
+import threading
+import time
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Suffixes of files belonging to a run: text log, step timings, data run report and resource peaks
+RUN_SUFFIXES = (".txt", ".steps.jsonl", ".report.json", ".resources.json")
+COMPRESSED_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def run_key(path):
+    """Name shared by all files of one run (log file name without suffixes)"""
+    name = Path(path).name
+    for suffix in RUN_SUFFIXES:
+        index = name.find(suffix)
+        if index > 0:
+            return name[:index]
+    return None
+
+
+def open_log(path):
+    """Open a plain or compressed log file as a text stream (decompressed while reading)"""
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise OSError("reading .zst logs requires the zstandard package")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+class LogRetention:
+    """Compresses finished logs and enforces age, count and size limits"""
+
+    def __init__(self, logs_dir, history=None, compression="gzip", compress_after=60,
+                 max_age_days=None, max_count=None, max_total_mb=None):
+        self.logs_dir = Path(logs_dir)
+        self.history = history
+        if compression == "zstd" and zstandard is None:
+            compression = "gzip"
+        self.compression = compression if compression in COMPRESSED_SUFFIXES else None
+        self.compress_after = compress_after
+        self.max_age_days = max_age_days
+        self.max_count = max_count
+        self.max_total_mb = max_total_mb
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, logs_dir, history, config):
+        """Create a retention policy from the log_* settings"""
+        return cls(logs_dir, history,
+                   compression=config["log_compression"],
+                   compress_after=config["log_compress_after"],
+                   max_age_days=config["log_max_age_days"],
+                   max_count=config["log_max_count"],
+                   max_total_mb=config["log_max_total_mb"])
+
+    def start(self, interval, active_files=None):
+        """Run the retention pass every interval seconds in a background thread"""
+        if self._thread is not None:
+            return
+
+        def loop():
+            while True:
+                self._wake.wait(interval)
+                self._wake.clear()
+                try:
+                    self.run_once(active_files() if active_files else ())
+                except Exception:
+                    pass
+
+        self._thread = threading.Thread(target=loop, daemon=True)
+        self._thread.start()
+
+    def trigger(self):
+        """Ask the background thread for a pass soon"""
+        self._wake.set()
+
+    def run_once(self, active_files=()):
+        """Compress finished logs and remove the ones over the limits, returns (compressed, removed)"""
+        with self._lock:
+            active = {str(path) for path in active_files}
+            compressed = self.compress_finished(active) if self.compression else 0
+            removed = self.enforce_limits(active)
+            return compressed, removed
+
+    def _run_files(self):
+        """Files in logs/ that belong to runs"""
+        if not self.logs_dir.exists():
+            return []
+        return [path for path in self.logs_dir.iterdir() if path.is_file() and run_key(path)]
+
+    def compress_finished(self, active=()):
+        """Compress uncompressed run files that are no longer written to"""
+        suffix = COMPRESSED_SUFFIXES[self.compression]
+        cutoff = time.time() - self.compress_after
+        count = 0
+
+        for path in self._run_files():
+            if path.name.endswith(RUN_SUFFIXES) and str(path) not in active:
+                try:
+                    if path.stat().st_mtime > cutoff:
+                        continue
+                    target = path.with_name(path.name + suffix)
+                    self._compress(path, target)
+                    path.unlink()
+                except OSError:
+                    continue
+                if self.history:
+                    self.history.update_log_file(path, target)
+                count += 1
+        return count
+
+    def _compress(self, source, target):
+        """Compress one file, writing to a temporary name first"""
+        partial = target.with_name(target.name + ".part")
+        with open(source, 'rb') as src, open(partial, 'wb') as raw:
+            if self.compression == "zstd":
+                zstandard.ZstdCompressor().copy_stream(src, raw)
+            else:
+                with gzip.GzipFile(fileobj=raw, mode='wb') as dst:
+                    shutil.copyfileobj(src, dst)
+        # Keep the original modification time, retention orders runs by it
+        shutil.copystat(source, partial)
+        partial.replace(target)
+
+    def enforce_limits(self, active=()):
+        """Remove the oldest runs beyond the age, count and total size limits"""
+        runs = {}
+        for path in self._run_files():
+            if path.name.endswith(".part"):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entry = runs.setdefault(run_key(path), {"files": [], "mtime": 0, "size": 0, "active": False})
+            entry["files"].append(path)
+            entry["mtime"] = max(entry["mtime"], stat.st_mtime)
+            entry["size"] += stat.st_size
+            entry["active"] = entry["active"] or str(path) in active
+
+        # Oldest first; runs still being written are never removed
+        ordered = sorted((run for run in runs.values() if not run["active"]), key=lambda run: run["mtime"])
+        total_size = sum(run["size"] for run in runs.values())
+        count = len(runs)
+        remove = []
+
+        for run in ordered:
+            too_old = self.max_age_days is not None and run["mtime"] < time.time() - self.max_age_days * 86400
+            too_many = self.max_count is not None and count > self.max_count
+            too_big = self.max_total_mb is not None and total_size > self.max_total_mb * 1024 * 1024
+            if not (too_old or too_many or too_big):
+                continue
+            remove.append(run)
+            count -= 1
+            total_size -= run["size"]
+
+        for run in remove:
+            for path in run["files"]:
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                if self.history:
+                    self.history.update_log_file(path, None)
+        return len(remove)
@@ -0,0 +1,89 @@
+"""
+Retry policy for flaky runs.
+A failed run is queued again (after an exponential backoff, without
+holding a worker meanwhile) when its output shows a transient cause: a
+timeout or a network error, matched by the retry_patterns regexes. Other
+failures, such as assertion errors or scripts that do not parse, fail
+straight away. The next attempt goes through the same executor, so it
+reuses the warm workers, browsers and caches of the batch.
+
+At the end of a batch, runs that passed only after a retry are reported
+as flaky and runs that failed every attempt (or could not be retried) as
+hard failures.
+"""
+
+import re
+
+from .jobs import CANCELLED, COMPLETED
+
+
+# Output of transient failures: Playwright/asyncio timeouts, the run watchdog and network errors
+DEFAULT_PATTERNS = [
+    r"TimeoutError",
+    r"Timeout \d+ms exceeded",
+    r"^Timed out: .*",
+    r"net::ERR_\w+",
+    r"ECONNRESET|ECONNREFUSED|ETIMEDOUT|EAI_AGAIN",
+    r"Connection (reset|refused|aborted)",
+    r"Temporary failure in name resolution",
+]
+
+
+class RetryPolicy:
+    """When and how often failed runs are tried again"""
+
+    def __init__(self, max_attempts=1, backoff=5.0, backoff_max=60.0, patterns=None):
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.patterns = list(DEFAULT_PATTERNS if patterns is None else patterns)
+        self._regex = re.compile("|".join(f"(?:{pattern})" for pattern in self.patterns)) \
+            if self.patterns else None
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config["retry_max_attempts"], config["retry_backoff"], config["retry_backoff_max"],
+                   config["retry_patterns"])
+
+    @property
+    def enabled(self):
+        return self.max_attempts > 1 and self._regex is not None
+
+    def match(self, line):
+        """The transient error in an output line, None when the line shows none"""
+        found = self._regex.search(line) if self._regex else None
+        return found.group(0) if found else None
+
+    def should_retry(self, job):
+        """True when a failed job gets another attempt"""
+        return (self.enabled and not job.cancelled and job.returncode != 0
+                and job.retry_reason is not None and job.attempt < self.max_attempts)
+
+    def delay(self, attempt):
+        """Seconds to wait before the attempt after `attempt`"""
+        return min(self.backoff * 2 ** (attempt - 1), self.backoff_max)
+
+
+def triage(jobs):
+    """Split finished jobs into (passed, flaky, failed); flaky jobs passed after a retry"""
+    passed, flaky, failed = [], [], []
+    for job in jobs:
+        if job.status == COMPLETED:
+            (flaky if job.attempt > 1 else passed).append(job)
+        else:
+            failed.append(job)
+    return passed, flaky, failed
+
+
+def describe_failure(job):
+    """Why a job failed, e.g. "return code 1" or "net::ERR_CONNECTION_RESET, 3 attempts" """
+    if job.status == CANCELLED:
+        return "cancelled"
+    if job.timed_out:
+        reason = f"timed out, {job.timed_out}"
+    elif job.error:
+        # Last traceback line, e.g. "RuntimeError: executor not ready"
+        reason = job.error.strip().splitlines()[-1]
+    else:
+        reason = job.retry_reason or f"return code {job.returncode}"
+    return f"{reason}, {job.attempt} attempts" if job.attempt > 1 else reason
@@ -0,0 +1,568 @@
+"""
+Script discovery and execution.
+The ScriptExecutor holds the execution and logging logic shared by the GUI
+and the command line runner; jobs and the run queue live in crawly.jobs.
+"""
+
+import asyncio
+import datetime
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+from .catalogue import iter_script_files, script_metadata, script_name as catalogue_name
+from .codecache import CODE_CACHE_DIR, ScriptError, ScriptValidator
+from .config import default_workers
+from .jobs import RETRYING, COMPLETED, FAILED, CANCELLED, watchdog
+from .logwriter import LogWriter
+from .monitor import RESOURCES_SUFFIX, ResourceMonitor, available as monitor_available, format_sample, write_resources
+from .orchestrator import get_orchestrator
+from .params import coerce_row, declared_params, read_rows
+from .history import HISTORY_FILE, RunHistory
+from .instrument import slowest_steps, format_step
+from .proctree import ResourceLimits
+from .profiles import resolve_profile
+from .remote import RemoteError, RemotePool
+from .retention import LogRetention
+from .retry import RetryPolicy
+from .sitecache import prune_assets, site_key, state_file
+from .warm import WorkerPool, WorkerError, UnsupportedScript, child_env
+
+
+# off: live network; record: always record; replay: replay only; auto: replay if recorded, else record
+HAR_MODES = ("off", "auto", "record", "replay")
+
+
+def venv_python(venv_dir):
+    """Get Python path from venv"""
+    if sys.platform == "win32":
+        return Path(venv_dir) / "Scripts" / "python"
+    return Path(venv_dir) / "bin" / "python"
+
+
+def file_stem(script_name):
+    """File name part for a script name; "shop/checkout" (a subdirectory) becomes shop__checkout"""
+    return script_name.replace("/", "__")
+
+
+def discover_scripts(scripts_dir):
+    """Names of all Python scripts in the scripts directory and its subdirectories"""
+    return [catalogue_name(scripts_dir, script_file) for script_file in iter_script_files(scripts_dir)]
+
+
+class ScriptExecutor:
+    """Executes jobs: runs the script, streams its output and writes the log file"""
+
+    def __init__(self, project_root, config, log, status=None, python_path=None):
+        self.project_root = Path(project_root)
+        self.scripts_dir = self.project_root / "scripts"
+        self.logs_dir = self.project_root / "logs"
+        self.python_path = Path(python_path) if python_path else venv_python(self.project_root / "venv")
+        self.config = config
+        self.warm = config["runner_mode"] == "warm"
+        self.profile = config["profile"]
+        self.instrument = config["instrument"]
+        self.har_mode = config["har_mode"]
+        self.site_state = config["site_state"]
+        self.asset_cache = config["asset_cache"]
+
+        # Watchdog timeouts (seconds, None = off) and resource limits of every run
+        self.run_timeout = config["run_timeout"]
+        self.idle_timeout = config["idle_timeout"]
+        self.limits = ResourceLimits.from_config(config)
+
+        # Which failures the run queue tries again (see crawly.retry); the queue decides,
+        # its "job" events tell the executor which runs to announce as retried
+        self.retry = RetryPolicy.from_config(config)
+        get_orchestrator().subscribe(self.on_orchestrator_event)
+
+        # Samples CPU/memory of running jobs (see crawly.monitor), None when off or unsupported
+        self.monitor = None
+        if config["monitor_interval"] and monitor_available():
+            self.monitor = ResourceMonitor(get_orchestrator(), config["monitor_interval"],
+                                           config["monitor_history"])
+
+        # log(message) reports progress, status(message, color) the overall state; without a
+        # callback the state goes out as a "status" event of the orchestrator (the GUI listens to it)
+        self.log = log
+        self.status = status or (lambda message, color="black": get_orchestrator().emit(
+            "status", message=message, color=color))
+
+        # Warm browser workers, started on first use, sharing compiled scripts on disk
+        self.pool = WorkerPool(self.python_path, self.logs_dir / CODE_CACHE_DIR)
+        self.validator = ScriptValidator()
+
+        # Remote workers (see crawly.remote) take over from local interpreters when configured
+        self.remote = None
+        if config["remote_workers"]:
+            self.use_remote(config["remote_workers"])
+
+        # Warm workers used side by side for the rows of a data-driven run
+        self.data_workers = config["max_workers"] or default_workers()
+
+        # Index of all runs (logs/history.db) and the log retention policy
+        self.history = RunHistory(self.logs_dir / HISTORY_FILE)
+        self.retention = LogRetention.from_config(self.logs_dir, self.history, config)
+        self._active_logs = set()
+
+        for problem in self.limits.problems():
+            self.log(f"Resource limits: {problem}")
+
+    def execute(self, job):
+        """Execute a script job from a plain thread, returns the process exit code"""
+        return get_orchestrator().call(self.execute_async(job))
+
+    async def execute_async(self, job):
+        """Execute a queued script job on the orchestrator loop, returns the process exit code"""
+        orchestrator = get_orchestrator()
+        script_name = job.script_name
+        script_path = self.scripts_dir / f"{script_name}.py"
+
+        # Disk and SQLite work goes to the orchestrator's pool, the loop only passes output along
+        log_file = await orchestrator.to_thread(self.new_log_file, job)
+        job.log_file = log_file
+        self._active_logs.add(log_file)
+
+        mode = ("data" if job.data_file else "remote" if self.remote else
+                "warm" if self.warm else "process")
+        run_id = await orchestrator.to_thread(self.history.record_start, script_name, time.time(), log_file,
+                                              mode, self.profile)
+        returncode = None
+        watch = None
+        try:
+            self.status(f"Starting {script_name}...", "orange")
+            self.log(f"Starting script: {script_name}")
+            self.log(f"Log file: {log_file}")
+
+            options = self.run_options()
+            if self.instrument:
+                # Step timings go to a JSONL file next to the text log
+                job.steps_file = log_file.with_suffix(".steps.jsonl")
+                options["steps_file"] = str(job.steps_file)
+                options["script"] = script_name
+
+            har = await orchestrator.to_thread(self.har_options, script_name)
+            if har:
+                options["har"] = har
+
+            # The first transient error in the output makes a failure retryable; data runs
+            # retry their failed rows themselves instead (see run_rows)
+            retry_enabled = self.retry.enabled and not job.data_file
+            job.retry_reason = None
+
+            # Execute script, the log file is written by a background writer thread
+            writer = await orchestrator.to_thread(LogWriter, log_file, self.config["log_flush_interval"],
+                                                  self.config["log_flush_lines"])
+            try:
+                def handle_line(line):
+                    line = line.strip()
+                    job.touch()
+                    if retry_enabled and job.retry_reason is None:
+                        job.retry_reason = self.retry.match(line)
+                    self.log(f"[{script_name}] {line}")
+                    writer.write_line(line)
+
+                # Scripts that do not parse are rejected before any browser starts
+                try:
+                    digest, source = await orchestrator.to_thread(self.validator.load, script_path)
+                except ScriptError as e:
+                    handle_line(str(e))
+                    digest = source = None
+                    returncode = 1
+
+                if digest:
+                    options.update(await orchestrator.to_thread(self.site_options, script_name, source))
+
+                # Kills the run's process trees when it hangs (see crawly.jobs.watchdog)
+                if digest and (self.run_timeout or self.idle_timeout):
+                    watch = asyncio.ensure_future(watchdog(job, self.run_timeout, self.idle_timeout))
+                if digest and self.monitor:
+                    self.monitor.track(job)
+
+                # Warm workers, remote workers and data rows block: they run in the orchestrator's pool
+                ran_warm = False
+                if digest and job.data_file:
+                    # Data-driven run: one warm run per row, fanned out over several workers
+                    returncode = await orchestrator.to_thread(
+                        self.run_rows, job, script_path, handle_line, options, digest, source)
+                    ran_warm = True
+                elif digest and self.remote:
+                    try:
+                        returncode = await orchestrator.to_thread(
+                            self.remote.run, job, script_name, handle_line, options, digest, source)
+                    except RemoteError as e:
+                        handle_line(str(e))
+                    ran_warm = True
+                elif digest and self.warm:
+                    try:
+                        returncode = await orchestrator.to_thread(
+                            self.run_in_warm_worker, job, script_path, handle_line, options, digest, source)
+                        ran_warm = True
+                    except UnsupportedScript as e:
+                        self.log(f"[{script_name}] Warm browser not possible ({e}), using a new interpreter")
+                    except WorkerError as e:
+                        if not job.timed_out:
+                            self.log(f"[{script_name}] {e}, using a new interpreter")
+
+                if digest and not ran_warm and not job.cancelled and not job.timed_out:
+                    returncode = await self.run_process(job, script_path, handle_line, options)
+
+                if watch is not None:
+                    watch.cancel()
+                if job.timed_out and not job.cancelled:
+                    returncode = None
+                    handle_line(f"Timed out: {job.timed_out}, process tree killed")
+
+                if job.steps_file:
+                    await orchestrator.to_thread(self.report_slowest_steps, job)
+
+                if har and har["update"]:
+                    await orchestrator.to_thread(self.finish_har_recording, script_name, har,
+                                                 returncode == 0 and not job.cancelled)
+
+                if job.cancelled:
+                    self.log(f"Script {script_name} stopped by user")
+                elif job.timed_out:
+                    self.log(f"Script {script_name} timed out ({job.timed_out})")
+                    self.status("Script timed out", "red")
+                elif returncode == 0:
+                    self.log(f"Script {script_name} completed successfully!")
+                    self.status("Script completed", "green")
+                else:
+                    self.log(f"Script {script_name} failed with return code {returncode}")
+                    self.status("Script failed", "red")
+
+                return returncode
+            finally:
+                await orchestrator.to_thread(writer.close)
+
+        except Exception as e:
+            self.log(f"Error executing script: {str(e)}")
+            self.status("Execution error", "red")
+            return None
+
+        finally:
+            if watch is not None:
+                watch.cancel()
+            if self.monitor:
+                await self.finish_monitoring(job, log_file)
+            if job.cancelled:
+                status = CANCELLED
+            elif returncode == 0:
+                status = COMPLETED
+            else:
+                status = FAILED
+            await orchestrator.to_thread(self.record_end, run_id, log_file, returncode, status)
+            self._active_logs.discard(log_file)
+
+    def new_log_file(self, job):
+        """Path of a new log file for a job (the job id keeps parallel runs of the same script apart)"""
+        self.logs_dir.mkdir(exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%d-%m-%Y_%H-%M-%S")
+        log_name = file_stem(job.script_name)
+        log_file = self.logs_dir / f"{log_name}_{timestamp}.txt"
+        if log_file.exists():
+            log_file = self.logs_dir / f"{log_name}_{timestamp}_{job.id}.txt"
+        return log_file
+
+    def record_end(self, run_id, log_file, returncode, status):
+        """Record the outcome of a run in the history"""
+        log_size = log_file.stat().st_size if log_file.exists() else None
+        self.history.record_end(run_id, time.time(), returncode, status, log_size)
+
+    async def finish_monitoring(self, job, log_file):
+        """Stop sampling a job and write its peak resource use next to its log"""
+        resources = self.monitor.untrack(job)
+        if resources is None or not resources.count:
+            return
+        try:
+            await get_orchestrator().to_thread(write_resources, log_file, resources, self.monitor.interval)
+        except OSError as e:
+            self.log(f"Could not write resource peaks of {job.script_name}: {e}")
+            return
+        self.log(f"Peak resources of {job.script_name}: {format_sample(resources.peak)}")
+
+    def active_log_files(self):
+        """Log files of runs in progress (never touched by retention)"""
+        files = set()
+        for log_file in list(self._active_logs):
+            files.add(log_file)
+            files.add(log_file.with_suffix(".steps.jsonl"))
+            files.add(log_file.with_suffix(RESOURCES_SUFFIX))
+        return files
+
+    def start_retention(self):
+        """Run log retention periodically in the background"""
+        self.retention.start(self.config["log_retention_interval"], self.active_log_files)
+
+    def run_options(self):
+        """Options applied inside the script process (see crawly.hooks)"""
+        options = {}
+        profile = resolve_profile(self.config, self.profile)
+        if profile:
+            options["profile"] = profile
+        return options
+
+    def har_file(self, script_name):
+        """HAR archive recorded for a script"""
+        return self.project_root / self.config["har_dir"] / f"{file_stem(script_name)}.har.zip"
+
+    def har_options(self, script_name):
+        """HAR record/replay options for a run (see crawly.hooks), None when off"""
+        if self.har_mode == "off":
+            return None
+        if self.har_mode not in HAR_MODES:
+            raise ValueError(f"Unknown HAR mode: {self.har_mode}")
+
+        har_file = self.har_file(script_name)
+        exists = har_file.exists()
+        if self.har_mode == "replay" and not exists:
+            self.log(f"[{script_name}] No HAR recorded yet ({har_file.name}), running live")
+            return None
+
+        update = self.har_mode == "record" or not exists
+        if update:
+            # Record next to the archive; it only replaces the archive when the run passes
+            har_file.parent.mkdir(parents=True, exist_ok=True)
+            target = har_file.with_name(har_file.name[:-len(".har.zip")] + ".recording.har.zip")
+            self.log(f"[{script_name}] Recording HAR to {har_file.name}")
+        else:
+            target = har_file
+            self.log(f"[{script_name}] Replaying HAR {har_file.name}")
+
+        return {
+            "file": str(target),
+            "update": update,
+            "live": list(self.config["har_live"]),
+            "not_found": self.config["har_not_found"],
+        }
+
+    def use_remote(self, addresses):
+        """Send runs to these remote workers ("host:port"), or run locally again with none"""
+        self.remote = RemotePool(addresses, self.config["remote_token"],
+                                 self.config["remote_retries"]) if addresses else None
+
+    def site_options(self, script_name, source):
+        """Storage state and asset cache options for a run (see crawly.hooks)"""
+        options = {}
+        if self.site_state:
+            # One state per site; scripts without a literal start URL keep their own
+            site = site_key(script_metadata(source)["start_url"]) or file_stem(script_name)
+            path = state_file(self.project_root / self.config["state_dir"], site)
+            if path.exists():
+                self.log(f"[{script_name}] Using saved site state {path.name}")
+            options["state"] = {"file": str(path), "load": path.exists()}
+        if self.asset_cache:
+            options["asset_cache"] = {
+                "dir": str(self.project_root / self.config["asset_cache_dir"]),
+                "max_age": self.config["asset_cache_max_age"],
+                "types": list(self.config["asset_cache_types"]),
+                "respect_headers": self.config["asset_cache_respect_headers"],
+            }
+        return options
+
+    def prune_asset_cache(self):
+        """Remove expired asset cache entries and the oldest ones over the size limit"""
+        return prune_assets(self.project_root / self.config["asset_cache_dir"],
+                            self.config["asset_cache_max_mb"], self.config["asset_cache_max_age"])
+
+    def finish_har_recording(self, script_name, har, passed):
+        """Keep the HAR of a passing recording run, discard the one of a failed run"""
+        recording = Path(har["file"])
+        if not recording.exists():
+            return
+        if passed:
+            recording.replace(self.har_file(script_name))
+        else:
+            recording.unlink()
+            self.log(f"[{script_name}] Run failed, HAR recording discarded")
+
+    def report_slowest_steps(self, job, count=5):
+        """Log the slowest recorded steps of a finished run"""
+        steps = slowest_steps(job.steps_file, count)
+        if steps:
+            self.log(f"Slowest steps of {job.script_name} (details: {job.steps_file.name}):")
+            for step in steps:
+                self.log(format_step(step))
+
+    def run_in_process(self, job, script_path, handle_line, options=None):
+        """Run a script in a new venv interpreter from a plain thread, returns its exit code"""
+        return get_orchestrator().call(self.run_process(job, script_path, handle_line, options))
+
+    async def run_process(self, job, script_path, handle_line, options=None):
+        """Run a script in a new venv interpreter owned by the orchestrator, returns its exit code"""
+        if options:
+            # Bootstrap installs the hooks, then runs the unmodified script
+            cmd = [str(self.python_path), "-m", "crawly.bootstrap", str(script_path)]
+            env = child_env(options)
+        else:
+            cmd = [str(self.python_path), str(script_path)]
+            env = None
+
+        # Output is streamed line by line; cancelling the job terminates the process tree
+        return await get_orchestrator().run_process(cmd, handle_line, env=env, on_start=job.attach_process,
+                                                    name=job.script_name,
+                                                    kill_grace=self.config["kill_grace"], limits=self.limits)
+
+    def run_rows(self, job, script_path, handle_line, options, digest, source):
+        """Run a script once per data row in warm workers, returns 0 when every row passed.
+
+        A row failing on a transient error (see crawly.retry) is run again after the backoff,
+        rows that passed are never repeated.
+        """
+        defaults = declared_params(source)
+        if defaults is None:
+            handle_line(f"{script_path.name} declares no PARAMS dict, rows are passed as PARAMS anyway")
+
+        rows = enumerate(read_rows(job.data_file), 1)
+        rows_lock = threading.Lock()
+        results = []
+        fatal = []
+        started = time.monotonic()
+
+        def next_row():
+            with rows_lock:
+                if fatal:
+                    return None
+                try:
+                    return next(rows, None)
+                except (OSError, ValueError) as e:
+                    fatal.append(f"Cannot read {job.data_file}: {e}")
+                    return None
+
+        def backoff(seconds):
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline and not job.cancelled and not job.timed_out:
+                time.sleep(0.1)
+
+        def work():
+            worker = None
+
+            def run_row(number, row):
+                """One attempt at a row, returns (exit code, last output line, transient error)"""
+                nonlocal worker
+                last_line = [""]
+                reason = [None]
+
+                def on_line(line):
+                    last_line[0] = line.strip() or last_line[0]
+                    if self.retry.enabled and reason[0] is None:
+                        reason[0] = self.retry.match(line)
+                    handle_line(f"[row {number}] {line}")
+
+                try:
+                    params = coerce_row(row, defaults)
+                    if worker is None or not worker.alive:
+                        if worker is not None:
+                            job.detach_process(worker.process)
+                        worker = self.pool.acquire()
+                        job.attach_process(worker.process)
+                    returncode = worker.run(script_path, on_line, dict(options, params=params),
+                                            digest, source)
+                except ValueError as e:
+                    returncode = None
+                    last_line[0] = f"Invalid parameters: {e}"
+                    handle_line(f"[row {number}] {last_line[0]}")
+                return returncode, last_line[0], reason[0]
+
+            try:
+                while not job.cancelled and not job.timed_out:
+                    item = next_row()
+                    if item is None:
+                        return
+                    number, row = item
+                    result = {"row": number, "params": row}
+                    row_started = time.monotonic()
+
+                    attempt = 1
+                    returncode, last_line, reason = run_row(number, row)
+                    while (returncode != 0 and reason is not None and attempt < self.retry.max_attempts
+                           and not job.cancelled and not job.timed_out):
+                        delay = self.retry.delay(attempt)
+                        handle_line(f"[row {number}] Retrying in {delay:.1f}s "
+                                    f"(attempt {attempt + 1} of {self.retry.max_attempts}): {reason}")
+                        backoff(delay)
+                        attempt += 1
+                        returncode, last_line, reason = run_row(number, row)
+
+                    result["returncode"] = returncode
+                    result["status"] = COMPLETED if returncode == 0 else FAILED
+                    result["attempts"] = attempt
+                    result["duration_s"] = round(time.monotonic() - row_started, 3)
+                    if returncode != 0:
+                        result["error"] = last_line
+                    with rows_lock:
+                        results.append(result)
+            except UnsupportedScript as e:
+                fatal.append(f"Data rows need a run(playwright) function ({e})")
+            except WorkerError as e:
+                fatal.append(str(e))
+            finally:
+                if worker is not None:
+                    job.detach_process(worker.process)
+                    self.pool.release(worker)
+
+        threads = [threading.Thread(target=work, daemon=True) for _ in range(max(1, self.data_workers))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for message in fatal:
+            handle_line(message)
+
+        # One report for the whole data run, next to the text log
+        results.sort(key=lambda result: result["row"])
+        failed = [result for result in results if result["status"] != COMPLETED]
+        report_file = job.log_file.with_suffix(".report.json")
+        report = {
+            "script": job.script_name,
+            "data_file": str(job.data_file),
+            "duration_s": round(time.monotonic() - started, 3),
+            "rows": len(results),
+            "passed": len(results) - len(failed),
+            "failed": len(failed),
+            "results": results,
+        }
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+        handle_line(f"Data run: {report['rows']} row(s), {report['passed']} passed, "
+                    f"{report['failed']} failed in {report['duration_s']:.1f}s (report: {report_file.name})")
+        for result in failed[:10]:
+            handle_line(f"  FAILED row {result['row']} {json.dumps(result['params'])}: {result.get('error', '')}")
+        if len(failed) > 10:
+            handle_line(f"  ... and {len(failed) - 10} more, see {report_file.name}")
+
+        return 0 if results and not failed and not fatal else 1
+
+    def run_in_warm_worker(self, job, script_path, handle_line, options=None, digest=None, source=None):
+        """Run a script in a warm browser worker, returns its exit code"""
+        worker = self.pool.acquire()
+
+        # Cancelling the job terminates the worker together with its browser
+        job.attach_process(worker.process)
+        try:
+            return worker.run(script_path, handle_line, options, digest, source)
+        finally:
+            job.detach_process(worker.process)
+            self.pool.release(worker)
+
+    def on_orchestrator_event(self, kind, data):
+        """Loop thread: log the runs the run queue tries again"""
+        if kind == "job" and data["job"].status == RETRYING:
+            job = data["job"]
+            self.log(f"Retrying {job.script_name} in {self.retry.delay(job.attempt):.1f}s "
+                     f"(attempt {job.attempt + 1} of {self.retry.max_attempts}): {job.retry_reason}")
+
+    def shutdown(self):
+        """Stop the warm workers and keep the asset cache within its limits"""
+        get_orchestrator().unsubscribe(self.on_orchestrator_event)
+        self.pool.shutdown()
+        if self.asset_cache:
+            try:
+                self.prune_asset_cache()
+            except OSError as e:
+                self.log(f"Asset cache pruning failed: {e}")
@@ -0,0 +1,252 @@
+"""
+Built-in scheduler for unattended recurring runs.
+`python -m crawly schedule` keeps one executor resident and queues scripts
+on cron expressions or fixed intervals, so a trigger does not pay the
+interpreter, venv check and browser startup again, and scheduled runs
+share the warm browser workers.
+
+Schedules come from "schedules" in crawly.json:
+
+    {"name": "shop", "scripts": ["shop/*"], "cron": "*/15 7-22 * * 1-5", "jitter": 30}
+    {"scripts": ["*"], "every": "6h"}
+
+cron has the five standard fields (minute hour day-of-month month
+day-of-week) with *, lists, ranges, steps and names, or @hourly, @daily,
+@weekly and @monthly. every is a number of seconds or a duration like
+"90s", "15m", "6h" or "1d"; interval runs stay on their grid instead of
+drifting with the run time. jitter delays each trigger by up to that
+many seconds, so schedules sharing a time do not hit the sites at once.
+
+Overlap protection: a script whose previous run (from any schedule) is
+still queued or running is not queued again, unless the schedule sets
+"overlap": "queue".
+"""
+
+import asyncio
+import datetime
+import random
+
+from .planner import estimate_durations, longest_first
+from .retry import describe_failure, triage
+
+
+CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+}
+
+MONTH_NAMES = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+DAY_NAMES = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+
+INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+OVERLAP_MODES = ("skip", "queue")
+
+
+def _parse_field(text, low, high, names=None, offset=0):
+    """Set of values of one cron field"""
+    def value(token):
+        token = token.lower()
+        if names and token in names:
+            return names.index(token) + offset
+        return int(token)
+
+    values = set()
+    for part in text.split(","):
+        range_part, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if range_part == "*":
+            start, end = low, high
+        elif "-" in range_part:
+            first, last = range_part.split("-", 1)
+            start, end = value(first), value(last)
+        else:
+            start = value(range_part)
+            # "5/10": from 5 to the end of the range
+            end = high if step > 1 else start
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"cron field {text!r} out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronExpression:
+    """Standard five field cron expression, evaluated in local time"""
+
+    def __init__(self, expression):
+        self.expression = expression
+        fields = CRON_ALIASES.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expression!r}")
+        minute, hour, day, month, weekday = fields
+        self.minutes = _parse_field(minute, 0, 59)
+        self.hours = _parse_field(hour, 0, 23)
+        self.days = _parse_field(day, 1, 31)
+        self.months = _parse_field(month, 1, 12, MONTH_NAMES, offset=1)
+        # 0 and 7 are both Sunday
+        self.weekdays = {day % 7 for day in _parse_field(weekday, 0, 7, DAY_NAMES)}
+        # With both day fields restricted, either one matching is enough (as in cron,
+        # where a field starting with * such as */2 does not count as restricted)
+        self.any_day = day.startswith("*")
+        self.any_weekday = weekday.startswith("*")
+
+    def _day_matches(self, moment):
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment):
+        """First matching minute after moment"""
+        moment = moment.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = moment + datetime.timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1) + datetime.timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + datetime.timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += datetime.timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"cron expression never matches: {self.expression!r}")
+
+
+def parse_interval(value):
+    """Seconds of an interval like 300, "90s", "15m", "6h" or "1d" """
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        text = str(value).strip().lower()
+        unit = INTERVAL_UNITS.get(text[-1:])
+        seconds = float(text[:-1]) * unit if unit else float(text)
+    if seconds <= 0:
+        raise ValueError(f"interval must be positive: {value!r}")
+    return seconds
+
+
+class Schedule:
+    """Scripts queued on a cron expression or a fixed interval"""
+
+    def __init__(self, name, patterns=None, cron=None, every=None, jitter=0.0, overlap="skip"):
+        if bool(cron) == bool(every):
+            raise ValueError(f"schedule {name!r} needs either cron or every")
+        if overlap not in OVERLAP_MODES:
+            raise ValueError(f"schedule {name!r}: overlap must be one of {', '.join(OVERLAP_MODES)}")
+        self.name = name
+        self.patterns = [patterns] if isinstance(patterns, str) else list(patterns or [])
+        self.cron = CronExpression(cron) if cron else None
+        self.every = parse_interval(every) if every else None
+        self.jitter = float(jitter or 0)
+        self.overlap = overlap
+
+    @classmethod
+    def from_config(cls, entry, index=0):
+        """Schedule from a "schedules" entry of crawly.json"""
+        return cls(entry.get("name") or f"schedule {index + 1}", entry.get("scripts"), entry.get("cron"),
+                   entry.get("every"), entry.get("jitter", 0), entry.get("overlap", "skip"))
+
+    def describe(self):
+        when = f"cron {self.cron.expression}" if self.cron else f"every {self.every:g}s"
+        jitter = f", jitter {self.jitter:g}s" if self.jitter else ""
+        return f"{self.name}: {' '.join(self.patterns) or 'all scripts'} ({when}{jitter})"
+
+    def next_time(self, after):
+        """Planned trigger time after `after` (before jitter)"""
+        if self.cron:
+            return self.cron.next_after(after)
+        return after + datetime.timedelta(seconds=self.every)
+
+
+class Scheduler:
+    """Triggers schedules on the orchestrator loop and queues their scripts"""
+
+    def __init__(self, schedules, run_queue, list_scripts, select, history=None, log=print):
+        self.schedules = schedules
+        self.run_queue = run_queue
+        # list_scripts() returns the current script names, select(names, patterns) filters them
+        self.list_scripts = list_scripts
+        self.select = select
+        self.history = history
+        self.log = log
+        self._reports = set()
+
+    async def run(self):
+        """Trigger the schedules until cancelled"""
+        now = datetime.datetime.now()
+        due = {schedule: schedule.next_time(now) for schedule in self.schedules}
+        # Jitter is drawn once per planned run, so one schedule's delay never holds up another
+        fire = {schedule: self.fire_time(schedule, due[schedule]) for schedule in self.schedules}
+        for schedule in self.schedules:
+            self.log(f"Scheduled {schedule.describe()}, next run {due[schedule]:%Y-%m-%d %H:%M:%S}")
+
+        while True:
+            schedule = min(fire, key=fire.get)
+            fire_at = fire[schedule]
+            # Short sleeps, so clock changes (and DST) are picked up
+            while True:
+                remaining = (fire_at - datetime.datetime.now()).total_seconds()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(remaining, 60))
+
+            await self.trigger(schedule)
+
+            # Stay on the grid; after a long pause (suspend) continue from now instead of catching up
+            now = datetime.datetime.now()
+            following = schedule.next_time(due[schedule])
+            due[schedule] = following if following > now else schedule.next_time(now)
+            fire[schedule] = self.fire_time(schedule, due[schedule])
+
+    @staticmethod
+    def fire_time(schedule, planned):
+        """Planned time of a run plus its random jitter"""
+        return planned + datetime.timedelta(seconds=random.uniform(0, schedule.jitter))
+
+    async def trigger(self, schedule):
+        """Queue the scripts of a schedule, skipping those still busy from an earlier trigger"""
+        # The directory walk and the history lookup block, they run in the orchestrator's pool
+        to_thread = self.run_queue.orchestrator.to_thread
+        scripts = self.select(await to_thread(self.list_scripts), schedule.patterns)
+        if schedule.overlap == "skip":
+            busy = {job.script_name for job in list(self.run_queue.jobs.values()) if not job.finished}
+            skipped = [script_name for script_name in scripts if script_name in busy]
+            scripts = [script_name for script_name in scripts if script_name not in busy]
+            if skipped:
+                self.log(f"[{schedule.name}] Still running, skipped: {', '.join(skipped)}")
+        if not scripts:
+            self.log(f"[{schedule.name}] Nothing to run")
+            return
+
+        if self.history is not None:
+            scripts = longest_first(scripts, await to_thread(estimate_durations, self.history, scripts))
+        self.log(f"[{schedule.name}] Queueing {len(scripts)} script(s)")
+        jobs = [self.run_queue.submit(script_name) for script_name in scripts]
+        report = asyncio.ensure_future(self.report(schedule, jobs))
+        self._reports.add(report)
+        report.add_done_callback(self._reports.discard)
+
+    async def report(self, schedule, jobs):
+        """Log the outcome of a trigger once all its jobs are done"""
+        while not all(job.finished for job in jobs):
+            await asyncio.sleep(1.0)
+        passed, flaky, failed = triage(jobs)
+        flaky_count = f" ({len(flaky)} flaky)" if flaky else ""
+        self.log(f"[{schedule.name}] Finished: {len(passed) + len(flaky)} passed{flaky_count}, "
+                 f"{len(failed)} failed")
+        for job in flaky:
+            self.log(f"  FLAKY  {job.script_name} (passed on attempt {job.attempt}) - {job.log_file}")
+        for job in failed:
+            self.log(f"  FAILED {job.script_name} ({describe_failure(job)}) - {job.log_file}")
+            if job.error:
+                self.log(job.error.rstrip())
+        # A resident queue would otherwise keep every job ever run
+        self.run_queue.clear_finished()
@@ -0,0 +1,196 @@
+"""
+Per-site browser state and static asset cache.
+Storage state (cookies and localStorage) is saved per target site when a
+context closes and loaded into the next context for the same site, so
+logins and consent banners are not repeated on every run. Static assets
+(stylesheets, scripts, images, fonts, media) fetched by GET are kept on
+disk and served from there through a context route until they expire;
+the cache honours no-store/no-cache unless told otherwise and is pruned
+to a maximum size.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+
+STATE_SUFFIX = ".json"
+
+# Response headers that describe the transfer, not the (decoded) body
+TRANSFER_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+def site_key(url):
+    """Name identifying the site of a URL (its host name)"""
+    host = urlsplit(url or "").hostname
+    return host.replace(":", "_") if host else None
+
+
+def _write_atomic(path, data):
+    """Write bytes under a temporary name, then move them in place"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.{os.getpid()}.part")
+    partial.write_bytes(data)
+    partial.replace(path)
+
+
+def state_file(state_dir, site):
+    """Storage state file of a site"""
+    return Path(state_dir) / f"{site}{STATE_SUFFIX}"
+
+
+def save_state(context, path):
+    """Save the storage state of a context (cookies, localStorage)"""
+    state = context.storage_state()
+    _write_atomic(path, json.dumps(state).encode("utf-8"))
+
+
+def clear_states(state_dir, site=None):
+    """Remove saved storage states (of one site), returns the number removed"""
+    state_dir = Path(state_dir)
+    if not state_dir.exists():
+        return 0
+    paths = [state_file(state_dir, site)] if site else list(state_dir.glob(f"*{STATE_SUFFIX}"))
+    removed = 0
+    for path in paths:
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+class AssetCache:
+    """Static responses on disk, one body and one metadata file per URL"""
+
+    def __init__(self, cache_dir, max_age=86400, resource_types=(), respect_headers=True):
+        self.cache_dir = Path(cache_dir)
+        self.max_age = max_age
+        self.resource_types = set(resource_types)
+        self.respect_headers = respect_headers
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_options(cls, options):
+        """Create a cache from the "asset_cache" run options"""
+        return cls(options["dir"], options.get("max_age"), options.get("types", ()),
+                   options.get("respect_headers", True))
+
+    def _paths(self, url):
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        folder = self.cache_dir / digest[:2]
+        return folder / f"{digest}.json", folder / f"{digest}.body"
+
+    def load(self, url):
+        """(status, headers, body) of a fresh cached response, None on a miss"""
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if self.max_age is not None and time.time() - meta["stored"] > self.max_age:
+                return None
+            return meta["status"], meta["headers"], body_path.read_bytes()
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def cacheable(self, status, headers):
+        """True for successful responses the server allows to be stored"""
+        if status != 200:
+            return False
+        if self.respect_headers:
+            cache_control = headers.get("cache-control", "").lower()
+            if "no-store" in cache_control or "no-cache" in cache_control:
+                return False
+        return True
+
+    def store(self, url, status, headers, body):
+        """Keep a response on disk"""
+        meta_path, body_path = self._paths(url)
+        headers = {name: value for name, value in headers.items() if name.lower() not in TRANSFER_HEADERS}
+        try:
+            _write_atomic(body_path, body)
+            _write_atomic(meta_path, json.dumps(
+                {"url": url, "status": status, "headers": headers, "stored": time.time()}).encode("utf-8"))
+        except OSError:
+            pass
+
+    def handle(self, route):
+        """Route handler: serve static GET requests from disk, fetch and store misses"""
+        request = route.request
+        if request.method != "GET" or request.resource_type not in self.resource_types:
+            route.fallback()
+            return
+
+        cached = self.load(request.url)
+        if cached is not None:
+            self.hits += 1
+            status, headers, body = cached
+            route.fulfill(status=status, headers=headers, body=body)
+            return
+
+        self.misses += 1
+        try:
+            response = route.fetch()
+            body = response.body()
+        except Exception:
+            # Network error or aborted request: let the browser load it as without the cache,
+            # so the page sees the failure the way it normally would
+            route.fallback()
+            return
+        if self.cacheable(response.status, response.headers):
+            self.store(request.url, response.status, response.headers, body)
+        route.fulfill(response=response, body=body)
+
+
+def cache_size(cache_dir):
+    """Total bytes and number of cached responses"""
+    total, count = 0, 0
+    for path in Path(cache_dir).glob("*/*.body"):
+        try:
+            total += path.stat().st_size
+            count += 1
+        except OSError:
+            continue
+    return total, count
+
+
+def prune_assets(cache_dir, max_mb=None, max_age=None):
+    """Remove expired entries and the least recently stored ones beyond max_mb, returns the number removed"""
+    cache_dir = Path(cache_dir)
+    entries = []
+    for body_path in cache_dir.glob("*/*.body"):
+        try:
+            stat = body_path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, body_path))
+    entries.sort(reverse=True)
+
+    now = time.time()
+    total = 0
+    removed = 0
+    for mtime, size, body_path in entries:
+        total += size
+        expired = max_age is not None and now - mtime > max_age
+        too_big = max_mb is not None and total > max_mb * 1024 * 1024
+        if expired or too_big:
+            for path in (body_path, body_path.with_suffix(".json")):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            total -= size
+            removed += 1
+    return removed
+
+
+def clear_assets(cache_dir):
+    """Remove the whole asset cache"""
+    if Path(cache_dir).exists():
+        shutil.rmtree(cache_dir)
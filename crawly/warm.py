@@ -0,0 +1,161 @@
+"""
+Manager side of the warm browser workers.
+A WarmWorker is a long-lived `python -m crawly.worker` process in the virtual
+environment; the WorkerPool hands them out to the run queue so browser
+startup is paid once per worker instead of once per script.
+"""
+
+import json
+import os
+import subprocess
+import threading
+from pathlib import Path
+
+from .hooks import OPTIONS_ENV
+from .proctree import GroupPopen
+
+
+# Directory containing the crawly package, put on the child's PYTHONPATH
+PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+
+
+def child_env(options=None):
+    """Environment for child interpreters: crawly importable, unbuffered output, run options"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (str(PACKAGE_ROOT), env.get("PYTHONPATH")) if p
+    )
+    env["PYTHONUNBUFFERED"] = "1"
+    if options:
+        env[OPTIONS_ENV] = json.dumps(options)
+    return env
+
+
+class WorkerError(Exception):
+    """The warm worker could not be started or died unexpectedly"""
+
+
+class UnsupportedScript(Exception):
+    """The script has no run(playwright) function and needs its own interpreter"""
+
+
+class WarmWorker:
+    """A single warm worker process"""
+
+    def __init__(self, python_path, code_cache_dir=None):
+        env = child_env()
+        cmd = [str(python_path), "-m", "crawly.worker"]
+        if code_cache_dir:
+            cmd += ["--code-cache", str(code_cache_dir)]
+
+        # Script hashes whose source this worker has already received
+        self.known_hashes = set()
+
+        # In its own process group: kill() also stops the browsers it launched
+        self.process = GroupPopen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            encoding="utf-8",
+            env=env
+        )
+
+        event = self._read_event()
+        if event is None or event.get("event") != "ready":
+            self.kill()
+            raise WorkerError("warm worker failed to start (is Playwright installed in the venv?)")
+
+    @property
+    def alive(self):
+        return self.process.poll() is None
+
+    def _read_event(self):
+        """Read the next protocol event, None when the worker has exited"""
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                return None
+            try:
+                return json.loads(line)
+            except ValueError:
+                # Stray output that bypassed the protocol
+                continue
+
+    def run(self, script_path, on_line, options=None, digest=None, source=None):
+        """Run a script in the warm browser, returns its exit code (None if the worker died)"""
+        request = {"cmd": "run", "script": str(script_path), "options": options or {}}
+        if digest:
+            # The worker compiles each script version once; later runs only send the hash
+            request["hash"] = digest
+            if digest not in self.known_hashes and source is not None:
+                request["source"] = source
+                self.known_hashes.add(digest)
+        try:
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+        except OSError:
+            return None
+
+        while True:
+            event = self._read_event()
+            if event is None:
+                return None
+
+            kind = event.get("event")
+            if kind == "output":
+                on_line(event.get("text", ""))
+            elif kind == "done":
+                return event.get("returncode")
+            elif kind == "unsupported":
+                raise UnsupportedScript(event.get("reason", "unsupported script"))
+
+    def stop(self, timeout=5):
+        """Ask the worker to shut down, killing it if it does not exit in time"""
+        if not self.alive:
+            return
+        try:
+            self.process.stdin.write(json.dumps({"cmd": "shutdown"}) + "\n")
+            self.process.stdin.flush()
+            self.process.wait(timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+
+    def kill(self):
+        """Terminate the worker and its browsers"""
+        if self.alive:
+            self.process.kill()
+            self.process.wait()
+
+
+class WorkerPool:
+    """Pool of warm workers, started lazily and reused across runs"""
+
+    def __init__(self, python_path, code_cache_dir=None):
+        self.python_path = Path(python_path)
+        self.code_cache_dir = code_cache_dir
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take an idle warm worker, starting a new one when none is available"""
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive:
+                    return worker
+        return WarmWorker(self.python_path, self.code_cache_dir)
+
+    def release(self, worker):
+        """Return a worker to the pool; dead workers are dropped"""
+        if worker.alive:
+            with self._lock:
+                self._idle.append(worker)
+
+    def shutdown(self):
+        """Stop all idle workers"""
+        with self._lock:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.stop()
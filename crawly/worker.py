@@ -0,0 +1,290 @@
+"""
+Warm browser worker.
+Runs inside the virtual environment (python -m crawly.worker), keeps one
+Playwright instance and its browsers alive and executes the run(playwright)
+function of scripts on request, each inside fresh browser contexts.
+
+Protocol: one JSON object per line. Requests arrive on stdin
+({"cmd": "run", "script": path, "hash": ..., "source": ..., "options": {...}}
+/ {"cmd": "shutdown"}), events are written to stdout
+({"event": "ready" | "output" | "done" | "unsupported"}). "source" is only
+sent the first time a worker sees a script hash; compiled code is cached
+per hash (see crawly.codecache), on disk when started with --code-cache DIR.
+"""
+
+import ast
+import json
+import sys
+import threading
+import traceback
+from pathlib import Path
+
+from . import hooks
+from .codecache import CodeCache, script_hash
+
+
+# Real stdout is reserved for protocol events; script output is wrapped
+_protocol_out = sys.stdout
+_protocol_lock = threading.Lock()
+
+
+def emit(event, **data):
+    """Write a protocol event to the manager"""
+    data["event"] = event
+    with _protocol_lock:
+        _protocol_out.write(json.dumps(data) + "\n")
+        _protocol_out.flush()
+
+
+class OutputStream:
+    """File-like object turning script output into output events"""
+
+    def __init__(self):
+        self._buffer = ""
+
+    def write(self, text):
+        self._buffer += text
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            emit("output", text=line)
+        return len(text)
+
+    def flush(self):
+        if self._buffer:
+            emit("output", text=self._buffer)
+            self._buffer = ""
+
+    def isatty(self):
+        return False
+
+
+def _is_entry_block(node):
+    """True for the module level block that starts Playwright itself"""
+    # with sync_playwright() as playwright: run(playwright)
+    if isinstance(node, ast.With):
+        for item in node.items:
+            call = item.context_expr
+            if isinstance(call, ast.Call):
+                func = call.func
+                name = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+                if name == "sync_playwright":
+                    return True
+
+    # if __name__ == "__main__": ...
+    if isinstance(node, ast.If) and isinstance(node.test, ast.Compare):
+        left = node.test.left
+        if isinstance(left, ast.Name) and left.id == "__name__":
+            return True
+
+    return False
+
+
+def _is_run_function(node):
+    """True for a module level def run(...) (an async run() needs its own event loop, not the worker)"""
+    return isinstance(node, ast.FunctionDef) and node.name == "run"
+
+
+def compile_script(script_path, source):
+    """Compile a script without its entry block, None when it has no module level run()"""
+    tree = ast.parse(source, filename=str(script_path))
+    if not any(_is_run_function(node) for node in tree.body):
+        return None
+    tree.body = [node for node in tree.body if not _is_entry_block(node)]
+    return compile(tree, str(script_path), "exec")
+
+
+def load_run_function(script_path, code_cache=None, digest=None, source=None, params=None):
+    """Load a script without its entry block and return its run() function (or None)"""
+    script_path = Path(script_path)
+
+    code = code_cache.get(digest) if code_cache and digest else None
+    if code is None:
+        if source is None:
+            source = script_path.read_text(encoding="utf-8")
+            if digest and script_hash(script_path, source) != digest:
+                # Changed since the manager checked it: run it, but do not cache under the old hash
+                digest = None
+        code = compile_script(script_path, source)
+        if code is None:
+            # Nothing of the script runs here, the manager starts it in its own interpreter
+            return None
+        if code_cache and digest:
+            code_cache.put(digest, code)
+
+    namespace = {"__name__": "__crawly_script__", "__file__": str(script_path)}
+    exec(code, namespace)
+
+    if params is not None:
+        # Data-driven run: the row overrides the script's PARAMS defaults
+        namespace["PARAMS"] = {**(namespace.get("PARAMS") or {}), **params}
+
+    run = namespace.get("run")
+    return run if callable(run) else None
+
+
+class SharedPlaywright:
+    """Playwright stand-in handed to scripts; browsers launched through it stay warm"""
+
+    def __init__(self, playwright):
+        self._playwright = playwright
+        self._browsers = {}
+        self._contexts = []
+        self.chromium = SharedBrowserType(self, playwright.chromium)
+        self.firefox = SharedBrowserType(self, playwright.firefox)
+        self.webkit = SharedBrowserType(self, playwright.webkit)
+
+    def __getattr__(self, name):
+        return getattr(self._playwright, name)
+
+    def get_browser(self, browser_type, launch_options):
+        """Return a running browser for these launch options, launching it once"""
+        launch_options = hooks.launch_options(launch_options)
+        key = (browser_type.name, json.dumps(launch_options, sort_keys=True, default=str))
+        browser = self._browsers.get(key)
+        if browser is None or not browser.is_connected():
+            browser = browser_type.launch(**launch_options)
+            self._browsers[key] = browser
+        return browser
+
+    def track_context(self, context):
+        """Remember a context created during the current run"""
+        self._contexts.append(context)
+        return context
+
+    def end_run(self):
+        """Close every context the finished run left open"""
+        contexts, self._contexts = self._contexts, []
+        for context in contexts:
+            try:
+                context.close()
+            except Exception:
+                pass
+
+    def close(self):
+        """Close all warm browsers"""
+        self.end_run()
+        for browser in self._browsers.values():
+            try:
+                browser.close()
+            except Exception:
+                pass
+        self._browsers = {}
+
+
+class SharedBrowserType:
+    """BrowserType stand-in whose launch() returns a shared, already running browser"""
+
+    def __init__(self, owner, browser_type):
+        self._owner = owner
+        self._browser_type = browser_type
+
+    def __getattr__(self, name):
+        return getattr(self._browser_type, name)
+
+    def launch(self, **launch_options):
+        browser = self._owner.get_browser(self._browser_type, launch_options)
+        return SharedBrowser(self._owner, browser)
+
+
+class SharedBrowser:
+    """Browser stand-in: contexts are fresh per run, close() keeps the browser alive"""
+
+    def __init__(self, owner, browser):
+        self._owner = owner
+        self._browser = browser
+        self._contexts = []
+
+    def __getattr__(self, name):
+        return getattr(self._browser, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def contexts(self):
+        return list(self._contexts)
+
+    def new_context(self, **options):
+        context = self._browser.new_context(**options)
+        self._contexts.append(context)
+        return self._owner.track_context(context)
+
+    def new_page(self, **options):
+        # Like Browser.new_page: a page in its own context
+        return self.new_context(**options).new_page()
+
+    def close(self, **kwargs):
+        contexts, self._contexts = self._contexts, []
+        for context in contexts:
+            try:
+                context.close()
+            except Exception:
+                pass
+
+
+def run_script(shared, script_path, options=None, code_cache=None, digest=None, source=None):
+    """Execute one script in the warm browser and report its exit code"""
+    hooks.configure(options)
+    stream = OutputStream()
+    sys.stdout = sys.stderr = stream
+    returncode = 0
+    run = None
+
+    try:
+        run = load_run_function(script_path, code_cache, digest, source, (options or {}).get("params"))
+        if run is not None:
+            run(shared)
+    except SystemExit as e:
+        if isinstance(e.code, int):
+            returncode = e.code
+        elif e.code is not None:
+            print(e.code)
+            returncode = 1
+    except BaseException:
+        traceback.print_exc()
+        returncode = 1
+    finally:
+        stream.flush()
+        sys.stdout, sys.stderr = _protocol_out, sys.__stderr__
+        shared.end_run()
+        hooks.finish()
+
+    if run is None and returncode == 0:
+        # Let the manager fall back to a regular interpreter for this script
+        emit("unsupported", reason="script has no run(playwright) function")
+    else:
+        emit("done", returncode=returncode)
+
+
+def main():
+    """Worker entry point: serve run requests until stdin closes"""
+    from playwright.sync_api import sync_playwright
+
+    code_cache = CodeCache(sys.argv[sys.argv.index("--code-cache") + 1]
+                           if "--code-cache" in sys.argv[:-1] else None)
+    code_cache.prune()
+    hooks.install()
+
+    with sync_playwright() as playwright:
+        shared = SharedPlaywright(playwright)
+        emit("ready")
+
+        try:
+            for line in sys.stdin:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                if request.get("cmd") == "run":
+                    run_script(shared, request["script"], request.get("options"),
+                               code_cache, request.get("hash"), request.get("source"))
+                elif request.get("cmd") == "shutdown":
+                    break
+        finally:
+            shared.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,26 @@
 """
 SiteTester GUI - Playwright Script Manager
 Professional GUI application for managing and executing Playwright scripts.
+
+Only what the first window needs is imported at module level; the execution
+core (subprocess, SQLite history, warm workers, environment setup) is
+imported when first used, so the window paints before it is loaded.
 """
 
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
-import subprocess
+from tkinter import ttk, messagebox
+import tkinter.font as tkfont
 import sys
 import os
-import venv
 import threading
 import datetime
+import collections
 from pathlib import Path
-import json
+
+from crawly.config import DEFAULTS, load_config, default_workers
+from crawly.jobs import FAILED, RunQueue
+from crawly.logview import LogQueue, LogBuffer
+from crawly.profiles import available_profiles
 
 
 class SiteTesterApp:
@@ -35,17 +43,65 @@ class SiteTesterApp:
         # Create logs directory if it doesn't exist
         self.logs_dir.mkdir(exist_ok=True)
         
+        # Load settings
+        try:
+            self.config = load_config(self.project_root)
+            config_error = None
+        except (OSError, ValueError) as e:
+            self.config = dict(DEFAULTS)
+            config_error = e
+        
         # Initialize variables
         self.available_scripts = []
+        self.catalogue = None
         self.selected_script = tk.StringVar()
-        self.is_running = False
+        self.script_filter = tk.StringVar()
+        self.worker_count = tk.IntVar(value=self.config["max_workers"] or default_workers())
+        self.warm_browser = tk.BooleanVar(value=self.config["runner_mode"] == "warm")
+        self.selected_profile = tk.StringVar(value=self.config["profile"])
+        self.record_timings = tk.BooleanVar(value=self.config["instrument"])
+        self.har_mode = tk.StringVar(value=self.config["har_mode"])
+        self.site_state = tk.BooleanVar(value=self.config["site_state"])
+        self.asset_cache = tk.BooleanVar(value=self.config["asset_cache"])
+        self.is_recording = False
+        self.codegen_process = None
+        
+        # Event loop thread running child processes (scripts, codegen, environment setup)
+        self.orchestrator = None
+        
+        # Resource samples for the Status sparkline: None = all runs, else per job id
+        self.resource_history = {}
+        
+        # Log lines from worker threads, drained by the GUI on a fixed tick
+        self.log_queue = LogQueue(self.config["log_batch_lines"])
+        self.log_tick_ms = self.config["log_tick_ms"]
+        
+        # Run queue executing scripts concurrently; the script executor (shared with the
+        # command line runner) is created off the GUI thread once the window is shown
+        self.executor = None
+        self.startup_complete = False
+        self._startup_result = None
+        
+        # Batch queued by Run All, for the ETA in the status frame
+        self.batch_plan = None
+        self._eta_after = None
+        self.run_queue = RunQueue(self.execute_script, self.worker_count.get(),
+                                  on_change=self.on_job_changed)
         
         # Setup UI
         self.setup_ui()
+        self.root.after(self.log_tick_ms, self._drain_log)
         
-        # Check environment and load scripts
-        self.check_environment()
-        self.load_scripts()
+        if config_error:
+            self.log_message(f"Error reading settings, using defaults: {config_error}")
+        
+        # Check environment and load scripts after the first paint
+        self.root.after_idle(self.start_background_init)
+    
+    @property
+    def is_running(self):
+        """True while scripts are queued/running or a recording is active"""
+        return self.is_recording or self.run_queue.has_work()
     
     def setup_ui(self):
         """Setup the main user interface"""
@@ -67,10 +123,79 @@ class SiteTesterApp:
                                 font=("SF Pro Display", 12, "normal") if sys.platform == "darwin" else ("Segoe UI", 12, "normal"))
         script_label.pack(anchor=tk.W)
         
+        # Type-ahead filter over the script list
+        filter_frame = ttk.Frame(selection_frame)
+        filter_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT)
+        filter_entry = ttk.Entry(filter_frame, textvariable=self.script_filter)
+        filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(10, 0))
+        self.script_filter.trace_add("write", lambda *args: self.apply_script_filter())
+        
         self.script_combo = ttk.Combobox(selection_frame, textvariable=self.selected_script,
                                         state="readonly", width=50,
                                         font=("SF Pro Display", 11) if sys.platform == "darwin" else ("Segoe UI", 11))
-        self.script_combo.pack(fill=tk.X, pady=(5, 10))
+        self.script_combo.pack(fill=tk.X, pady=(5, 0))
+        self.script_combo.bind('<<ComboboxSelected>>', lambda e: self.update_script_info())
+        
+        # Metadata of the selected script: browser, steps, start URL, last run
+        self.script_info_label = ttk.Label(selection_frame, text="", foreground="#6E6E73")
+        self.script_info_label.pack(anchor=tk.W, pady=(3, 10))
+        
+        # Parallel worker count
+        workers_frame = ttk.Frame(selection_frame)
+        workers_frame.pack(fill=tk.X)
+        
+        ttk.Label(workers_frame, text="Parallel workers:").pack(side=tk.LEFT)
+        self.workers_spinbox = ttk.Spinbox(workers_frame, from_=1, to=64, width=5,
+                                           textvariable=self.worker_count,
+                                           command=self.update_worker_count)
+        self.workers_spinbox.pack(side=tk.LEFT, padx=(10, 0))
+        self.workers_spinbox.bind('<FocusOut>', lambda e: self.update_worker_count())
+        self.workers_spinbox.bind('<Return>', lambda e: self.update_worker_count())
+        
+        warm_check = ttk.Checkbutton(workers_frame, text="Warm browser (reuse browser across scripts)",
+                                     variable=self.warm_browser, command=self.update_runner_mode)
+        warm_check.pack(side=tk.LEFT, padx=(20, 0))
+        
+        # Execution profile (headless, resource blocking) injected into every run
+        profile_frame = ttk.Frame(selection_frame)
+        profile_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        ttk.Label(profile_frame, text="Execution profile:").pack(side=tk.LEFT)
+        self.profile_combo = ttk.Combobox(profile_frame, textvariable=self.selected_profile,
+                                          values=available_profiles(self.config),
+                                          state="readonly", width=15)
+        self.profile_combo.pack(side=tk.LEFT, padx=(10, 0))
+        self.profile_combo.bind('<<ComboboxSelected>>', lambda e: self.update_profile())
+        
+        timings_check = ttk.Checkbutton(profile_frame, text="Record step timings",
+                                        variable=self.record_timings,
+                                        command=self.update_instrumentation)
+        timings_check.pack(side=tk.LEFT, padx=(20, 0))
+        
+        # HAR record/replay cache: replay recorded responses instead of hitting the site
+        ttk.Label(profile_frame, text="HAR cache:").pack(side=tk.LEFT, padx=(20, 0))
+        har_combo = ttk.Combobox(profile_frame, textvariable=self.har_mode,
+                                 values=["off", "auto", "record", "replay"],
+                                 state="readonly", width=8)
+        har_combo.pack(side=tk.LEFT, padx=(10, 0))
+        har_combo.bind('<<ComboboxSelected>>', lambda e: self.update_har_mode())
+        
+        # Per-site storage state (consent, logins) and on-disk static asset cache
+        cache_frame = ttk.Frame(selection_frame)
+        cache_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        state_check = ttk.Checkbutton(cache_frame, text="Reuse site state (cookies, consent)",
+                                      variable=self.site_state, command=self.update_site_cache)
+        state_check.pack(side=tk.LEFT)
+        
+        assets_check = ttk.Checkbutton(cache_frame, text="Cache static assets",
+                                       variable=self.asset_cache, command=self.update_site_cache)
+        assets_check.pack(side=tk.LEFT, padx=(20, 0))
+        
+        clear_cache_button = ttk.Button(cache_frame, text="Clear Cache",
+                                        command=self.clear_site_cache)
+        clear_cache_button.pack(side=tk.LEFT, padx=(20, 0))
         
         # Control buttons frame
         button_frame = ttk.Frame(selection_frame)
@@ -84,6 +209,14 @@ class SiteTesterApp:
                                       command=self.start_script, style="Action.TButton")
         self.start_button.pack(side=tk.LEFT, padx=(0, 10))
         
+        self.run_all_button = ttk.Button(button_container, text="Run All", 
+                                        command=self.run_all_scripts, style="Action.TButton")
+        self.run_all_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.data_button = ttk.Button(button_container, text="Run with Data...", 
+                                     command=self.run_with_data, style="Action.TButton")
+        self.data_button.pack(side=tk.LEFT, padx=(0, 10))
+        
         self.refresh_button = ttk.Button(button_container, text="Refresh Scripts", 
                                         command=self.load_scripts, style="Action.TButton")
         self.refresh_button.pack(side=tk.LEFT, padx=(0, 10))
@@ -103,18 +236,62 @@ class SiteTesterApp:
         self.status_label = ttk.Label(status_frame, text="Ready", 
                                      foreground="#34C759", 
                                      font=("SF Pro Display", 12, "bold") if sys.platform == "darwin" else ("Segoe UI", 12, "bold"))
-        self.status_label.pack(anchor=tk.W)
+        self.status_label.pack(side=tk.LEFT)
+        
+        # Remaining time of the current batch, from past run durations
+        self.eta_label = ttk.Label(status_frame, text="", foreground="#8E8E93")
+        self.eta_label.pack(side=tk.RIGHT)
+        
+        # Live CPU (blue) and memory (orange) of the running scripts and their browsers
+        self.resource_canvas = tk.Canvas(status_frame, width=120, height=24, highlightthickness=0,
+                                         background=status_frame.winfo_toplevel().cget("background"))
+        self.resource_canvas.pack(side=tk.RIGHT, padx=(0, 15))
+        self.resource_label = ttk.Label(status_frame, text="", foreground="#8E8E93")
+        self.resource_label.pack(side=tk.RIGHT, padx=(0, 10))
+        
+        # Runs frame listing queued, running and finished jobs
+        runs_frame = ttk.LabelFrame(main_frame, text="Runs", padding="15")
+        runs_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        self.jobs_tree = ttk.Treeview(runs_frame, columns=("script", "status"),
+                                      show="headings", height=5)
+        self.jobs_tree.heading("script", text="Script")
+        self.jobs_tree.heading("status", text="Status")
+        self.jobs_tree.column("status", width=120, stretch=False)
+        self.jobs_tree.pack(fill=tk.X)
+        self.jobs_tree.bind('<<TreeviewSelect>>', lambda e: self.draw_resources())
+        
+        runs_button_frame = ttk.Frame(runs_frame)
+        runs_button_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        self.stop_all_button = ttk.Button(runs_button_frame, text="Stop All", 
+                                         command=self.stop_all_scripts, state=tk.DISABLED,
+                                         style="Stop.TButton")
+        self.stop_all_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        clear_runs_button = ttk.Button(runs_button_frame, text="Clear Finished", 
+                                      command=self.clear_finished_jobs, style="Action.TButton")
+        clear_runs_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        open_log_button = ttk.Button(runs_button_frame, text="Open Log File", 
+                                    command=self.open_job_log, style="Action.TButton")
+        open_log_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        history_button = ttk.Button(runs_button_frame, text="History", 
+                                   command=self.show_history, style="Action.TButton")
+        history_button.pack(side=tk.LEFT)
         
         # Log output frame
         log_frame = ttk.LabelFrame(main_frame, text="Script Output", padding="15")
         log_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Log text area with scrollbar
-        self.log_text = scrolledtext.ScrolledText(log_frame, height=15, 
-                                                 font=("Monaco", 11), 
-                                                 bg="#1e1e1e", fg="#ffffff",
-                                                 insertbackground="white")
-        self.log_text.pack(fill=tk.BOTH, expand=True)
+        # Log view with scrollbar, only the last log_max_lines lines are kept on screen
+        self.log_view = VirtualLogView(log_frame, LogBuffer(self.config["log_max_lines"]),
+                                       height=15,
+                                       font=("Monaco", 11), 
+                                       bg="#1e1e1e", fg="#ffffff",
+                                       insertbackground="white")
+        self.log_view.pack(fill=tk.BOTH, expand=True)
         
         # Clear log button
         clear_button_frame = ttk.Frame(log_frame)
@@ -122,7 +299,12 @@ class SiteTesterApp:
         
         clear_button = ttk.Button(clear_button_frame, text="Clear Log", 
                                  command=self.clear_log, style="Action.TButton")
-        clear_button.pack(anchor=tk.W)
+        clear_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        ttk.Label(clear_button_frame,
+                  text=f"Showing the last {self.config['log_max_lines']} lines, "
+                       f"full output is in the run's log file",
+                  foreground="#8E8E93").pack(side=tk.LEFT)
         
         # Configure professional styles
         style = ttk.Style()
@@ -168,176 +350,422 @@ class SiteTesterApp:
         # Update title font
         title_label.configure(font=title_font)
     
-    def check_environment(self):
+    def start_background_init(self):
+        """Create the executor, check the environment and find scripts in a background thread"""
+        self.update_status("Loading...", "orange")
+        threading.Thread(target=self._background_init, daemon=True).start()
+        self.root.after(10, self._poll_background_init)
+    
+    def _background_init(self):
+        """Worker thread: everything startup needs that touches disk or heavy imports"""
+        try:
+            from crawly.catalogue import CATALOGUE_FILE, ScriptCatalogue
+            from crawly.orchestrator import get_orchestrator
+            from crawly.runner import ScriptExecutor
+            orchestrator = get_orchestrator()
+            orchestrator.subscribe(self.on_orchestrator_event)
+            self.orchestrator = orchestrator
+            # Run states come back as orchestrator "status" events (see on_orchestrator_event)
+            executor = ScriptExecutor(self.project_root, self.config, self.log_message)
+            catalogue = ScriptCatalogue(self.scripts_dir, self.logs_dir / CATALOGUE_FILE, executor.history)
+            catalogue.scan()
+            self._startup_result = (executor, catalogue, self.venv_dir.exists(), None)
+        except Exception as e:
+            self._startup_result = (None, None, False, e)
+    
+    def _poll_background_init(self):
+        """Finish startup on the GUI thread once the background thread is done"""
+        if self._startup_result is None:
+            self.root.after(10, self._poll_background_init)
+            return
+        
+        executor, catalogue, venv_exists, error = self._startup_result
+        if error is not None:
+            self.log_message(f"Error during startup: {error}")
+            self.update_status("Startup failed", "red")
+            return
+        
+        # Apply choices made while loading
+        executor.warm = self.warm_browser.get()
+        executor.profile = self.selected_profile.get()
+        executor.instrument = self.record_timings.get()
+        executor.har_mode = self.har_mode.get()
+        executor.site_state = self.site_state.get()
+        executor.asset_cache = self.asset_cache.get()
+        executor.data_workers = self.run_queue.max_workers
+        self.run_queue.retry = executor.retry
+        self.executor = executor
+        
+        # Compress and prune old logs in the background
+        self.executor.start_retention()
+        
+        self.check_environment(venv_exists)
+        self.catalogue = catalogue
+        self.show_scripts()
+        self.startup_complete = True
+        
+        # Pick up added, changed and removed scripts while running
+        interval = self.config["script_watch_interval"]
+        if interval:
+            self.catalogue.watch(interval, lambda added, changed, removed: self.root.after(
+                0, self.on_scripts_changed, added, changed, removed))
+    
+    def check_environment(self, venv_exists=None):
         """Check and setup virtual environment"""
         self.update_status("Checking environment...", "orange")
         
-        if not self.venv_dir.exists():
+        if venv_exists is None:
+            venv_exists = self.venv_dir.exists()
+        
+        if not venv_exists:
             self.log_message("Virtual environment not found. Creating...")
-            threading.Thread(target=self.setup_environment, daemon=True).start()
+            self.setup_environment()
         else:
             self.log_message("Virtual environment found.")
             self.update_status("Environment ready", "green")
     
     def setup_environment(self):
-        """Setup virtual environment and install dependencies"""
-        try:
-            # Create virtual environment
-            self.log_message("Creating virtual environment...")
-            venv.create(self.venv_dir, with_pip=True)
-            
-            # Install dependencies
-            self.log_message("Installing dependencies...")
-            
-            # Get pip path
-            if sys.platform == "win32":
-                pip_path = self.venv_dir / "Scripts" / "pip"
-                python_path = self.venv_dir / "Scripts" / "python"
-            else:
-                pip_path = self.venv_dir / "bin" / "pip"
-                python_path = self.venv_dir / "bin" / "python"
-            
-            # Install packages
-            packages = ["playwright", "rich"]
-            for package in packages:
-                self.log_message(f"Installing {package}...")
-                result = subprocess.run([str(pip_path), "install", package], 
-                                      capture_output=True, text=True)
-                if result.returncode != 0:
-                    self.log_message(f"Error installing {package}: {result.stderr}")
-                    return
-            
-            # Install Playwright browsers
-            self.log_message("Installing Playwright browsers...")
-            result = subprocess.run([str(python_path), "-m", "playwright", "install"], 
-                                  capture_output=True, text=True)
-            
-            if result.returncode == 0:
+        """Setup virtual environment and install dependencies on the orchestrator loop"""
+        from crawly.environment import bootstrap_async
+        
+        # Finished in on_task_finished ("setup" task event)
+        self.orchestrator.spawn(
+            bootstrap_async(self.project_root,
+                            log=self.log_message,
+                            wheelhouse=self.config["wheelhouse"] or self.project_root / "wheelhouse",
+                            offline=self.config["offline_install"],
+                            cache_dir=self.config["pip_cache_dir"]),
+            name="setup")
+    
+    def on_orchestrator_event(self, kind, data):
+        """Orchestrator loop thread: pass events on to the GUI thread"""
+        if kind == "task":
+            self.root.after(0, self.on_task_finished, data["name"], data["result"], data["error"])
+        elif kind == "status":
+            self.root.after(0, self.update_status, data["message"], data["color"])
+        elif kind == "resources":
+            self.root.after(0, self.update_resources, data["totals"], data["runs"])
+    
+    def on_task_finished(self, name, result, error):
+        """Finish environment setup and recordings that ran on the orchestrator loop"""
+        if name == "setup":
+            if error is None:
                 self.log_message("Environment setup completed successfully!")
                 self.update_status("Environment ready", "green")
             else:
-                self.log_message(f"Error installing Playwright browsers: {result.stderr}")
+                self.log_message(f"Error setting up environment: {error}")
                 self.update_status("Environment setup failed", "red")
-                
-        except Exception as e:
-            self.log_message(f"Error setting up environment: {str(e)}")
-            self.update_status("Environment setup failed", "red")
+        elif name == "record":
+            self.finish_recording(result, error)
     
     def load_scripts(self):
         """Load available scripts from scripts directory"""
+        if self.catalogue is None:
+            return
+        
+        # Only new and modified files are read again
+        self.catalogue.scan()
+        self.show_scripts()
+    
+    def show_scripts(self):
+        """Show the catalogued scripts in the script list"""
         self.available_scripts = []
         
         if not self.scripts_dir.exists():
             self.log_message("Scripts directory not found!")
             return
         
-        # Find all Python files in scripts directory
-        for script_file in self.scripts_dir.glob("*.py"):
-            script_name = script_file.stem  # Filename without extension
-            self.available_scripts.append(script_name)
-        
-        # Update combobox
-        self.script_combo['values'] = self.available_scripts
+        self.available_scripts = self.catalogue.names()
+        self.apply_script_filter()
         
         if self.available_scripts:
-            self.script_combo.current(0)  # Select first script
             self.log_message(f"Found {len(self.available_scripts)} scripts")
         else:
             self.log_message("No Python scripts found in scripts directory")
     
+    def on_scripts_changed(self, added, changed, removed):
+        """Catalogue watcher reported changes in scripts/ (GUI thread)"""
+        for label, names in (("Added", added), ("Changed", changed), ("Removed", removed)):
+            if names:
+                self.log_message(f"{label} script(s): {', '.join(names)}")
+        self.available_scripts = self.catalogue.names()
+        self.apply_script_filter()
+    
+    def visible_scripts(self):
+        """Scripts matching the type-ahead filter"""
+        if self.catalogue is None:
+            return []
+        return self.catalogue.filter(self.script_filter.get())
+    
+    def apply_script_filter(self):
+        """Limit the script list to names matching the filter, keeping the selection if possible"""
+        scripts = self.visible_scripts()
+        self.script_combo['values'] = scripts
+        
+        if self.selected_script.get() not in scripts:
+            if scripts:
+                self.script_combo.current(0)  # Select first script
+            else:
+                self.selected_script.set("")
+        self.update_script_info()
+    
+    def update_script_info(self):
+        """Show the catalogue metadata of the selected script"""
+        name = self.selected_script.get()
+        info = self.catalogue.get(name) if self.catalogue and name else None
+        if info is None:
+            self.script_info_label.config(text="")
+            return
+        
+        if info["error"]:
+            parts = [info["error"]]
+        else:
+            parts = [info["browser"] or "browser unknown", f"{info['steps']} steps"]
+        if info["start_url"]:
+            parts.append(info["start_url"])
+        if info.get("last_status"):
+            parts.append(f"last run: {info['last_status']}")
+        self.script_info_label.config(text="  ·  ".join(parts))
+    
     def start_script(self):
-        """Start the selected script"""
+        """Queue the selected script for execution"""
         if not self.selected_script.get():
             messagebox.showwarning("Warning", "Please select a script first")
             return
         
-        if self.is_running:
-            messagebox.showwarning("Warning", "A script is already running")
+        if self.is_recording:
+            messagebox.showwarning("Warning", "A recording is in progress")
+            return
+        
+        if not self.venv_dir.exists():
+            messagebox.showerror("Error", "Virtual environment not found. Please wait for setup to complete.")
+            return
+        
+        # Queue script; the run queue starts it as soon as a worker is free
+        script_name = self.selected_script.get()
+        self.run_queue.submit(script_name)
+    
+    def run_all_scripts(self):
+        """Queue every script matching the filter for execution"""
+        scripts = self.visible_scripts()
+        if not scripts:
+            messagebox.showwarning("Warning", "No scripts available")
+            return
+        
+        if self.is_recording:
+            messagebox.showwarning("Warning", "A recording is in progress")
+            return
+        
+        if not self.venv_dir.exists():
+            messagebox.showerror("Error", "Virtual environment not found. Please wait for setup to complete.")
+            return
+        
+        from crawly.planner import BatchPlan, estimate_durations, longest_first
+        
+        # Longest scripts first (by past durations), so no worker idles behind one long script
+        estimates = estimate_durations(self.executor.history, scripts) if self.executor else {}
+        scripts = longest_first(scripts, estimates)
+        jobs = [self.run_queue.submit(script_name) for script_name in scripts]
+        matching = " matching the filter" if self.script_filter.get().strip() else ""
+        self.log_message(f"Queued {len(scripts)} scripts{matching} "
+                         f"({self.run_queue.max_workers} parallel workers)")
+        
+        if self.batch_plan and not self.batch_plan.finished:
+            # Another batch is still running: estimate (and summarise) both together
+            jobs = self.batch_plan.jobs + jobs
+            estimates = {**self.batch_plan.estimates, **estimates}
+        self.batch_plan = BatchPlan(jobs, estimates, self.run_queue.max_workers)
+        self.update_eta()
+    
+    def run_with_data(self):
+        """Run the selected script once per row of a CSV/JSONL file"""
+        from tkinter import filedialog
+        
+        if not self.selected_script.get():
+            messagebox.showwarning("Warning", "Please select a script first")
+            return
+        
+        if self.is_recording:
+            messagebox.showwarning("Warning", "A recording is in progress")
             return
         
         if not self.venv_dir.exists():
             messagebox.showerror("Error", "Virtual environment not found. Please wait for setup to complete.")
             return
         
-        # Start script in separate thread
+        data_file = filedialog.askopenfilename(
+            title="Parameter rows",
+            filetypes=[("Data rows", "*.csv *.jsonl"), ("CSV", "*.csv"), ("JSON lines", "*.jsonl")]
+        )
+        if not data_file:
+            return
+        
+        # Rows of one data run are spread over the parallel workers
         script_name = self.selected_script.get()
-        threading.Thread(target=self.execute_script, args=(script_name,), daemon=True).start()
+        self.run_queue.submit(script_name, Path(data_file))
+        self.log_message(f"Queued {script_name} once per row of {Path(data_file).name} "
+                         f"({self.run_queue.max_workers} warm workers)")
+    
+    def update_worker_count(self):
+        """Apply the parallel worker count from the spinbox"""
+        try:
+            workers = max(1, int(self.worker_count.get()))
+        except (tk.TclError, ValueError):
+            workers = self.run_queue.max_workers
+        
+        self.worker_count.set(workers)
+        if self.executor:
+            self.executor.data_workers = workers
+        if workers != self.run_queue.max_workers:
+            self.run_queue.set_max_workers(workers)
+            self.log_message(f"Parallel workers set to {workers}")
     
-    def execute_script(self, script_name):
-        """Execute the selected script"""
-        self.is_running = True
-        self.update_ui_running_state(True)
+    async def execute_script(self, job):
+        """Execute a queued script job on the orchestrator loop, returns the process exit code"""
+        if self.executor is None:
+            raise RuntimeError("the execution core is still loading")
+        return await self.executor.execute_async(job)
+    
+    def update_profile(self):
+        """Apply the selected execution profile to new runs"""
+        if self.executor:
+            self.executor.profile = self.selected_profile.get()
+        self.log_message(f"Execution profile set to {self.selected_profile.get()}")
+    
+    def update_instrumentation(self):
+        """Switch per-step timing instrumentation for new runs"""
+        if self.executor:
+            self.executor.instrument = self.record_timings.get()
+    
+    def update_har_mode(self):
+        """Apply the HAR cache mode to new runs"""
+        if self.executor:
+            self.executor.har_mode = self.har_mode.get()
+        self.log_message(f"HAR cache set to {self.har_mode.get()}")
+    
+    def update_site_cache(self):
+        """Apply the site state and asset cache checkboxes to new runs"""
+        if self.executor:
+            self.executor.site_state = self.site_state.get()
+            self.executor.asset_cache = self.asset_cache.get()
+    
+    def clear_site_cache(self):
+        """Forget saved site state and cached assets"""
+        from crawly.sitecache import clear_assets, clear_states
         
-        script_path = self.scripts_dir / f"{script_name}.py"
+        if not messagebox.askyesno("Clear Cache",
+                                   "Remove saved cookies/consent of all sites and all cached assets?"):
+            return
+        try:
+            clear_assets(self.project_root / self.config["asset_cache_dir"])
+            removed = clear_states(self.project_root / self.config["state_dir"])
+            self.log_message(f"Asset cache cleared, {removed} saved site state(s) removed")
+        except OSError as e:
+            self.log_message(f"Could not clear cache: {e}")
+    
+    def update_runner_mode(self):
+        """Apply the warm browser checkbox"""
+        if self.executor:
+            self.executor.warm = self.warm_browser.get()
+    
+    def on_job_changed(self, job):
+        """Called from worker threads whenever a job changes state"""
+        if job.status == FAILED and job.error:
+            # The executor raised instead of running the script
+            self.root.after(0, self.log_message, f"Run of {job.label} failed with an error:\n{job.error.rstrip()}")
+        self.root.after(0, self._refresh_jobs)
+    
+    def _refresh_jobs(self):
+        """Sync the runs list and buttons with the run queue (GUI thread)"""
+        for job in list(self.run_queue.jobs.values()):
+            item = str(job.id)
+            if self.jobs_tree.exists(item):
+                self.jobs_tree.item(item, values=(job.label, job.status))
+            else:
+                self.jobs_tree.insert("", tk.END, iid=item, values=(job.label, job.status))
         
-        # Create log file
-        timestamp = datetime.datetime.now().strftime("%d-%m-%Y_%H-%M-%S")
-        log_file = self.logs_dir / f"{script_name}_{timestamp}.txt"
+        running = len(self.run_queue.active_jobs())
+        queued = len(self.run_queue.pending_jobs())
+        if running or queued:
+            self.update_status(f"Running {running} script(s), {queued} queued", "orange")
+        
+        # Last run status of the selected script may have changed
+        self.update_script_info()
+        self.update_ui_running_state()
+    
+    def clear_finished_jobs(self):
+        """Remove finished jobs from the runs list"""
+        self.run_queue.clear_finished()
+        for item in self.jobs_tree.get_children():
+            if int(item) not in self.run_queue.jobs:
+                self.jobs_tree.delete(item)
+    
+    def open_job_log(self):
+        """Open the full log file of the selected run"""
+        selected = self.jobs_tree.selection()
+        if not selected:
+            messagebox.showinfo("Log File", "Select a run first")
+            return
+        
+        job = self.run_queue.jobs.get(int(selected[0]))
+        if job is None or job.log_file is None:
+            messagebox.showinfo("Log File", "This run has no log file yet")
+            return
+        
+        self.open_log_file(job.log_file)
+    
+    def open_log_file(self, log_file):
+        """Open a log file with the system's default viewer"""
+        log_file = Path(log_file)
+        if not log_file.exists():
+            messagebox.showinfo("Log File", f"Log file not found:\n{log_file}")
+            return
+        
+        # Compressed logs are decompressed while streaming into a viewer window
+        if log_file.suffix in (".gz", ".zst"):
+            LogFileWindow(self.root, log_file)
+            return
+        
+        import subprocess
         
         try:
-            self.update_status(f"Starting {script_name}...", "orange")
-            self.log_message(f"Starting script: {script_name}")
-            self.log_message(f"Log file: {log_file}")
-            
-            # Get Python path from venv
             if sys.platform == "win32":
-                python_path = self.venv_dir / "Scripts" / "python"
+                os.startfile(log_file)
+            elif sys.platform == "darwin":
+                subprocess.Popen(["open", str(log_file)])
             else:
-                python_path = self.venv_dir / "bin" / "python"
-            
-            # Execute script
-            with open(log_file, 'w') as f:
-                self.process = subprocess.Popen(
-                    [str(python_path), str(script_path)],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    bufsize=1,
-                    universal_newlines=True
-                )
-                
-                # Read output in real-time
-                for line in iter(self.process.stdout.readline, ''):
-                    if line:
-                        line = line.strip()
-                        self.log_message(line)
-                        f.write(f"{datetime.datetime.now()}: {line}\n")
-                        f.flush()
-                
-                # Wait for process to complete
-                self.process.wait()
-                
-                if self.process.returncode == 0:
-                    self.log_message(f"Script {script_name} completed successfully!")
-                    self.update_status("Script completed", "green")
-                else:
-                    self.log_message(f"Script {script_name} failed with return code {self.process.returncode}")
-                    self.update_status("Script failed", "red")
-                    
+                subprocess.Popen(["xdg-open", str(log_file)])
         except Exception as e:
-            self.log_message(f"Error executing script: {str(e)}")
-            self.update_status("Execution error", "red")
-            
-        finally:
-            self.is_running = False
-            self.update_ui_running_state(False)
+            self.log_message(f"Error opening log file: {str(e)}")
+    
+    def show_history(self):
+        """Open the run history window"""
+        if self.executor is None:
+            messagebox.showinfo("History", "Still loading, try again in a moment")
+            return
+        HistoryWindow(self.root, self.executor.history, self.open_log_file)
     
     def stop_script(self):
-        """Stop the currently running script or recording"""
+        """Stop the selected job(s), all jobs when nothing is selected, or the recording"""
         stopped = False
         
         # Stop regular script execution
-        if hasattr(self, 'process') and self.process:
-            try:
-                self.process.terminate()
-                self.log_message("Script stopped by user")
+        selected = [int(item) for item in self.jobs_tree.selection()]
+        try:
+            if selected:
+                cancelled = sum(1 for job_id in selected if self.run_queue.cancel(job_id))
+            else:
+                cancelled = self.run_queue.cancel_all()
+            
+            if cancelled:
+                self.log_message(f"Stopped {cancelled} script(s) by user")
                 self.update_status("Script stopped", "orange")
                 stopped = True
-            except Exception as e:
-                self.log_message(f"Error stopping script: {str(e)}")
+        except Exception as e:
+            self.log_message(f"Error stopping script: {str(e)}")
         
         # Stop codegen recording
-        if hasattr(self, 'codegen_process') and self.codegen_process:
+        if self.codegen_process:
             try:
                 self.codegen_process.terminate()
                 self.log_message("Recording stopped by user")
@@ -349,20 +777,38 @@ class SiteTesterApp:
         if not stopped:
             self.log_message("No active process to stop")
     
-    def update_ui_running_state(self, running):
+    def stop_all_scripts(self):
+        """Cancel every queued and running job"""
+        cancelled = self.run_queue.cancel_all()
+        if cancelled:
+            self.log_message(f"Stopped {cancelled} script(s) by user")
+            self.update_status("All scripts stopped", "orange")
+        else:
+            self.log_message("No active process to stop")
+    
+    def update_ui_running_state(self):
         """Update UI elements based on running state"""
-        if running:
+        has_jobs = self.run_queue.has_work()
+        
+        if self.is_recording:
             self.start_button.config(state=tk.DISABLED)
+            self.run_all_button.config(state=tk.DISABLED)
+            self.data_button.config(state=tk.DISABLED)
             self.stop_button.config(state=tk.NORMAL)
             self.script_combo.config(state=tk.DISABLED)
             self.record_button.config(state=tk.DISABLED)
             self.refresh_button.config(state=tk.DISABLED)
         else:
+            # Scripts can still be queued while others run
             self.start_button.config(state=tk.NORMAL)
-            self.stop_button.config(state=tk.DISABLED)
+            self.run_all_button.config(state=tk.NORMAL)
+            self.data_button.config(state=tk.NORMAL)
+            self.stop_button.config(state=tk.NORMAL if has_jobs else tk.DISABLED)
             self.script_combo.config(state="readonly")
-            self.record_button.config(state=tk.NORMAL)
+            self.record_button.config(state=tk.DISABLED if has_jobs else tk.NORMAL)
             self.refresh_button.config(state=tk.NORMAL)
+        
+        self.stop_all_button.config(state=tk.NORMAL if has_jobs else tk.DISABLED)
     
     def update_status(self, message, color="black"):
         """Update status label"""
@@ -376,22 +822,108 @@ class SiteTesterApp:
         actual_color = color_map.get(color, color)
         self.status_label.config(text=message, foreground=actual_color)
     
+    def update_eta(self):
+        """Show the remaining time of the current batch, refreshed every second while it runs"""
+        from crawly.planner import format_eta
+        
+        if self._eta_after is not None:
+            self.root.after_cancel(self._eta_after)
+            self._eta_after = None
+        
+        plan = self.batch_plan
+        if plan is None or plan.finished:
+            if plan is not None:
+                self.log_batch_summary(plan.jobs)
+            self.batch_plan = None
+            self.eta_label.config(text="")
+            return
+        
+        self.eta_label.config(text=format_eta(plan.remaining(self.run_queue.max_workers)))
+        self._eta_after = self.root.after(1000, self.update_eta)
+    
+    def log_batch_summary(self, jobs):
+        """Log the outcome of a finished Run All batch, with flaky runs and hard failures"""
+        from crawly.retry import describe_failure, triage
+        
+        passed, flaky, failed = triage(jobs)
+        flaky_count = f" ({len(flaky)} flaky)" if flaky else ""
+        self.log_message(f"Batch finished: {len(passed) + len(flaky)} passed{flaky_count}, {len(failed)} failed")
+        for job in flaky:
+            self.log_message(f"  FLAKY  {job.label} (passed on attempt {job.attempt})")
+        for job in failed:
+            self.log_message(f"  FAILED {job.label} ({describe_failure(job)})")
+    
+    def update_resources(self, totals, runs):
+        """Record a round of resource samples and redraw the sparkline (GUI thread)"""
+        if totals is None:
+            # Nothing running any more
+            self.resource_history.clear()
+            self.resource_label.config(text="")
+            self.resource_canvas.delete("all")
+            return
+        
+        for key, sample in [(None, totals)] + list(runs.items()):
+            if key not in self.resource_history:
+                self.resource_history[key] = collections.deque(maxlen=self.config["monitor_history"])
+            self.resource_history[key].append(sample)
+        for key in [key for key in self.resource_history if key is not None and key not in runs]:
+            del self.resource_history[key]
+        self.draw_resources()
+    
+    def draw_resources(self):
+        """Sparkline of the selected run, or of all runs when none (or several) are selected"""
+        from crawly.monitor import format_bytes
+        
+        selected = self.jobs_tree.selection()
+        key = int(selected[0]) if len(selected) == 1 and int(selected[0]) in self.resource_history else None
+        samples = list(self.resource_history.get(key, ()))
+        canvas = self.resource_canvas
+        canvas.delete("all")
+        if not samples:
+            self.resource_label.config(text="")
+            return
+        
+        latest = samples[-1]
+        prefix = f"{self.run_queue.jobs[key].label}: " if key in self.run_queue.jobs else ""
+        self.resource_label.config(text=f"{prefix}CPU {latest.cpu:.0f}% · RAM {format_bytes(latest.rss)}")
+        
+        width, height = int(canvas.cget("width")), int(canvas.cget("height"))
+        step = width / max(1, self.config["monitor_history"] - 1)
+        start = width - step * (len(samples) - 1)
+        for values, floor, color in (([sample.cpu for sample in samples], 100.0, "#007AFF"),
+                                     ([sample.rss for sample in samples], 1.0, "#FF9500")):
+            scale = max(max(values), floor)
+            points = []
+            for index, value in enumerate(values):
+                points += [start + index * step, height - 2 - (height - 4) * value / scale]
+            if len(points) >= 4:
+                canvas.create_line(*points, fill=color, width=1.5)
+    
     def log_message(self, message):
         """Add message to log output"""
         timestamp = datetime.datetime.now().strftime("%H:%M:%S")
         formatted_message = f"[{timestamp}] {message}\n"
         
-        # Thread-safe GUI update
-        self.root.after(0, lambda: self._append_to_log(formatted_message))
+        # Thread-safe: the GUI thread picks it up on the next log tick
+        self.log_queue.put(formatted_message)
     
-    def _append_to_log(self, message):
-        """Append message to log text widget (thread-safe)"""
-        self.log_text.insert(tk.END, message)
-        self.log_text.see(tk.END)
+    def _drain_log(self):
+        """Insert all pending log lines in one go (GUI thread, runs every tick)"""
+        try:
+            lines = self.log_queue.drain()
+            if lines:
+                self._append_to_log(lines)
+        finally:
+            self.root.after(self.log_tick_ms, self._drain_log)
+    
+    def _append_to_log(self, messages):
+        """Append messages to the log view (GUI thread only)"""
+        self.log_view.append(messages)
     
     def clear_log(self):
         """Clear the log output"""
-        self.log_text.delete(1.0, tk.END)
+        self.log_queue.clear()
+        self.log_view.clear()
     
     def record_new_script(self):
         """Start recording a new Playwright script"""
@@ -404,94 +936,117 @@ class SiteTesterApp:
             return
         
         # Create dialog for script details
-        dialog = ScriptRecordDialog(self.root, self.record_script_callback)
+        dialog = ScriptRecordDialog(self.root, self.record_script_callback,
+                                    self.config["optimize_recordings"])
     
-    def record_script_callback(self, script_name, start_url):
+    def record_script_callback(self, script_name, start_url, optimize=False):
         """Callback function to start script recording"""
         if not script_name:
             return
         
-        # Start recording in separate thread
-        threading.Thread(target=self.execute_playwright_codegen, 
-                        args=(script_name, start_url), daemon=True).start()
+        if self.orchestrator is None:
+            messagebox.showinfo("Record Script", "Still loading, try again in a moment")
+            return
+        
+        self.is_recording = True
+        self.update_ui_running_state()
+        self.update_status(f"Recording script: {script_name}...", "orange")
+        self.log_message(f"Starting Playwright codegen for: {script_name}")
+        self.log_message(f"Starting URL: {start_url}")
+        
+        # Codegen runs on the orchestrator loop; finish_recording gets the result
+        self.orchestrator.spawn(self.execute_playwright_codegen(script_name, start_url, optimize),
+                                name="record")
     
-    def execute_playwright_codegen(self, script_name, start_url):
-        """Execute playwright codegen to record a new script"""
-        self.is_running = True
-        self.update_ui_running_state(True)
+    async def execute_playwright_codegen(self, script_name, start_url, optimize=False):
+        """Execute playwright codegen to record a new script, returns what finish_recording needs"""
+        from crawly.runner import venv_python
         
-        try:
-            self.update_status(f"Recording script: {script_name}...", "orange")
-            self.log_message(f"Starting Playwright codegen for: {script_name}")
-            self.log_message(f"Starting URL: {start_url}")
-            
-            # Get Python path from venv
-            if sys.platform == "win32":
-                python_path = self.venv_dir / "Scripts" / "python"
-            else:
-                python_path = self.venv_dir / "bin" / "python"
-            
-            # Create temporary file for the generated script
-            temp_script_file = self.project_root / f"{script_name}_temp.py"
-            
-            # Execute playwright codegen
-            cmd = [
-                str(python_path), "-m", "playwright", "codegen",
-                "--output", str(temp_script_file),
-                start_url
-            ]
-            
-            self.log_message("Playwright codegen started. Close the browser when finished recording.")
-            
-            # Run codegen and wait for completion
-            self.codegen_process = subprocess.Popen(cmd, 
-                                                   stdout=subprocess.PIPE,
-                                                   stderr=subprocess.PIPE,
-                                                   text=True)
-            
-            # Wait for process to complete
-            stdout, stderr = self.codegen_process.communicate()
-            
-            if self.codegen_process.returncode == 0:
-                self.log_message("Recording completed successfully!")
-                
-                # Check if temp file was created and has content
-                if temp_script_file.exists() and temp_script_file.stat().st_size > 0:
-                    # Ask user if they want to save the script
-                    self.root.after(0, lambda: self.save_recorded_script(script_name, temp_script_file))
-                else:
-                    self.log_message("No script was generated. Recording may have been cancelled.")
-                    self.update_status("Recording cancelled", "orange")
-            else:
-                self.log_message(f"Recording failed: {stderr}")
-                self.update_status("Recording failed", "red")
-                
-        except Exception as e:
-            self.log_message(f"Error during recording: {str(e)}")
+        # Get Python path from venv
+        python_path = venv_python(self.venv_dir)
+        
+        # Create temporary file for the generated script
+        temp_script_file = self.project_root / f"{script_name}_temp.py"
+        
+        # Execute playwright codegen
+        cmd = [
+            str(python_path), "-m", "playwright", "codegen",
+            "--output", str(temp_script_file),
+            start_url
+        ]
+        
+        self.log_message("Playwright codegen started. Close the browser when finished recording.")
+        
+        def attach(handle):
+            self.codegen_process = handle
+        
+        output = []
+        returncode = await self.orchestrator.run_process(cmd, output.append, on_start=attach,
+                                                         name=f"codegen {script_name}")
+        return script_name, temp_script_file, optimize, returncode, "".join(output)
+    
+    def finish_recording(self, result, error):
+        """GUI thread: handle the end of a codegen run"""
+        self.is_recording = False
+        self.codegen_process = None
+        self.update_ui_running_state()
+        
+        if error is not None:
+            self.log_message(f"Error during recording: {error}")
             self.update_status("Recording error", "red")
+            return
+        
+        script_name, temp_script_file, optimize, returncode, output = result
+        if returncode == 0:
+            self.log_message("Recording completed successfully!")
             
-        finally:
-            self.is_running = False
-            self.update_ui_running_state(False)
+            # Check if temp file was created and has content
+            if temp_script_file.exists() and temp_script_file.stat().st_size > 0:
+                # Ask user if they want to save the script
+                self.save_recorded_script(script_name, temp_script_file, optimize)
+            else:
+                self.log_message("No script was generated. Recording may have been cancelled.")
+                self.update_status("Recording cancelled", "orange")
+        else:
+            self.log_message(f"Recording failed: {output.strip()}")
+            self.update_status("Recording failed", "red")
     
-    def save_recorded_script(self, script_name, temp_file):
+    def save_recorded_script(self, script_name, temp_file, optimize=False):
         """Ask user to save the recorded script and handle the saving"""
         try:
-            # Show dialog asking if user wants to save
-            result = messagebox.askyesno(
-                "Save Recorded Script", 
-                f"Recording completed!\n\nDo you want to save the script as '{script_name}.py'?",
-                icon="question"
-            )
+            with open(temp_file, 'r', encoding='utf-8') as temp_f:
+                script_content = temp_f.read()
+            
+            removed = []
+            if optimize:
+                from crawly.optimize import describe_saving, optimize_script
+                try:
+                    optimised, removed = optimize_script(script_content)
+                except SyntaxError as e:
+                    self.log_message(f"Recorded script not optimised (line {e.lineno}: {e.msg})")
+                else:
+                    if not removed:
+                        self.log_message(f"Recorded script: {describe_saving(0)}")
+            
+            if removed:
+                # Show the diff; the user saves the optimised or the recorded version
+                review = OptimizeDialog(self.root, script_name, script_content, optimised, removed)
+                result = review.result is not None
+                if review.result == "optimised":
+                    script_content = optimised
+                    self.log_message(f"Optimised recording saved: {describe_saving(len(removed))}")
+            else:
+                # Show dialog asking if user wants to save
+                result = messagebox.askyesno(
+                    "Save Recorded Script", 
+                    f"Recording completed!\n\nDo you want to save the script as '{script_name}.py'?",
+                    icon="question"
+                )
             
             if result:
-                # Move temp file to scripts directory
+                # Write the script to the scripts directory
                 final_script_path = self.scripts_dir / f"{script_name}.py"
                 
-                # Read content from temp file and write to final location
-                with open(temp_file, 'r', encoding='utf-8') as temp_f:
-                    script_content = temp_f.read()
-                
                 with open(final_script_path, 'w', encoding='utf-8') as final_f:
                     final_f.write(script_content)
                 
@@ -503,7 +1058,10 @@ class SiteTesterApp:
                 
                 # Select the new script
                 if script_name in self.available_scripts:
+                    if script_name not in self.visible_scripts():
+                        self.script_filter.set("")
                     self.selected_script.set(script_name)
+                    self.update_script_info()
                     self.log_message(f"New script '{script_name}' is now selected")
             else:
                 self.log_message("Script recording discarded by user")
@@ -522,17 +1080,298 @@ class SiteTesterApp:
                     self.log_message(f"Warning: Could not delete temp file: {e}")
 
 
+class VirtualLogView(ttk.Frame):
+    """Log view rendering only the visible window of a LogBuffer"""
+    
+    def __init__(self, parent, buffer, **text_options):
+        super().__init__(parent)
+        self.buffer = buffer
+        self.first = 0          # Buffer index of the first line on screen
+        self.follow = True      # Stick to the newest line
+        self._dropped = 0
+        
+        self.text = tk.Text(self, wrap=tk.CHAR, **text_options)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self._line_height = tkfont.Font(font=self.text.cget("font")).metrics("linespace")
+        
+        # Scrolling moves the window over the buffer instead of the widget content
+        self.text.bind('<Configure>', lambda e: self.render())
+        self.text.bind('<MouseWheel>', self._on_mousewheel)
+        self.text.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.text.bind('<Button-5>', lambda e: self.scroll(3))
+        self.text.bind('<Prior>', lambda e: self.scroll(-self.visible_lines()))
+        self.text.bind('<Next>', lambda e: self.scroll(self.visible_lines()))
+    
+    def visible_lines(self):
+        """Number of lines that fit in the widget"""
+        return max(1, self.text.winfo_height() // self._line_height)
+    
+    def append(self, messages):
+        """Add messages to the buffer and refresh the visible window"""
+        self.buffer.extend(messages)
+        
+        # Keep the same lines on screen when old lines fall out of the buffer
+        dropped = self.buffer.dropped - self._dropped
+        self._dropped = self.buffer.dropped
+        if not self.follow:
+            self.first = max(0, self.first - dropped)
+        
+        self.render()
+    
+    def clear(self):
+        """Remove all lines"""
+        self.buffer.clear()
+        self._dropped = 0
+        self.first = 0
+        self.follow = True
+        self.render()
+    
+    def scroll(self, lines):
+        """Scroll the window by a number of lines"""
+        self.first += lines
+        self.follow = False
+        self.render()
+        return "break"
+    
+    def render(self):
+        """Draw the visible window of the buffer"""
+        total = len(self.buffer)
+        visible = self.visible_lines()
+        last_first = max(0, total - visible)
+        
+        if self.follow or self.first >= last_first:
+            self.first = last_first
+            self.follow = True
+        self.first = max(0, self.first)
+        
+        lines = self.buffer.window(self.first, visible)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(lines))
+        if self.follow:
+            self.text.see(tk.END)
+        
+        if total:
+            self.scrollbar.set(self.first / total, (self.first + len(lines)) / total)
+        else:
+            self.scrollbar.set(0, 1)
+    
+    def _on_scrollbar(self, action, amount, unit=None):
+        """Handle scrollbar drag and arrow clicks"""
+        if action == tk.MOVETO:
+            self.first = int(float(amount) * len(self.buffer))
+            self.follow = False
+            self.render()
+        elif action == tk.SCROLL:
+            step = self.visible_lines() if unit == tk.PAGES else 1
+            self.scroll(int(amount) * step)
+    
+    def _on_mousewheel(self, event):
+        """Mouse wheel on Windows and macOS"""
+        if sys.platform == "win32":
+            return self.scroll(-(event.delta // 120) * 3)
+        return self.scroll(-event.delta)
+
+
+class HistoryWindow:
+    """Window for querying the run history and charting trends"""
+    
+    SINCE_OPTIONS = {"Last 24 hours": "1d", "Last 7 days": "7d", "Last 30 days": "30d", "All": None}
+    STATUS_OPTIONS = ["all", "completed", "failed", "cancelled"]
+    
+    def __init__(self, parent, history, open_log_file):
+        self.history = history
+        self.open_log_file = open_log_file
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("Run History")
+        self.window.geometry("900x600")
+        self.window.transient(parent)
+        
+        self.script_var = tk.StringVar(value="")
+        self.status_var = tk.StringVar(value="all")
+        self.since_var = tk.StringVar(value="Last 7 days")
+        
+        self.setup_window()
+        self.refresh()
+    
+    def setup_window(self):
+        """Setup the history window interface"""
+        main_frame = ttk.Frame(self.window, padding="15")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Filters
+        filter_frame = ttk.Frame(main_frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        ttk.Label(filter_frame, text="Script:").pack(side=tk.LEFT)
+        ttk.Combobox(filter_frame, textvariable=self.script_var, width=25,
+                     values=[""] + self.history.scripts()).pack(side=tk.LEFT, padx=(5, 15))
+        
+        ttk.Label(filter_frame, text="Status:").pack(side=tk.LEFT)
+        ttk.Combobox(filter_frame, textvariable=self.status_var, width=10, state="readonly",
+                     values=self.STATUS_OPTIONS).pack(side=tk.LEFT, padx=(5, 15))
+        
+        ttk.Label(filter_frame, text="Period:").pack(side=tk.LEFT)
+        ttk.Combobox(filter_frame, textvariable=self.since_var, width=14, state="readonly",
+                     values=list(self.SINCE_OPTIONS)).pack(side=tk.LEFT, padx=(5, 15))
+        
+        ttk.Button(filter_frame, text="Search", command=self.refresh,
+                   style="Action.TButton").pack(side=tk.LEFT)
+        
+        self.summary_label = ttk.Label(main_frame, text="")
+        self.summary_label.pack(anchor=tk.W, pady=(0, 5))
+        
+        # Trend chart: average duration per day, failures in red
+        self.chart = tk.Canvas(main_frame, height=140, bg="white", highlightthickness=0)
+        self.chart.pack(fill=tk.X, pady=(0, 10))
+        self.chart.bind('<Configure>', lambda e: self.draw_chart())
+        
+        # Runs
+        columns = ("started", "script", "status", "returncode", "duration")
+        self.runs_tree = ttk.Treeview(main_frame, columns=columns, show="headings")
+        for column, title, width in [("started", "Started", 160), ("script", "Script", 220),
+                                     ("status", "Status", 100), ("returncode", "Exit code", 80),
+                                     ("duration", "Duration", 90)]:
+            self.runs_tree.heading(column, text=title)
+            self.runs_tree.column(column, width=width)
+        self.runs_tree.pack(fill=tk.BOTH, expand=True)
+        self.runs_tree.bind('<Double-1>', self.on_open_run)
+        
+        ttk.Label(main_frame, text="Double-click a run to open its log file",
+                  foreground="#8E8E93").pack(anchor=tk.W, pady=(5, 0))
+    
+    def refresh(self):
+        """Run the query for the current filters"""
+        from crawly.history import parse_since
+        
+        since_value = self.SINCE_OPTIONS.get(self.since_var.get())
+        since = parse_since(since_value) if since_value else None
+        script = self.script_var.get() or None
+        status = None if self.status_var.get() == "all" else self.status_var.get()
+        
+        started = datetime.datetime.now()
+        runs = self.history.query(script, status, since, limit=1000)
+        self.trend = self.history.trend(script, since)
+        elapsed_ms = (datetime.datetime.now() - started).total_seconds() * 1000
+        
+        self.log_files = {}
+        self.runs_tree.delete(*self.runs_tree.get_children())
+        for run in runs:
+            item = str(run["id"])
+            self.log_files[item] = run["log_file"]
+            self.runs_tree.insert("", tk.END, iid=item, values=(
+                datetime.datetime.fromtimestamp(run["started"]).strftime("%d-%m-%Y %H:%M:%S"),
+                run["script"],
+                run["status"],
+                "" if run["returncode"] is None else run["returncode"],
+                "" if run["duration"] is None else f"{run['duration']:.1f}s",
+            ))
+        
+        failures = sum(1 for run in runs if run["status"] == "failed")
+        self.summary_label.config(text=f"{len(runs)} runs, {failures} failed "
+                                       f"(query took {elapsed_ms:.1f} ms)")
+        self.draw_chart()
+    
+    def draw_chart(self):
+        """Draw average duration per day as bars, with the failed share in red"""
+        self.chart.delete("all")
+        days = getattr(self, "trend", [])
+        if not days:
+            return
+        
+        width = self.chart.winfo_width()
+        height = self.chart.winfo_height()
+        longest = max((day["avg_duration"] or 0 for day in days), default=0) or 1
+        bar_width = max(2, (width - 20) / len(days))
+        
+        for index, day in enumerate(days):
+            x0 = 10 + index * bar_width
+            x1 = x0 + bar_width * 0.8
+            bar_height = (height - 30) * (day["avg_duration"] or 0) / longest
+            self.chart.create_rectangle(x0, height - 20 - bar_height, x1, height - 20,
+                                        fill="#007AFF", outline="")
+            if day["failures"]:
+                fail_height = bar_height * day["failures"] / day["runs"]
+                self.chart.create_rectangle(x0, height - 20 - fail_height, x1, height - 20,
+                                            fill="#FF3B30", outline="")
+            if len(days) <= 31:
+                self.chart.create_text((x0 + x1) / 2, height - 10, text=day["day"][5:],
+                                       font=("Segoe UI", 7))
+        
+        self.chart.create_text(10, 8, anchor=tk.W, font=("Segoe UI", 8),
+                               text=f"Average duration per day (max {longest:.1f}s), failed share in red")
+    
+    def on_open_run(self, event):
+        """Open the log file of the double-clicked run"""
+        item = self.runs_tree.identify_row(event.y)
+        if item and self.log_files.get(item):
+            self.open_log_file(self.log_files[item])
+
+
+class LogFileWindow:
+    """Read-only viewer streaming a (compressed) log file in chunks"""
+    
+    CHUNK_LINES = 2000
+    
+    def __init__(self, parent, log_file):
+        self.window = tk.Toplevel(parent)
+        self.window.title(Path(log_file).name)
+        self.window.geometry("900x600")
+        
+        self.text = tk.Text(self.window, font=("Monaco", 11), bg="#1e1e1e", fg="#ffffff", wrap=tk.NONE)
+        scrollbar = ttk.Scrollbar(self.window, orient=tk.VERTICAL, command=self.text.yview)
+        self.text.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(fill=tk.BOTH, expand=True)
+        
+        from crawly.retention import open_log
+        
+        try:
+            self.stream = open_log(log_file)
+        except OSError as e:
+            self.text.insert(tk.END, f"Error opening log file: {e}")
+            return
+        
+        self.window.bind('<Destroy>', lambda e: self.stream.close())
+        self.window.after(0, self.load_chunk)
+    
+    def load_chunk(self):
+        """Insert the next chunk of lines, keeping the GUI responsive"""
+        if not self.window.winfo_exists():
+            return
+        
+        try:
+            lines = []
+            for line in self.stream:
+                lines.append(line)
+                if len(lines) >= self.CHUNK_LINES:
+                    break
+        except (OSError, ValueError, EOFError) as e:
+            self.text.insert(tk.END, f"\n[Error reading log: {e}]")
+            return
+        
+        if lines:
+            self.text.insert(tk.END, "".join(lines))
+            self.window.after(1, self.load_chunk)
+        else:
+            self.stream.close()
+
+
 class ScriptRecordDialog:
     """Dialog for entering new script recording details"""
     
-    def __init__(self, parent, callback):
+    def __init__(self, parent, callback, optimize=False):
         self.result = None
         self.callback = callback
+        self.optimize = tk.BooleanVar(value=optimize)
         
         # Create dialog window
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("Neem nieuw script op")
-        self.dialog.geometry("420x360")
+        self.dialog.geometry("420x400")
         self.dialog.transient(parent)
         self.dialog.grab_set()
         
@@ -546,7 +1385,7 @@ class ScriptRecordDialog:
         parent_height = parent.winfo_height()
         
         dialog_width = 420
-        dialog_height = 360
+        dialog_height = 400
         
         center_x = parent_x + (parent_width - dialog_width) // 2
         center_y = parent_y + (parent_height - dialog_height) // 2
@@ -591,6 +1430,10 @@ class ScriptRecordDialog:
         self.start_url_entry.pack(fill=tk.X, pady=(5, 0))
         self.start_url_entry.insert(0, "https://example.com")
         
+        # Opt-in post-processing of the recording (see crawly.optimize)
+        ttk.Checkbutton(main_frame, text="Overbodige stappen verwijderen (toont een diff)",
+                        variable=self.optimize).pack(anchor=tk.W, pady=(0, 15))
+        
         # Instructions
         instructions = ttk.Label(main_frame, 
                                text="De Playwright browser zal openen. Voer je acties uit en sluit\nde browser wanneer je klaar bent met opnemen.",
@@ -643,13 +1486,68 @@ class ScriptRecordDialog:
         
         # Close dialog and start recording
         self.dialog.destroy()
-        self.callback(script_name, start_url)
+        self.callback(script_name, start_url, self.optimize.get())
     
     def cancel(self):
         """Cancel the dialog"""
         self.dialog.destroy()
 
 
+class OptimizeDialog:
+    """Shows the diff of an optimised recording; result is "optimised", "recorded" or None"""
+    
+    def __init__(self, parent, script_name, original, optimised, removed):
+        from crawly.optimize import describe_saving, script_diff
+        
+        self.result = None
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title(f"Optimise {script_name}.py")
+        self.dialog.geometry("900x600")
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+        
+        main_frame = ttk.Frame(self.dialog, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(main_frame,
+                  text=describe_saving(len(removed))).pack(anchor=tk.W, pady=(0, 10))
+        
+        text_frame = ttk.Frame(main_frame)
+        text_frame.pack(fill=tk.BOTH, expand=True)
+        text = tk.Text(text_frame, wrap=tk.NONE, font=("Consolas", 10))
+        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=text.yview)
+        text.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        text.tag_configure("removed", foreground="#C0392B")
+        text.tag_configure("added", foreground="#27AE60")
+        text.tag_configure("hunk", foreground="#8E8E93")
+        for line in script_diff(original, optimised, f"{script_name}.py").splitlines(keepends=True):
+            tag = ("hunk" if line.startswith("@@") else
+                   "removed" if line.startswith("-") else
+                   "added" if line.startswith("+") else None)
+            text.insert(tk.END, line, tag)
+        text.configure(state=tk.DISABLED)
+        
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=(10, 0))
+        ttk.Button(button_frame, text="Save Optimised",
+                   command=lambda: self.close("optimised")).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(button_frame, text="Save as Recorded",
+                   command=lambda: self.close("recorded")).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(button_frame, text="Discard",
+                   command=lambda: self.close(None)).pack(side=tk.LEFT)
+        self.dialog.protocol("WM_DELETE_WINDOW", lambda: self.close(None))
+        
+        parent.wait_window(self.dialog)
+    
+    def close(self, result):
+        """Close the dialog with the user's choice"""
+        self.result = result
+        self.dialog.destroy()
+
+
 def main():
     """Main application entry point"""
     root = tk.Tk()
@@ -659,12 +1557,19 @@ def main():
     def on_closing():
         if app.is_running:
             if messagebox.askokcancel("Quit", "A script is running. Do you want to quit anyway?"):
-                if hasattr(app, 'process') and app.process:
-                    app.process.terminate()
-                if hasattr(app, 'codegen_process') and app.codegen_process:
+                app.run_queue.cancel_all()
+                if app.executor:
+                    app.executor.shutdown()
+                if app.catalogue:
+                    app.catalogue.stop()
+                if app.codegen_process:
                     app.codegen_process.terminate()
                 root.destroy()
         else:
+            if app.executor:
+                app.executor.shutdown()
+            if app.catalogue:
+                app.catalogue.stop()
             root.destroy()
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
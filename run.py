@@ -4,7 +4,6 @@ Quick run script for SiteTester GUI Application
 Automatically checks environment and starts the application
 """
 
-import subprocess
 import sys
 from pathlib import Path
 
@@ -17,17 +16,20 @@ def main():
     # Check if virtual environment exists
     if not venv_dir.exists():
         print("🔧 Virtual environment not found. Running setup...")
+        import subprocess
         try:
             subprocess.run([sys.executable, "setup.py"], check=True)
         except subprocess.CalledProcessError:
             print("❌ Setup failed. Please run setup.py manually.")
             sys.exit(1)
     
-    # Run the main application
+    # Run the main application in this interpreter (no second Python startup)
     print("🚀 Starting SiteTester GUI...")
+    sys.path.insert(0, str(project_root))
     try:
-        subprocess.run([sys.executable, "main.py"], check=True)
-    except subprocess.CalledProcessError as e:
+        from main import main as run_app
+        run_app()
+    except ImportError as e:
         print(f"❌ Failed to start application: {e}")
         sys.exit(1)
     except KeyboardInterrupt:
@@ -2,75 +2,59 @@
 """
 Setup script for SiteTester GUI Application
 Automatically creates virtual environment and installs dependencies
+
+Usage:
+    python setup.py                       # online install
+    python setup.py --build-wheelhouse    # download wheels to ./wheelhouse for later offline installs
+    python setup.py --offline             # install only from ./wheelhouse
 """
 
-import subprocess
+import argparse
 import sys
-import os
-import venv
 from pathlib import Path
 
-
-def run_command(cmd, description):
-    """Run a command and handle errors"""
-    print(f"🔄 {description}...")
-    try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True, shell=True)
-        print(f"✅ {description} completed")
-        return result
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {description} failed!")
-        print(f"Error: {e}")
-        if e.stdout:
-            print(f"stdout: {e.stdout}")
-        if e.stderr:
-            print(f"stderr: {e.stderr}")
-        sys.exit(1)
+from crawly.config import load_config
+from crawly.environment import BootstrapError, bootstrap, build_wheelhouse
 
 
 def main():
     """Main setup function"""
+    parser = argparse.ArgumentParser(description="Set up the SiteTester environment")
+    parser.add_argument("--wheelhouse", help="directory with prebuilt wheels (default: config or ./wheelhouse)")
+    parser.add_argument("--offline", action="store_true", help="install only from the wheelhouse")
+    parser.add_argument("--build-wheelhouse", action="store_true",
+                        help="download/build all requirement wheels into the wheelhouse and exit")
+    parser.add_argument("--browsers", nargs="+", choices=["chromium", "firefox", "webkit"],
+                        help="browser engines to install (default: the ones used by scripts/)")
+    args = parser.parse_args()
+
     print("🚀 Setting up SiteTester GUI Application...")
-    
+
     project_root = Path(__file__).parent
-    venv_dir = project_root / "venv"
-    
-    # Create virtual environment if it doesn't exist
-    if not venv_dir.exists():
-        print("📦 Creating virtual environment...")
-        venv.create(venv_dir, with_pip=True)
-        print("✅ Virtual environment created")
-    else:
-        print("ℹ️  Virtual environment already exists")
-    
-    # Determine paths based on OS
-    if sys.platform == "win32":
-        python_path = venv_dir / "Scripts" / "python"
-        pip_path = venv_dir / "Scripts" / "pip"
-    else:
-        python_path = venv_dir / "bin" / "python"
-        pip_path = venv_dir / "bin" / "pip"
-    
-    # Upgrade pip
-    run_command(f'"{pip_path}" install --upgrade pip', "Upgrading pip")
-    
-    # Install requirements
-    if (project_root / "requirements.txt").exists():
-        run_command(f'"{pip_path}" install -r requirements.txt', "Installing requirements")
-    else:
-        print("⚠️  No requirements.txt found, installing basic packages...")
-        packages = ["playwright>=1.40.0", "rich>=13.0.0", "pyinstaller>=6.0.0"]
-        for package in packages:
-            run_command(f'"{pip_path}" install "{package}"', f"Installing {package}")
-    
-    # Install Playwright browsers
-    run_command(f'"{python_path}" -m playwright install', "Installing Playwright browsers")
-    
+    config = load_config(project_root)
+    wheelhouse = args.wheelhouse or config["wheelhouse"] or project_root / "wheelhouse"
+
+    try:
+        if args.build_wheelhouse:
+            build_wheelhouse(project_root, wheelhouse, log=lambda message: print(f"🔄 {message}"))
+            print("\n🎉 Wheelhouse ready, install offline with: python setup.py --offline")
+            return
+
+        bootstrap(project_root,
+                  log=lambda message: print(f"🔄 {message}"),
+                  wheelhouse=wheelhouse,
+                  offline=args.offline or config["offline_install"],
+                  cache_dir=config["pip_cache_dir"],
+                  browsers=args.browsers)
+    except BootstrapError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
     # Create logs directory
     logs_dir = project_root / "logs"
     logs_dir.mkdir(exist_ok=True)
     print("📁 Logs directory created")
-    
+
     print("\n🎉 Setup completed successfully!")
     print("\n📖 Next steps:")
     print("1. Run the application: python main.py")
@@ -80,4 +64,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
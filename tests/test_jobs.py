@@ -0,0 +1,139 @@
+import asyncio
+import time
+
+import pytest
+
+from crawly.jobs import CANCELLED, COMPLETED, FAILED, RunQueue
+from crawly.orchestrator import Orchestrator
+from crawly.retry import RetryPolicy, describe_failure
+
+
+@pytest.fixture
+def orchestrator():
+    orchestrator = Orchestrator(blocking_workers=2).start()
+    yield orchestrator
+    orchestrator.stop()
+
+
+def wait_idle(run_queue, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while run_queue.has_work():
+        assert time.monotonic() < deadline, "run queue did not finish"
+        time.sleep(0.01)
+
+
+def test_runs_at_most_max_workers_at_once(orchestrator):
+    running = []
+    peak = []
+
+    async def execute(job):
+        running.append(job)
+        peak.append(len(running))
+        await asyncio.sleep(0.02)
+        running.remove(job)
+        return 0
+
+    run_queue = RunQueue(execute, max_workers=2, orchestrator=orchestrator)
+    jobs = [run_queue.submit(f"script{number}") for number in range(6)]
+    wait_idle(run_queue)
+
+    assert max(peak) == 2
+    assert all(job.status == COMPLETED for job in jobs)
+
+
+def test_dispatches_in_submission_order(orchestrator):
+    started = []
+
+    async def execute(job):
+        started.append(job.script_name)
+        return 0
+
+    run_queue = RunQueue(execute, max_workers=1, orchestrator=orchestrator)
+    for name in ("a", "b", "c"):
+        run_queue.submit(name)
+    wait_idle(run_queue)
+
+    assert started == ["a", "b", "c"]
+
+
+def test_plain_function_runs_in_the_pool(orchestrator):
+    run_queue = RunQueue(lambda job: 3, max_workers=1, orchestrator=orchestrator)
+    job = run_queue.submit("blocking")
+    wait_idle(run_queue)
+
+    assert job.status == FAILED
+    assert job.returncode == 3
+
+
+def test_cancel_queued_job(orchestrator):
+    release = asyncio.Event()
+
+    async def execute(job):
+        await release.wait()
+        return 0
+
+    run_queue = RunQueue(execute, max_workers=1, orchestrator=orchestrator)
+    first = run_queue.submit("first")
+    second = run_queue.submit("second")
+    assert run_queue.cancel(second.id)
+    orchestrator.call_soon(release.set)
+    wait_idle(run_queue)
+
+    assert first.status == COMPLETED
+    assert second.status == CANCELLED
+
+
+def test_transient_failure_is_requeued(orchestrator):
+    async def execute(job):
+        if job.attempt == 1:
+            job.retry_reason = "net::ERR_CONNECTION_RESET"
+            return 1
+        return 0
+
+    retry = RetryPolicy(max_attempts=3, backoff=0.01)
+    run_queue = RunQueue(execute, max_workers=1, orchestrator=orchestrator, retry=retry)
+    job = run_queue.submit("flaky")
+    wait_idle(run_queue)
+
+    assert job.status == COMPLETED
+    assert job.attempt == 2
+
+
+def test_retries_stop_after_max_attempts(orchestrator):
+    async def execute(job):
+        job.retry_reason = "TimeoutError"
+        return 1
+
+    retry = RetryPolicy(max_attempts=3, backoff=0.01)
+    run_queue = RunQueue(execute, max_workers=1, orchestrator=orchestrator, retry=retry)
+    job = run_queue.submit("broken")
+    wait_idle(run_queue)
+
+    assert job.status == FAILED
+    assert job.attempt == 3
+
+
+def test_hard_failure_is_not_requeued(orchestrator):
+    async def execute(job):
+        return 1
+
+    retry = RetryPolicy(max_attempts=3, backoff=0.01)
+    run_queue = RunQueue(execute, max_workers=1, orchestrator=orchestrator, retry=retry)
+    job = run_queue.submit("assertion")
+    wait_idle(run_queue)
+
+    assert job.status == FAILED
+    assert job.attempt == 1
+
+
+def test_executor_error_is_kept_on_the_job(orchestrator):
+    async def execute(job):
+        raise RuntimeError("executor not ready")
+
+    run_queue = RunQueue(execute, max_workers=1, orchestrator=orchestrator)
+    job = run_queue.submit("broken")
+    wait_idle(run_queue)
+
+    assert job.status == FAILED
+    assert "RuntimeError: executor not ready" in job.error
+    assert describe_failure(job) == "RuntimeError: executor not ready"
@@ -0,0 +1,32 @@
+from crawly.logview import LogBuffer
+
+
+def test_extend_splits_multiline_messages():
+    buffer = LogBuffer(capacity=10)
+    buffer.extend(["one", "two\nthree\n"])
+    assert len(buffer) == 3
+    assert buffer.window(0, 10) == ["one", "two", "three"]
+
+
+def test_overflow_is_counted_as_dropped():
+    buffer = LogBuffer(capacity=3)
+    buffer.extend(["a", "b"])
+    assert buffer.dropped == 0
+    buffer.extend(["c", "d", "e"])
+    assert buffer.dropped == 2
+    assert buffer.window(0, 3) == ["c", "d", "e"]
+
+
+def test_overflow_larger_than_capacity():
+    buffer = LogBuffer(capacity=2)
+    buffer.extend(str(number) for number in range(5))
+    assert buffer.dropped == 3
+    assert buffer.window(0, 2) == ["3", "4"]
+
+
+def test_clear_resets_dropped():
+    buffer = LogBuffer(capacity=1)
+    buffer.extend(["a", "b"])
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.dropped == 0
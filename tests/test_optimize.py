@@ -0,0 +1,66 @@
+from crawly.optimize import describe_saving, optimize_script
+
+
+RECORDED = '''\
+def run(playwright):
+    page = playwright.chromium.launch().new_page()
+    page.get_by_label("Postcode").click()
+    page.get_by_label("Postcode").fill("1234AB")
+    page.get_by_role("textbox", name="Name").click()
+    page.get_by_role("textbox", name="Name").click()
+    page.get_by_role("textbox", name="Name").press("Tab")
+    page.get_by_role("button", name="Next").click()
+'''
+
+
+def test_removes_focus_only_steps():
+    optimised, removed = optimize_script(RECORDED)
+    assert [line for line, _ in removed] == [3, 5, 7]
+    assert optimised == '''\
+def run(playwright):
+    page = playwright.chromium.launch().new_page()
+    page.get_by_label("Postcode").fill("1234AB")
+    page.get_by_role("textbox", name="Name").click()
+    page.get_by_role("button", name="Next").click()
+'''
+
+
+def test_keeps_clicks_with_options_and_on_buttons():
+    source = '''\
+def run(page):
+    page.get_by_label("Postcode").click(position={"x": 1, "y": 1})
+    page.get_by_label("Postcode").fill("1234AB")
+    page.get_by_role("button", name="Add").click()
+    page.get_by_role("button", name="Add").click()
+'''
+    optimised, removed = optimize_script(source)
+    assert removed == []
+    assert optimised == source
+
+
+def test_keeps_the_step_before_keyboard_and_mouse_input():
+    source = '''\
+def run(page):
+    page.get_by_label("Naam").fill("Jan")
+    page.get_by_label("Naam").press("Tab")
+    page.keyboard.type("0612345678")
+    page.get_by_label("Plaats").click()
+    page.mouse.click(10, 10)
+'''
+    optimised, removed = optimize_script(source)
+    assert removed == []
+    assert optimised == source
+
+
+def test_keeps_the_click_that_opens_a_combobox():
+    source = '''\
+def run(page):
+    page.get_by_role("combobox", name="Land").click()
+    page.get_by_role("combobox", name="Land").fill("Nederland")
+'''
+    assert optimize_script(source)[1] == []
+
+
+def test_describe_saving():
+    assert describe_saving(0) == "Nothing to optimise"
+    assert describe_saving(3) == "3 step(s) removed, an estimated 3 browser round trip(s) saved per run"
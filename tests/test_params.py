@@ -0,0 +1,47 @@
+import pytest
+
+from crawly.params import coerce_row, declared_params, read_rows
+
+
+def test_declared_params():
+    source = 'PARAMS = {"postcode": "1234AB", "quantity": 1}\n\ndef run(playwright):\n    pass\n'
+    assert declared_params(source) == {"postcode": "1234AB", "quantity": 1}
+    assert declared_params("def run(playwright):\n    pass\n") is None
+    assert declared_params("PARAMS = dict(a=1)\n") == {}
+    assert declared_params("def run(:\n") is None
+
+
+def test_read_csv_rows(tmp_path):
+    path = tmp_path / "rows.csv"
+    path.write_text("postcode,quantity\n1234AB,2\n5678CD,3\n", encoding="utf-8")
+    assert list(read_rows(path)) == [{"postcode": "1234AB", "quantity": "2"},
+                                     {"postcode": "5678CD", "quantity": "3"}]
+
+
+def test_read_jsonl_rows(tmp_path):
+    path = tmp_path / "rows.jsonl"
+    path.write_text('{"quantity": 2}\n\n{"quantity": 3}\n', encoding="utf-8")
+    assert list(read_rows(path)) == [{"quantity": 2}, {"quantity": 3}]
+
+
+def test_read_jsonl_reports_the_bad_line(tmp_path):
+    path = tmp_path / "rows.jsonl"
+    path.write_text('{"quantity": 2}\n[1, 2]\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="line 2"):
+        list(read_rows(path))
+
+
+def test_unsupported_data_file(tmp_path):
+    with pytest.raises(ValueError, match="unsupported"):
+        list(read_rows(tmp_path / "rows.xlsx"))
+
+
+def test_coerce_row_converts_to_the_default_types():
+    defaults = {"postcode": "1234AB", "quantity": 1, "price": 1.5, "express": False}
+    row = {"quantity": "4", "price": "2.25", "express": "yes"}
+    assert coerce_row(row, defaults) == {"postcode": "1234AB", "quantity": 4, "price": 2.25, "express": True}
+
+
+def test_coerce_row_rejects_extra_values():
+    with pytest.raises(ValueError, match="more values than columns"):
+        coerce_row({"quantity": "1", None: ["extra"]}, {"quantity": 1})
@@ -0,0 +1,31 @@
+from crawly.planner import Estimate, estimate_durations, longest_first, percentile
+
+
+class FakeHistory:
+    def __init__(self, durations):
+        self._durations = durations
+
+    def durations(self, script, limit=50):
+        return self._durations.get(script, [])[:limit]
+
+
+def test_percentile_interpolates():
+    assert percentile([1, 2, 3, 4], 0.5) == 2.5
+    assert percentile([5], 0.95) == 5
+
+
+def test_longest_first():
+    estimates = {"short": Estimate(1, 2, 3), "long": Estimate(30, 40, 3), "medium": Estimate(10, 12, 3)}
+    assert longest_first(["short", "long", "medium"], estimates) == ["long", "medium", "short"]
+
+
+def test_longest_first_keeps_order_without_estimates():
+    assert longest_first(["b", "a", "c"], {}) == ["b", "a", "c"]
+
+
+def test_unknown_scripts_get_the_median_of_the_rest():
+    history = FakeHistory({"a": [10, 10], "b": [20], "c": [30]})
+    estimates = estimate_durations(history, ["a", "b", "c", "new"])
+    assert estimates["new"].p50 == 20
+    assert estimates["new"].samples == 0
+    assert longest_first(["new", "a", "c", "b"], estimates) == ["c", "new", "b", "a"]
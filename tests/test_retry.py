@@ -0,0 +1,64 @@
+from crawly.jobs import COMPLETED, FAILED, Job
+from crawly.retry import RetryPolicy, describe_failure, triage
+
+
+def failed_job(reason=None, attempt=1, returncode=1):
+    job = Job("script")
+    job.returncode = returncode
+    job.retry_reason = reason
+    job.attempt = attempt
+    return job
+
+
+def test_transient_errors_match():
+    retry = RetryPolicy(max_attempts=2)
+    assert retry.match("playwright._impl._errors.TimeoutError: Timeout 30000ms exceeded.") == "TimeoutError"
+    assert retry.match("page.goto: net::ERR_CONNECTION_RESET at https://example.com") == "net::ERR_CONNECTION_RESET"
+    assert retry.match("Temporary failure in name resolution") is not None
+
+
+def test_watchdog_line_is_the_whole_reason():
+    retry = RetryPolicy(max_attempts=2)
+    line = "Timed out: no output for 60s, process tree killed"
+    assert retry.match(line) == line
+
+
+def test_other_failures_do_not_match():
+    retry = RetryPolicy(max_attempts=2)
+    assert retry.match("AssertionError: expected title") is None
+    assert retry.match("SyntaxError in script.py line 3") is None
+
+
+def test_should_retry():
+    retry = RetryPolicy(max_attempts=3)
+    assert retry.should_retry(failed_job("TimeoutError"))
+    assert not retry.should_retry(failed_job(None))
+    assert not retry.should_retry(failed_job("TimeoutError", returncode=0))
+    assert not retry.should_retry(failed_job("TimeoutError", attempt=3))
+
+    cancelled = failed_job("TimeoutError")
+    cancelled.cancelled = True
+    assert not retry.should_retry(cancelled)
+
+
+def test_disabled_without_attempts_or_patterns():
+    assert not RetryPolicy(max_attempts=1).should_retry(failed_job("TimeoutError"))
+    assert not RetryPolicy(max_attempts=3, patterns=[]).enabled
+
+
+def test_backoff_doubles_up_to_the_maximum():
+    retry = RetryPolicy(max_attempts=5, backoff=2.0, backoff_max=5.0)
+    assert [retry.delay(attempt) for attempt in (1, 2, 3)] == [2.0, 4.0, 5.0]
+
+
+def test_triage_and_describe_failure():
+    passed = failed_job(returncode=0)
+    passed.status = COMPLETED
+    flaky = failed_job(returncode=0, attempt=2)
+    flaky.status = COMPLETED
+    failed = failed_job("net::ERR_NAME_NOT_RESOLVED", attempt=3)
+    failed.status = FAILED
+
+    assert triage([passed, flaky, failed]) == ([passed], [flaky], [failed])
+    assert describe_failure(failed) == "net::ERR_NAME_NOT_RESOLVED, 3 attempts"
+    assert describe_failure(failed_job(returncode=2)) == "return code 2"
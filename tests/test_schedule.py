@@ -0,0 +1,72 @@
+import datetime
+
+import pytest
+
+from crawly.schedule import CronExpression, Schedule, parse_interval
+
+
+def test_steps_ranges_and_lists():
+    cron = CronExpression("*/15 7-9 * * 1,3")
+    assert cron.minutes == {0, 15, 30, 45}
+    assert cron.hours == {7, 8, 9}
+    assert cron.weekdays == {1, 3}
+
+
+def test_names_and_sunday_as_seven():
+    cron = CronExpression("0 0 1 jan-mar sun,7")
+    assert cron.months == {1, 2, 3}
+    assert cron.weekdays == {0}
+
+
+def test_aliases():
+    assert CronExpression("@daily").hours == {0}
+    assert CronExpression("@hourly").minutes == {0}
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "* 24 * * *", "*/0 * * * *", "5-1 * * * *"])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+def test_next_after():
+    cron = CronExpression("30 8 * * 1-5")
+    # Friday 2026-01-02 09:00 -> Monday 08:30
+    moment = datetime.datetime(2026, 1, 2, 9, 0)
+    assert cron.next_after(moment) == datetime.datetime(2026, 1, 5, 8, 30)
+
+
+def test_day_fields_match_either_when_both_restricted():
+    cron = CronExpression("0 0 13 * fri")
+    # Thursday the 1st -> Friday the 2nd, before the 13th
+    assert cron.next_after(datetime.datetime(2026, 1, 1, 12, 0)) == datetime.datetime(2026, 1, 2, 0, 0)
+
+
+def test_stepped_day_field_counts_as_unrestricted():
+    cron = CronExpression("0 0 */2 * tue")
+    # Odd days that are also Tuesdays: 2026-01-06 is even, 2026-01-13 is the first match
+    assert cron.next_after(datetime.datetime(2026, 1, 1, 12, 0)) == datetime.datetime(2026, 1, 13, 0, 0)
+
+
+@pytest.mark.parametrize("value, seconds", [(300, 300.0), ("90s", 90.0), ("15m", 900.0),
+                                            ("6h", 21600.0), ("1d", 86400.0), ("2.5", 2.5)])
+def test_parse_interval(value, seconds):
+    assert parse_interval(value) == seconds
+
+
+def test_parse_interval_rejects_zero():
+    with pytest.raises(ValueError):
+        parse_interval("0m")
+
+
+def test_schedule_needs_exactly_one_trigger():
+    with pytest.raises(ValueError):
+        Schedule("both", cron="@hourly", every="1h")
+    with pytest.raises(ValueError):
+        Schedule("none")
+
+
+def test_interval_schedule_stays_on_its_grid():
+    schedule = Schedule("grid", every="15m")
+    planned = datetime.datetime(2026, 1, 1, 10, 0)
+    assert schedule.next_time(planned) == datetime.datetime(2026, 1, 1, 10, 15)